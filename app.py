@@ -1,5 +1,7 @@
+import time
+
 import streamlit as st
-from src import ui, logic
+from src import ui, cache, metrics, pipeline, telemetry
 
 # Page Configuration
 st.set_page_config(
@@ -10,6 +12,8 @@ st.set_page_config(
 )
 
 def main():
+    started = time.perf_counter()
+    metrics.start_from_env()
     st.title("Quando associar hormonioterapia à radioterapia de salvamento no câncer de próstata")
     st.markdown("""
     Esta ferramenta auxilia na decisão de adicionar Terapia de Privação Androgênica (ADT) 
@@ -22,32 +26,22 @@ def main():
     # 1. Get Inputs
     inputs = ui.render_inputs()
     
-    # 2. Process Logic
-    risk = logic.classify_risk(
-        inputs['psa_pre_srt'],
-        inputs['gleason'],
-        inputs['stage'],
-        inputs['psadt_months'],
-        inputs['pet_findings'],
-        inputs['margin'],
-        inputs['n_stage'],
-        inputs['has_psa_persistence']
-    )
+    # 2. Process Logic (cached on the inputs fingerprint + rule-set version)
+    result = cache.run_pipeline(inputs)
     
-    rt_field = logic.suggest_rt_field(
-        risk=risk,
-        pet_findings=inputs['pet_findings']
-    )
+    # 3. Render Outputs
+    ui.render_results(result['risk'], result['rt_field'], result['adt'], inputs)
     
-    adt_rec = logic.suggest_adt(
-        risk=risk,
-        life_expectancy=inputs['life_expectancy'],
-        has_cardio_risk=inputs['has_cardio'],
-        has_severe_metabolic=inputs['has_metabolic']
-    )
+    elapsed = time.perf_counter() - started
+    metrics.RERUN_SECONDS.observe(elapsed)
     
-    # 3. Render Outputs
-    ui.render_results(risk, rt_field, adt_rec, inputs)
+    # Opt-in telemetry: one decision per distinct case in the session, plus rerun latency
+    if telemetry.get_telemetry() is not None:
+        fp = pipeline.fingerprint(inputs)
+        if st.session_state.get('telemetry_case') != fp:
+            st.session_state['telemetry_case'] = fp
+            telemetry.record('decision', risk=result['risk'], rt_field=result['rt_field'], adt=result['adt'])
+        telemetry.record('rerun', duration_ms=elapsed * 1000)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,288 @@
+"""
+Concurrent-session load test for app.py, driven headless through Streamlit's AppTest.
+
+Each simulated session replays an interaction script: it changes the PSA bucket,
+edits PSADT rows, toggles comorbidities and exports the PDF. The latency of every
+rerun is recorded. Sessions run in a process pool because AppTest keeps a
+process-global runtime. Set ADT_CACHE_DIR so the workers share artifacts the way
+replicas do.
+
+Usage:
+    python loadtest.py --sessions 40 --concurrency 8
+    python loadtest.py --sessions 20 --no-export --max-p95-ms 800 --json report.json
+"""
+import argparse
+import functools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+PSA_OPTIONS = ["<= 0,3 ng/mL", "> 0,3 a <= 0,7 ng/mL", "> 0,7 ng/mL"]
+COMORBIDITIES = ["has_cardio", "has_metabolic", "has_bone", "has_libido_concern"]
+
+# Seconds spent inside chart rendering (kaleido) and PDF compilation (fpdf) in this worker
+_component_time = {'kaleido': 0.0, 'fpdf': 0.0}
+_component_lock = threading.Lock()
+
+def _timed(component, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with _component_lock:
+                _component_time[component] += time.perf_counter() - start
+    return wrapper
+
+def _init_worker():
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+    # AppTest outside a server logs a warning per thread; keep the report readable
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore")
+
+    # Export jobs look these up on the modules, so patching here times every render
+    from src import utils, visuals
+    visuals.get_chart_image = _timed('kaleido', visuals.get_chart_image)
+    utils.create_pdf = _timed('fpdf', utils.create_pdf)
+
+def _psadt_rows(rng):
+    """
+    Editor delta with 2-4 rising PSA values, as the data_editor widget reports it
+    (the editor starts with two rows; extra rows are additions).
+    """
+    n_rows = rng.randint(2, 4)
+    psa = rng.uniform(0.1, 0.3)
+    rows = []
+    for i in range(n_rows):
+        rows.append({"Data": f"2024-{1 + 3 * i:02d}-01", "PSA (ng/mL)": round(psa, 2)})
+        psa *= rng.uniform(1.2, 2.0)
+    return {
+        "edited_rows": {str(i): row for i, row in enumerate(rows[:2])},
+        "added_rows": rows[2:],
+        "deleted_rows": [],
+    }
+
+def _interaction_script(rng, export):
+    """
+    Returns the session's steps as (name, action) pairs; each action mutates
+    the AppTest before the timed rerun.
+    """
+    steps = [("load", lambda at: None)]
+    steps.append(("psa_bucket", lambda at: at.selectbox(key="psa_option").set_value(rng.choice(PSA_OPTIONS))))
+    steps.append(("psadt_known", lambda at: at.radio(key="psadt_option").set_value("Conhecido")))
+
+    def edit_rows(at):
+        at.session_state["psadt_editor"] = _psadt_rows(rng)
+    steps.append(("psadt_rows", edit_rows))
+
+    for key in ("gleason", "stage", "pet_findings"):
+        steps.append((key, lambda at, key=key: at.selectbox(key=key).set_value(rng.choice(at.selectbox(key=key).options))))
+    for key in rng.sample(COMORBIDITIES, rng.randint(1, 2)):
+        steps.append(("comorbidity", lambda at, key=key: at.checkbox(key=key).check()))
+    steps.append(("psa_bucket", lambda at: at.selectbox(key="psa_option").set_value(rng.choice(PSA_OPTIONS))))
+
+    if export:
+        steps.append(("export_click", lambda at: [b for b in at.button if "Gerar PDF" in b.label][0].click()))
+    return steps
+
+def _export_state(at):
+    if any("Baixar PDF" in d.label for d in at.get("download_button")):
+        return "ready"
+    if any("Falha ao gerar o PDF" in e.value for e in at.error):
+        return "failed"
+    return "pending"
+
+def run_session(seed, export=True, poll_interval=0.5, timeout=60.0):
+    """
+    Replays one session in this worker process.
+    Returns latencies [(step, seconds)], export outcome, component seconds and peak RSS.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    with _component_lock:
+        before = dict(_component_time)
+    start = time.perf_counter()
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    latencies = []
+    errors = []
+
+    def rerun(step):
+        t0 = time.perf_counter()
+        at.run()
+        latencies.append((step, time.perf_counter() - t0))
+        if at.exception:
+            errors.append(f"{step}: {at.exception[0].message}")
+
+    exporting = False
+    for step, action in _interaction_script(rng, export):
+        try:
+            action(at)
+        except (IndexError, KeyError, ValueError) as e:
+            # Widget missing in this state (e.g. after an app exception)
+            errors.append(f"{step}: {e!r}")
+            continue
+        rerun(step)
+        exporting = exporting or step == "export_click"
+
+    export_result = None
+    if exporting:
+        # The progress fragment polls with run_every; AppTest has to rerun explicitly
+        t0 = time.perf_counter()
+        state = _export_state(at)
+        while state == "pending" and time.perf_counter() - t0 < timeout:
+            time.sleep(poll_interval)
+            rerun("export_poll")
+            state = _export_state(at)
+        export_result = {'state': state, 'seconds': time.perf_counter() - t0}
+
+    with _component_lock:
+        components = {k: _component_time[k] - before[k] for k in _component_time}
+    return {
+        'seed': seed,
+        'latencies': latencies,
+        'errors': errors,
+        'export': export_result,
+        'components': components,
+        'wall': time.perf_counter() - start,
+        # ru_maxrss is in KB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        'pid': os.getpid(),
+    }
+
+def percentile(values, p):
+    """Nearest-rank percentile (p in 0-100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(results, elapsed, concurrency) -> dict:
+    """Aggregates session results into the report dict."""
+    latencies = [s for r in results for _, s in r['latencies']]
+    by_step = {}
+    for r in results:
+        for step, s in r['latencies']:
+            by_step.setdefault(step, []).append(s)
+    exports = [r['export'] for r in results if r['export']]
+    session_time = sum(r['wall'] for r in results)
+
+    report = {
+        'sessions': len(results),
+        'concurrency': concurrency,
+        'elapsed_s': elapsed,
+        'reruns': len(latencies),
+        'reruns_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'sessions_per_s': len(results) / elapsed if elapsed else 0.0,
+        'errors': [e for r in results for e in r['errors']],
+        'latency_ms': {},
+        'by_step_ms': {
+            step: {'n': len(v), 'p50': percentile(v, 50) * 1000, 'p95': percentile(v, 95) * 1000}
+            for step, v in sorted(by_step.items())
+        },
+        'export': None,
+        'components': {},
+        # Peak per worker process (each replays sessions one at a time)
+        'peak_rss_mb': max((r['peak_rss_mb'] for r in results), default=0.0),
+    }
+    if latencies:
+        report['latency_ms'] = {
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'max': max(latencies) * 1000,
+        }
+    if exports:
+        ready = [e['seconds'] for e in exports if e['state'] == 'ready']
+        report['export'] = {
+            'ready': len(ready),
+            'failed': sum(1 for e in exports if e['state'] == 'failed'),
+            'timed_out': sum(1 for e in exports if e['state'] == 'pending'),
+            'p50_s': percentile(ready, 50) if ready else None,
+            'p95_s': percentile(ready, 95) if ready else None,
+        }
+    for component in ('kaleido', 'fpdf'):
+        seconds = sum(r['components'][component] for r in results)
+        report['components'][component] = {
+            'seconds': seconds,
+            'share': seconds / session_time if session_time else 0.0,
+        }
+    return report
+
+def format_report(report) -> str:
+    lines = [
+        f"Sessões: {report['sessions']} ({report['concurrency']} concorrentes) em {report['elapsed_s']:.1f} s",
+        f"Reruns: {report['reruns']} ({report['reruns_per_s']:.1f}/s, {report['sessions_per_s']:.2f} sessões/s)",
+    ]
+    lat = report['latency_ms']
+    if lat:
+        lines.append(
+            f"Latência de rerun (ms): p50 {lat['p50']:.0f} | p95 {lat['p95']:.0f} | p99 {lat['p99']:.0f} | máx {lat['max']:.0f}"
+        )
+    for step, stats in report['by_step_ms'].items():
+        lines.append(f"  {step:<14} n={stats['n']:<5} p50 {stats['p50']:.0f} ms | p95 {stats['p95']:.0f} ms")
+    exp = report['export']
+    if exp:
+        timing = f" | p50 {exp['p50_s']:.2f} s | p95 {exp['p95_s']:.2f} s" if exp['ready'] else ""
+        lines.append(f"Exportação PDF: {exp['ready']} prontas, {exp['failed']} falhas, {exp['timed_out']} sem resposta{timing}")
+    for component, label in (('kaleido', "kaleido (gráficos)"), ('fpdf', "fpdf (PDF)")):
+        c = report['components'][component]
+        lines.append(f"Tempo em {label}: {c['seconds']:.2f} s ({c['share']:.1%} do tempo das sessões)")
+    lines.append(f"Pico de RSS por processo: {report['peak_rss_mb']:.0f} MB")
+    if report['errors']:
+        lines.append(f"Erros: {len(report['errors'])} (primeiro: {report['errors'][0]})")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the ADT calculator (Streamlit AppTest).")
+    parser.add_argument("--sessions", type=int, default=20, help="Total simulated sessions")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions running at once (worker processes)")
+    parser.add_argument("--no-export", action="store_true", help="Skip the PDF export step")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-rerun and export timeout (s)")
+    parser.add_argument("--json", help="Write the full report to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="Exit with status 1 when the rerun p95 exceeds this")
+    args = parser.parse_args(argv)
+
+    # AppTest rebinds __main__ to app.py inside the workers, so the pool must
+    # reference this module by its import name rather than as __main__
+    import loadtest
+
+    # spawn: each worker gets a fresh Streamlit runtime instead of a forked copy
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.concurrency, mp_context=ctx, initializer=loadtest._init_worker) as pool:
+        futures = [
+            pool.submit(loadtest.run_session, args.seed + i, not args.no_export, 0.5, args.timeout)
+            for i in range(args.sessions)
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+    elapsed = time.perf_counter() - start
+
+    report = summarize(results, elapsed, args.concurrency)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.max_p95_ms is not None and report['latency_ms'] and report['latency_ms']['p95'] > args.max_p95_ms:
+        print(f"p95 {report['latency_ms']['p95']:.0f} ms acima do limite de {args.max_p95_ms:.0f} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Baseline-risk and ADT benefit curves loaded from config/benefit_tables.csv.
+
+The CSV lists knots per risk tier x ADT option x horizon (years), interpolated
+linearly from 0% at year 0. Horizons beyond the last knot are rejected rather
+than extrapolated. Two views of the same validated knots:
+    KnotTables     (load_knots)   stdlib only: scalar lookups for logic.py and
+                                  the embeddable decision API
+    BenefitTables  (load_tables)  numpy arrays indexed by enum definition order,
+                                  pre-interpolated onto a GRID_STEP grid, so any
+                                  grid horizon is a plain array lookup (charts,
+                                  simulations, vectorized scoring)
+Both compute the same interpolation, so they return identical estimates.
+"""
+import csv
+import hashlib
+import io
+import math
+import os
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional
+
+from .constants import RiskLevel, ADTRecommendation
+
+# Next to the package, so imports work from any working directory
+DEFAULT_TABLES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "benefit_tables.csv")
+DEFAULT_HORIZON = 5.0
+GRID_STEP = 0.5  # years
+
+TABLES = ('baseline', 'arr')
+COLUMNS = ('table', 'risk_level', 'adt', 'horizon_years', 'value', 'upper')
+
+_RISK = {m: i for i, m in enumerate(RiskLevel)}
+_ADT = {m: i for i, m in enumerate(ADTRecommendation)}
+
+@dataclass(frozen=True)
+class Estimate:
+    """
+    Benefit of one ADT option for one risk tier at one horizon (percent).
+    arr_upper is set when only "< arr_upper" is reported; arr is then the
+    point used for charts and simulations. nnt is None without ADT.
+    """
+    horizon: float
+    baseline: float
+    arr: float
+    arr_upper: Optional[float]
+    nnt: Optional[int]
+    nnt_is_lower_bound: bool
+
+    @property
+    def has_benefit(self) -> bool:
+        return self.nnt is not None
+
+    @property
+    def arr_label(self) -> str:
+        return f"< {self.arr_upper}" if self.arr_upper is not None else f"{self.arr}"
+
+    @property
+    def nnt_label(self) -> str:
+        if self.nnt is None:
+            return "-"
+        return f"> {self.nnt}" if self.nnt_is_lower_bound else f"{self.nnt}"
+
+    def legacy(self) -> dict:
+        """Same shape as the historical get_absolute_benefits output (strings for bounds)."""
+        if self.nnt is None:
+            return {'arr_5yr': 0.0, 'nnt': "-"}
+        if self.arr_upper is not None:
+            return {'arr_5yr': self.arr_label, 'nnt': self.nnt_label}
+        return {'arr_5yr': self.arr, 'nnt': self.nnt}
+
+def nnt_from_arr(arr: float) -> int:
+    """Patients treated per event prevented, rounded up (ARR in percent)."""
+    # The epsilon keeps exact quotients (100 / 12.5 = 8) from rounding up
+    return math.ceil(100 / arr - 1e-9)
+
+def make_estimate(baseline, arr, upper, adt, horizon) -> Estimate:
+    """Estimate from interpolated values (upper NaN when there is no bound)."""
+    arr_value = round(float(arr), 1)
+    upper_value = None if math.isnan(upper) else round(float(upper), 1)
+    if adt == ADTRecommendation.NONE or arr_value <= 0:
+        nnt, lower_bound, upper_value = None, False, None
+    elif upper_value is not None:
+        nnt, lower_bound = math.floor(100 / upper_value), True
+    else:
+        nnt, lower_bound = nnt_from_arr(arr_value), False
+    return Estimate(
+        horizon=float(horizon), baseline=round(float(baseline), 1), arr=arr_value,
+        arr_upper=upper_value, nnt=nnt, nnt_is_lower_bound=lower_bound,
+    )
+
+def interp(xs, ys, x) -> float:
+    """Linear interpolation of ys at x (xs ascending, xs[0] <= x); same arithmetic as numpy.interp."""
+    if x >= xs[-1]:
+        return ys[-1]
+    j = bisect_right(xs, x) - 1
+    slope = (ys[j + 1] - ys[j]) / (xs[j + 1] - xs[j])
+    return slope * (x - xs[j]) + ys[j]
+
+class KnotTables:
+    """
+    Validated knots, stdlib only. Values per knot (percent), keyed by enum member:
+        baseline_knots  {risk: [...]}
+        arr_knots       {(risk, adt): [...]}   0 for ADTRecommendation.NONE
+        upper_knots     {(risk, adt): [...]}   NaN where a point estimate exists
+    """
+    def __init__(self, rows, version=""):
+        self.version = version
+        knots = sorted({row['horizon'] for row in rows})
+        if not knots:
+            raise ValueError("Benefit tables are empty")
+        self.knots = knots
+        n_knots = len(knots)
+        baseline = {r: [math.nan] * n_knots for r in RiskLevel}
+        arr = {(r, a): [0.0] * n_knots for r in RiskLevel for a in ADTRecommendation}
+        upper = {(r, a): [math.nan] * n_knots for r in RiskLevel for a in ADTRecommendation}
+        seen = set()
+        for row in rows:
+            k = knots.index(row['horizon'])
+            key = (row['table'], row['risk'], row['adt'], k)
+            if key in seen:
+                raise ValueError(f"Line {row['line']}: duplicate entry")
+            seen.add(key)
+            if row['table'] == 'baseline':
+                baseline[row['risk']][k] = row['value']
+            else:
+                arr[row['risk'], row['adt']][k] = row['value']
+                upper[row['risk'], row['adt']][k] = row['upper']
+
+        expected = {('baseline', r, None, k) for r in RiskLevel for k in range(n_knots)}
+        expected |= {('arr', r, a, k) for r in RiskLevel for a in ADTRecommendation
+                     if a != ADTRecommendation.NONE for k in range(n_knots)}
+        missing = sorted(expected - seen, key=lambda t: (TABLES.index(t[0]), _RISK[t[1]], _ADT.get(t[2], -1), t[3]))
+        if missing:
+            table, risk, adt, k = missing[0]
+            where = f"{risk.name}" + (f" x {adt.name}" if adt else "")
+            raise ValueError(f"Missing {table} entry for {where} at {knots[k]} years ({len(missing)} missing)")
+        if any(a > b + 1e-9 for (r, _), values in arr.items() for a, b in zip(values, baseline[r])):
+            raise ValueError("ARR cannot exceed the baseline risk of its tier")
+        # A tier either reports a bound at every horizon or at none
+        bounded = [[not math.isnan(v) for v in values] for values in upper.values()]
+        if any(any(b) != all(b) for b in bounded):
+            raise ValueError("Upper bounds must be given at every horizon of a tier x ADT option")
+
+        self.baseline_knots, self.arr_knots, self.upper_knots = baseline, arr, upper
+        self.max_horizon = float(knots[-1])
+
+    def check_horizon(self, horizon):
+        if not 0 <= horizon <= self.max_horizon:
+            raise ValueError(f"Horizon {horizon} outside the tables (0 to {self.max_horizon:g} years)")
+
+    def value(self, values, horizon) -> float:
+        """Knot values interpolated at horizon, from 0 at year 0 (NaN rows stay NaN)."""
+        self.check_horizon(horizon)
+        return interp([0.0] + self.knots, [0.0 if not math.isnan(values[0]) else math.nan] + values, horizon)
+
+    def baseline(self, risk: RiskLevel, horizon=DEFAULT_HORIZON) -> float:
+        return self.value(self.baseline_knots[risk], horizon)
+
+    def estimate(self, risk: RiskLevel, adt: ADTRecommendation, horizon=DEFAULT_HORIZON) -> Estimate:
+        return make_estimate(self.baseline(risk, horizon), self.value(self.arr_knots[risk, adt], horizon),
+                             self.value(self.upper_knots[risk, adt], horizon), adt, horizon)
+
+    def estimates(self, risk: RiskLevel, horizon=DEFAULT_HORIZON) -> dict:
+        """{ADTRecommendation: Estimate} for every option."""
+        return {adt: self.estimate(risk, adt, horizon) for adt in ADTRecommendation}
+
+class BenefitTables:
+    """
+    Compiled tables (numpy). Arrays (percent):
+        baseline_grid  (n_risk, n_grid)
+        arr_grid       (n_risk, n_adt, n_grid)   0 for ADTRecommendation.NONE
+        upper_grid     (n_risk, n_adt, n_grid)   NaN where a point estimate exists
+    grid holds the horizons (years) of the last axis.
+    """
+    def __init__(self, rows, version="", knot_tables=None):
+        import numpy as np
+
+        knot_tables = knot_tables or KnotTables(rows, version)
+        self.knot_tables = knot_tables
+        self.version = knot_tables.version
+        self.knots = np.array(knot_tables.knots)
+        self.baseline_knots = np.array([knot_tables.baseline_knots[r] for r in RiskLevel])
+        self.arr_knots = np.array([[knot_tables.arr_knots[r, a] for a in ADTRecommendation] for r in RiskLevel])
+        self.upper_knots = np.array([[knot_tables.upper_knots[r, a] for a in ADTRecommendation] for r in RiskLevel])
+        self.max_horizon = knot_tables.max_horizon
+        self.grid = np.arange(0.0, self.max_horizon + GRID_STEP / 2, GRID_STEP)
+        self.baseline_grid = self.interpolate(self.baseline_knots, self.grid)
+        self.arr_grid = self.interpolate(self.arr_knots, self.grid)
+        self.upper_grid = self.interpolate(self.upper_knots, self.grid)
+
+    def interpolate(self, values, horizons):
+        """Linear interpolation of knot values (last axis) at horizons, from 0 at year 0."""
+        import numpy as np
+
+        xs = np.concatenate([[0.0], self.knots])
+        flat = values.reshape(-1, values.shape[-1])
+        # Rows without values (NaN, e.g. no upper bound) stay NaN down to year 0
+        out = np.array([np.interp(horizons, xs, np.concatenate([[0.0 if not np.isnan(v[0]) else np.nan], v]))
+                        for v in flat])
+        return out.reshape(values.shape[:-1] + np.shape(horizons))
+
+    def _column(self, horizon):
+        """Grid index for horizon, or None when it falls between grid points."""
+        self.knot_tables.check_horizon(horizon)
+        index = round(horizon / GRID_STEP)
+        return index if abs(index * GRID_STEP - horizon) < 1e-9 else None
+
+    def at(self, horizon=DEFAULT_HORIZON):
+        """(baseline (n_risk,), arr (n_risk, n_adt), upper (n_risk, n_adt)) at horizon."""
+        index = self._column(horizon)
+        if index is not None:
+            return self.baseline_grid[:, index], self.arr_grid[:, :, index], self.upper_grid[:, :, index]
+        return (self.interpolate(self.baseline_knots, horizon),
+                self.interpolate(self.arr_knots, horizon),
+                self.interpolate(self.upper_knots, horizon))
+
+    def baseline(self, risk: RiskLevel, horizon=DEFAULT_HORIZON) -> float:
+        return float(self.at(horizon)[0][_RISK[risk]])
+
+    def estimate(self, risk: RiskLevel, adt: ADTRecommendation, horizon=DEFAULT_HORIZON) -> Estimate:
+        return self._estimate(self.at(horizon), risk, adt, horizon)
+
+    def estimates(self, risk: RiskLevel, horizon=DEFAULT_HORIZON) -> dict:
+        """{ADTRecommendation: Estimate} for every option, from one horizon lookup."""
+        columns = self.at(horizon)
+        return {adt: self._estimate(columns, risk, adt, horizon) for adt in ADTRecommendation}
+
+    def _estimate(self, columns, risk, adt, horizon) -> Estimate:
+        baseline, arr, upper = columns
+        r, a = _RISK[risk], _ADT[adt]
+        return make_estimate(baseline[r], arr[r, a], float(upper[r, a]), adt, horizon)
+
+def parse_rows(text) -> list:
+    """Validated knot rows from CSV text; raises ValueError naming the line."""
+    rows = []
+    reader = csv.DictReader(io.StringIO(text, newline=''))
+    if tuple(reader.fieldnames or ()) != COLUMNS:
+        raise ValueError(f"Benefit tables need the columns {', '.join(COLUMNS)}")
+    for row in reader:
+        line = reader.line_num
+        first = (row['table'] or '').strip()
+        if not first or first.startswith('#'):
+            continue
+        try:
+            if first not in TABLES:
+                raise ValueError(f"unknown table {first!r}")
+            risk = RiskLevel[row['risk_level'].strip()]
+            adt = None
+            if first == 'arr':
+                adt = ADTRecommendation[row['adt'].strip()]
+                if adt == ADTRecommendation.NONE:
+                    raise ValueError("sRT alone (NONE) is the reference arm and takes no ARR rows")
+            horizon = float(row['horizon_years'])
+            value = float(row['value'])
+            upper = float(row['upper']) if (row['upper'] or '').strip() else math.nan
+        except KeyError as e:
+            raise ValueError(f"Line {line}: unknown name {e}") from None
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Line {line}: {e}") from None
+        if horizon <= 0 or not 0 <= value <= 100 or (not math.isnan(upper) and not value <= upper <= 100):
+            raise ValueError(f"Line {line}: out of bounds (horizon > 0, 0 <= value <= upper <= 100)")
+        if first == 'baseline' and not math.isnan(upper):
+            raise ValueError(f"Line {line}: baseline rows take no upper bound")
+        rows.append({'line': line, 'table': first, 'risk': risk, 'adt': adt,
+                     'horizon': horizon, 'value': value, 'upper': upper})
+    return rows
+
+# abs path -> (mtime_ns, size, KnotTables, BenefitTables or None until first asked for)
+_TABLES_CACHE = {}
+
+def _cached(csv_path):
+    """Cache entry for csv_path, re-read only when the file changes."""
+    st = os.stat(csv_path)
+    key = os.path.abspath(csv_path)
+    cached = _TABLES_CACHE.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached
+    with open(csv_path, 'rb') as f:
+        raw = f.read()
+    knots = KnotTables(parse_rows(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest()[:12])
+    cached = _TABLES_CACHE[key] = [st.st_mtime_ns, st.st_size, knots, None]
+    return cached
+
+def load_knots(csv_path=DEFAULT_TABLES_PATH) -> KnotTables:
+    """Validated knots (stdlib only), re-read only when the file changes."""
+    return _cached(csv_path)[2]
+
+def load_tables(csv_path=DEFAULT_TABLES_PATH) -> BenefitTables:
+    """Compiled numpy tables, rebuilt only when the file changes."""
+    cached = _cached(csv_path)
+    if cached[3] is None:
+        cached[3] = BenefitTables(None, knot_tables=cached[2])
+    return cached[3]
+
+def tables_version(csv_path=DEFAULT_TABLES_PATH) -> str:
+    """Short content hash of the tables; changes whenever the CSV is edited."""
+    return load_knots(csv_path).version
@@ -0,0 +1,217 @@
+import dataclasses
+
+import streamlit as st
+import plotly.io as pio
+
+from . import benefit_tables, codec, config_loader, disk_cache, logic, metrics, mfs, pipeline, sensitivity, simulation, uncertainty, utils, visuals
+from .constants import LifeExpectancy
+from .decision import Case
+
+# Rule-set version the caches were last filled with
+_state = {'rules_version': None}
+
+def sync_rules_version() -> str:
+    """
+    Returns the current rule-set version and clears every cache derived from
+    the rules when it changed since the last rerun (explicit invalidation).
+    The benefit tables are part of the version, so editing either CSV counts.
+    """
+    version = f"{config_loader.rules_version()}.{benefit_tables.tables_version()}"
+    if _state['rules_version'] is not None and _state['rules_version'] != version:
+        clear_all()
+    _state['rules_version'] = version
+    return version
+
+def clear_all():
+    """Drops every cached rule, pipeline, figure and summary entry."""
+    for fn in (_pipeline, _benefits, _baseline_risk, _estimate, _summary_text,
+               _risk_gauge, _arr_gauge, _waffle_chart, _risk_surface, _risk_heatmap,
+               _uncertainty, _outcome_groups, _mfs_curves, _mfs_chart, _scenario_chart):
+        fn.clear()
+
+# --- Data (copied on each hit, keyed on the inputs fingerprint) ---
+# Cached bodies call metrics.mark_miss and the wrappers go through
+# metrics.cached_call, so hits and misses are counted per cache.
+
+@st.cache_data(show_spinner=False, max_entries=1000)
+def _pipeline(fp, rules_version, _inputs):
+    metrics.mark_miss("pipeline")
+    return pipeline.run_pipeline(_inputs)
+
+@st.cache_data(show_spinner=False)
+def _benefits(risk, adt, rules_version):
+    metrics.mark_miss("benefits")
+    return logic.get_absolute_benefits(risk, adt)
+
+@st.cache_data(show_spinner=False)
+def _baseline_risk(risk, rules_version):
+    metrics.mark_miss("baseline_risk")
+    return logic.get_baseline_recurrence_risk(risk)
+
+@st.cache_data(show_spinner=False)
+def _estimate(risk, adt, horizon, rules_version):
+    metrics.mark_miss("estimate")
+    return benefit_tables.load_tables().estimate(risk, adt, horizon)
+
+@st.cache_data(show_spinner=False, max_entries=1000)
+def _summary_text(fp, rules_version, _inputs, _result):
+    metrics.mark_miss("summary")
+    store = disk_cache.get_shared_cache()
+    if store is not None:
+        cached = store.get('summary', fp, rules_version)
+        if cached is not None:
+            return cached.decode('utf-8')
+    text = utils.generate_summary_text(
+        _inputs, _result['risk'], _result['rt_field'], _result['adt'], _result['benefits']
+    )
+    if store is not None:
+        store.put('summary', fp, rules_version, text)
+    return text
+
+@st.cache_data(show_spinner=False, max_entries=200)
+def _risk_surface(context_token, rules_version):
+    metrics.mark_miss("risk_surface")
+    # The token's PSA/PSADT are zeroed, so one surface serves every PSA/PSADT of a context
+    return sensitivity.risk_surface(codec.from_token(context_token))
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def _uncertainty(fp, rules_version, psa_range, slope_se, _case):
+    metrics.mark_miss("uncertainty")
+    return uncertainty.simulate(_case, psa_range=psa_range, slope_se=slope_se)
+
+@st.cache_data(show_spinner=False)
+def _outcome_groups(risk, adt, horizon, rules_version):
+    metrics.mark_miss("outcome_groups")
+    result = simulation.simulate_groups(risk, adt, horizon=horizon)
+    # Summaries only; the per-group counts would be copied on every hit
+    return {'mean': result['mean'], 'interval': result['interval']}
+
+def run_pipeline(inputs):
+    """Cached pipeline.run_pipeline, keyed on the inputs fingerprint and rule-set version."""
+    return metrics.cached_call("pipeline", _pipeline, pipeline.fingerprint(inputs), sync_rules_version(), inputs)
+
+def benefits(risk, adt):
+    return metrics.cached_call("benefits", _benefits, risk, adt, sync_rules_version())
+
+def baseline_risk(risk):
+    return metrics.cached_call("baseline_risk", _baseline_risk, risk, sync_rules_version())
+
+def benefit_estimate(risk, adt, horizon=benefit_tables.DEFAULT_HORIZON):
+    """Typed benefit_tables.Estimate (ARR, NNT, baseline and their bounds) at horizon years."""
+    return metrics.cached_call("estimate", _estimate, risk, adt, float(horizon), sync_rules_version())
+
+def decision_probabilities(inputs, psa_range=None, slope_se=None):
+    """
+    Cached uncertainty.simulate for these inputs: risk tier and ADT probabilities
+    under PSA / PSADT measurement noise, keyed on the inputs fingerprint.
+    """
+    return metrics.cached_call("uncertainty", _uncertainty, pipeline.fingerprint(inputs), sync_rules_version(),
+                               psa_range, slope_se, Case.from_dict(inputs))
+
+def outcome_variability(risk, adt, horizon=simulation.HORIZON_YEARS):
+    """Cached simulation.simulate_groups summary (mean and 95% interval per 100 patients)."""
+    return metrics.cached_call("outcome_groups", _outcome_groups, risk, adt, float(horizon), sync_rules_version())
+
+def summary_text(inputs, result):
+    """Cached utils.generate_summary_text for the pipeline result of these inputs."""
+    return metrics.cached_call("summary", _summary_text, pipeline.fingerprint(inputs), sync_rules_version(), inputs, result)
+
+# --- Figures (shared objects, treated as read-only by the UI) ---
+
+def _build_figure(name, builder, *args):
+    with metrics.FIGURE_SECONDS.labels(name).time():
+        return builder(*args)
+
+def _shared_figure(name, builder, *args):
+    """
+    Builds a figure through the cross-replica disk cache (figure JSON) when
+    ADT_CACHE_DIR is set. Figures only depend on their numeric arguments,
+    not on the rule set.
+    """
+    store = disk_cache.get_shared_cache()
+    if store is None:
+        return _build_figure(name, builder, *args)
+    fp = f"{name}:" + ":".join(repr(a) for a in args)
+    cached = store.get('figure', fp, "")
+    if cached is not None:
+        return pio.from_json(cached.decode('utf-8'))
+    fig = _build_figure(name, builder, *args)
+    store.put('figure', fp, "", fig.to_json())
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=200)
+def _risk_gauge(risk_value):
+    metrics.mark_miss("risk_gauge")
+    return _shared_figure("risk_gauge", visuals.create_risk_gauge, risk_value)
+
+@st.cache_resource(show_spinner=False, max_entries=200)
+def _arr_gauge(arr_value):
+    metrics.mark_miss("arr_gauge")
+    return _shared_figure("arr_gauge", visuals.create_arr_gauge, arr_value)
+
+@st.cache_resource(show_spinner=False, max_entries=200)
+def _waffle_chart(arr_value, baseline):
+    metrics.mark_miss("waffle")
+    return _shared_figure("waffle", visuals.create_waffle_chart, arr_value, baseline)
+
+def risk_gauge(risk_value):
+    return metrics.cached_call("risk_gauge", _risk_gauge, risk_value)
+
+def arr_gauge(arr_value):
+    return metrics.cached_call("arr_gauge", _arr_gauge, arr_value)
+
+def waffle_chart(arr_value, baseline):
+    return metrics.cached_call("waffle", _waffle_chart, arr_value, baseline)
+
+@st.cache_resource(show_spinner=False, max_entries=200)
+def _risk_heatmap(context_token, psa, psadt, rules_version):
+    metrics.mark_miss("risk_heatmap")
+    surface = metrics.cached_call("risk_surface", _risk_surface, context_token, rules_version)
+    return _build_figure("risk_heatmap", visuals.create_risk_heatmap,
+                         sensitivity.PSA_GRID, sensitivity.PSADT_GRID, surface, psa, psadt)
+
+def risk_heatmap(inputs):
+    """
+    PSA x PSADT risk map for these inputs, cached per rule-set version. The
+    surface is keyed on the case context only (everything but PSA/PSADT).
+    """
+    case = Case.from_dict(inputs)
+    # Life expectancy and comorbidities don't change the risk tier
+    context = dataclasses.replace(
+        case, psa_pre_srt=0.0, psadt_months=None, life_expectancy=LifeExpectancy.LONG,
+        has_cardio=False, has_metabolic=False, has_bone=False, has_libido_concern=False,
+    )
+    return metrics.cached_call("risk_heatmap", _risk_heatmap, codec.to_token(context), case.psa_pre_srt,
+                               case.psadt_months, sync_rules_version())
+
+@st.cache_data(show_spinner=False)
+def _mfs_curves(risk, rules_version):
+    metrics.mark_miss("mfs_curves")
+    return mfs.curve_table(risk)
+
+@st.cache_resource(show_spinner=False, max_entries=100)
+def _mfs_chart(risk, adt, rules_version):
+    metrics.mark_miss("mfs_chart")
+    table = metrics.cached_call("mfs_curves", _mfs_curves, risk, rules_version)
+    return _build_figure("mfs", visuals.create_mfs_chart, table['years'], table['curves'], adt)
+
+def mfs_chart(risk, adt):
+    """
+    Projected MFS curves for a risk tier with the chosen ADT highlighted.
+    Curves are computed once per tier and rule-set version and shared by every session.
+    """
+    return metrics.cached_call("mfs_chart", _mfs_chart, risk, adt, sync_rules_version())
+
+@st.cache_resource(show_spinner=False, max_entries=100)
+def _scenario_chart(risk, adt, horizon, rules_version):
+    metrics.mark_miss("scenarios")
+    estimates = benefit_tables.load_tables().estimates(risk, horizon)
+    return _build_figure("scenarios", visuals.create_scenario_chart, estimates, adt)
+
+def scenario_chart(risk, adt, horizon=benefit_tables.DEFAULT_HORIZON):
+    """
+    Every ADT option's gauge and icon array for a risk tier in one figure, switched
+    client-side; it opens on the suggested option (buttons keep the ADT order).
+    Cached per tier, shared by sessions.
+    """
+    return metrics.cached_call("scenarios", _scenario_chart, risk, adt, float(horizon), sync_rules_version())
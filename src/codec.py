@@ -0,0 +1,155 @@
+"""
+Canonical bit-packed case encoding (stdlib only).
+
+A Case packs into one integer: usable as a cache key, a cohort storage row,
+a compact process-pool message or a URL token (?case=...).
+
+Compact layout (43 bits, 6 bytes), least significant bits first:
+    gleason 3 | stage 2 | n_stage 2 | margin 1 | pet_findings 3 | life_expectancy 1
+    | 5 flags (BOOL_FIELDS order) | psadt known 1 | PSA 12 | PSADT 12 | exact 1
+Enum codes follow the enum definition order. PSA is stored in 0.01 ng/mL steps
+(0-40.95) and PSADT in 0.1 month steps (0-409.5).
+
+Values off that grid or out of range are never rounded, because rounding could
+cross a decision threshold (e.g. PSADT 6.04 -> 6.0). Instead the exact bit is
+set and both raw float64 values follow at bit 43 (PSA) and bit 107 (PSADT),
+giving a 22-byte code. Decoding is always lossless.
+"""
+import base64
+import math
+import struct
+
+from .constants import (
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+from .decision import Case, BOOL_FIELDS
+
+# (field, enum type, bits), packed in this order
+ENUM_LAYOUT = (
+    ('gleason', GleasonScore, 3),
+    ('stage', TumorStage, 2),
+    ('n_stage', NodalStage, 2),
+    ('margin', MarginStatus, 1),
+    ('pet_findings', PetFindings, 3),
+    ('life_expectancy', LifeExpectancy, 1),
+)
+
+PSA_SCALE = 100     # 0.01 ng/mL
+PSADT_SCALE = 10    # 0.1 months
+VALUE_BITS = 12
+_VALUE_MAX = (1 << VALUE_BITS) - 1
+
+_PSADT_KNOWN_SHIFT = sum(bits for _, _, bits in ENUM_LAYOUT) + len(BOOL_FIELDS)
+_PSA_SHIFT = _PSADT_KNOWN_SHIFT + 1
+_PSADT_SHIFT = _PSA_SHIFT + VALUE_BITS
+EXACT_SHIFT = _PSADT_SHIFT + VALUE_BITS
+COMPACT_BITS = EXACT_SHIFT + 1
+_EXACT_PSA_SHIFT = COMPACT_BITS
+_EXACT_PSADT_SHIFT = _EXACT_PSA_SHIFT + 64
+
+COMPACT_BYTES = (COMPACT_BITS + 7) // 8
+EXACT_BYTES = (_EXACT_PSADT_SHIFT + 64 + 7) // 8
+
+# Precomputed member <-> code tables
+_CODES = {enum_cls: {m: i for i, m in enumerate(enum_cls)} for _, enum_cls, _ in ENUM_LAYOUT}
+_MEMBERS = {enum_cls: tuple(enum_cls) for _, enum_cls, _ in ENUM_LAYOUT}
+
+def _grid(value, scale):
+    """Grid step count when value is exactly representable, else None."""
+    if value is None:
+        return 0
+    steps = round(value * scale)
+    if 0 <= steps <= _VALUE_MAX and steps / scale == value:
+        return steps
+    return None
+
+def _float_bits(value) -> int:
+    return struct.unpack('<Q', struct.pack('<d', value))[0]
+
+def _bits_float(bits) -> float:
+    return struct.unpack('<d', struct.pack('<Q', bits))[0]
+
+def encode(case: Case) -> int:
+    """Packs a Case into its canonical integer code."""
+    code = 0
+    shift = 0
+    for field, enum_cls, bits in ENUM_LAYOUT:
+        code |= _CODES[enum_cls][getattr(case, field)] << shift
+        shift += bits
+    for field in BOOL_FIELDS:
+        if getattr(case, field):
+            code |= 1 << shift
+        shift += 1
+
+    if case.psadt_months is not None:
+        code |= 1 << _PSADT_KNOWN_SHIFT
+
+    psa_steps = _grid(case.psa_pre_srt, PSA_SCALE)
+    psadt_steps = _grid(case.psadt_months, PSADT_SCALE)
+    if psa_steps is not None and psadt_steps is not None:
+        return code | (psa_steps << _PSA_SHIFT) | (psadt_steps << _PSADT_SHIFT)
+
+    psadt_raw = case.psadt_months if case.psadt_months is not None else 0.0
+    return (code
+            | (1 << EXACT_SHIFT)
+            | (_float_bits(case.psa_pre_srt) << _EXACT_PSA_SHIFT)
+            | (_float_bits(psadt_raw) << _EXACT_PSADT_SHIFT))
+
+def decode(code: int) -> Case:
+    """Inverse of encode; raises ValueError for codes no Case encodes to."""
+    if code < 0 or code >> (EXACT_BYTES * 8):
+        raise ValueError(f"invalid case code: {code}")
+    fields = {}
+    shift = 0
+    for field, enum_cls, bits in ENUM_LAYOUT:
+        index = (code >> shift) & ((1 << bits) - 1)
+        members = _MEMBERS[enum_cls]
+        if index >= len(members):
+            raise ValueError(f"invalid case code: {field} index {index}")
+        fields[field] = members[index]
+        shift += bits
+    for field in BOOL_FIELDS:
+        fields[field] = bool((code >> shift) & 1)
+        shift += 1
+
+    psadt_known = (code >> _PSADT_KNOWN_SHIFT) & 1
+    if (code >> EXACT_SHIFT) & 1:
+        psa = _bits_float((code >> _EXACT_PSA_SHIFT) & 0xFFFFFFFFFFFFFFFF)
+        psadt = _bits_float((code >> _EXACT_PSADT_SHIFT) & 0xFFFFFFFFFFFFFFFF)
+        # Case accepts only finite, non-negative values; NaN would also fail code == encode(decode(code))
+        if not (math.isfinite(psa) and psa >= 0 and math.isfinite(psadt) and psadt >= 0):
+            raise ValueError(f"invalid case code: PSA {psa!r}, PSADT {psadt!r}")
+    else:
+        if code >> COMPACT_BITS:
+            raise ValueError(f"invalid case code: {code}")
+        psa = ((code >> _PSA_SHIFT) & _VALUE_MAX) / PSA_SCALE
+        psadt = ((code >> _PSADT_SHIFT) & _VALUE_MAX) / PSADT_SCALE
+    fields['psa_pre_srt'] = psa
+    fields['psadt_months'] = psadt if psadt_known else None
+    return Case(**fields)
+
+def is_compact(code: int) -> bool:
+    """True when the code fits the 6-byte compact layout."""
+    return not (code >> EXACT_SHIFT) & 1
+
+def to_bytes(case: Case) -> bytes:
+    """6 bytes (compact) or 22 bytes (exact), big-endian."""
+    code = encode(case)
+    return code.to_bytes(COMPACT_BYTES if is_compact(code) else EXACT_BYTES, 'big')
+
+def from_bytes(data: bytes) -> Case:
+    if len(data) not in (COMPACT_BYTES, EXACT_BYTES):
+        raise ValueError(f"invalid case encoding length: {len(data)}")
+    return decode(int.from_bytes(data, 'big'))
+
+def to_token(case: Case) -> str:
+    """URL-safe token (8 characters for compact codes)."""
+    return base64.urlsafe_b64encode(to_bytes(case)).rstrip(b'=').decode('ascii')
+
+def from_token(token: str) -> Case:
+    """Inverse of to_token; raises ValueError on malformed tokens."""
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise ValueError(f"invalid case token: {token!r}") from None
+    return from_bytes(data)
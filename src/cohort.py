@@ -0,0 +1,172 @@
+"""
+Columnar cohort format (Apache Arrow) for patient cases and decision outputs.
+
+Schema (one row per case):
+    psa_pre_srt       float64
+    psadt_months      float64, null when unknown
+    gleason, stage, n_stage, margin, pet_findings, life_expectancy
+                      dictionary<int8, string>: member names in enum definition
+                      order, so the codes are stable (same codes as codec.py)
+    has_* flags       bool
+Scored cohorts add:
+    risk, rt_field, adt   dictionary<int8, string> (RiskLevel, RTField, ADTRecommendation)
+    arr_5yr               float64, null for textual bounds ("< 3.0")
+    nnt                   int16, null for textual bounds ("> 33", "-")
+    baseline_risk         float64
+
+".arrow" files (Arrow IPC) are memory-mapped on read and the enum codes are
+used zero-copy by the vectorized scorer. ".parquet" is supported for exchange.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import benefit_tables, config_loader, vectorized
+from .constants import RiskLevel, RTField, ADTRecommendation
+from .decision import Case, ENUM_FIELDS, BOOL_FIELDS
+
+FORMAT_VERSION = "1"
+
+# Rows per record batch written to IPC files (bounds per-batch scoring memory)
+BATCH_ROWS = 1 << 20
+
+OUTPUT_ENUMS = {
+    'risk': RiskLevel,
+    'rt_field': RTField,
+    'adt': ADTRecommendation,
+}
+
+_DICT_TYPE = pa.dictionary(pa.int8(), pa.string())
+
+# Enum type -> canonical dictionary (member names in definition order)
+_DICTIONARIES = {
+    enum_cls: pa.array([m.name for m in enum_cls], pa.string())
+    for enum_cls in list(ENUM_FIELDS.values()) + list(OUTPUT_ENUMS.values())
+}
+
+INPUT_SCHEMA = pa.schema(
+    [pa.field('psa_pre_srt', pa.float64(), nullable=False), pa.field('psadt_months', pa.float64())]
+    + [pa.field(name, _DICT_TYPE, nullable=False) for name in ENUM_FIELDS]
+    + [pa.field(name, pa.bool_(), nullable=False) for name in BOOL_FIELDS]
+)
+
+OUTPUT_SCHEMA = pa.schema(
+    [pa.field(name, _DICT_TYPE, nullable=False) for name in OUTPUT_ENUMS]
+    + [
+        pa.field('arr_5yr', pa.float64()),
+        pa.field('nnt', pa.int16()),
+        pa.field('baseline_risk', pa.float64(), nullable=False),
+    ]
+)
+
+def enum_array(enum_codes, enum_cls) -> pa.DictionaryArray:
+    """Dictionary-encoded column from integer codes (definition order)."""
+    indices = pa.array(np.asarray(enum_codes, dtype=np.int8), pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, _DICTIONARIES[enum_cls])
+
+def enum_codes(column, enum_cls) -> np.ndarray:
+    """
+    int8 codes of a dictionary-encoded enum column (Array or single-chunk ChunkedArray).
+    Zero-copy when the column uses the canonical dictionary; columns written by
+    other tools with a different dictionary order are remapped.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+    canonical = _DICTIONARIES[enum_cls]
+    indices = column.indices.to_numpy(zero_copy_only=column.null_count == 0 and column.indices.type == pa.int8())
+    if column.dictionary.equals(canonical):
+        return indices
+    lookup = {name: i for i, name in enumerate(canonical.to_pylist())}
+    try:
+        remap = np.array([lookup[name] for name in column.dictionary.to_pylist()], dtype=np.int8)
+    except KeyError as e:
+        raise ValueError(f"Unknown {enum_cls.__name__} value in cohort: {e}") from None
+    return remap[indices]
+
+def cases_to_table(cases) -> pa.Table:
+    """Cohort table (INPUT_SCHEMA) from an iterable of decision.Case."""
+    cases = list(cases)
+    columns = {
+        'psa_pre_srt': pa.array([c.psa_pre_srt for c in cases], pa.float64()),
+        'psadt_months': pa.array([c.psadt_months for c in cases], pa.float64()),
+    }
+    for name, enum_cls in ENUM_FIELDS.items():
+        code_of = vectorized.codes(enum_cls)
+        columns[name] = enum_array([code_of[getattr(c, name)] for c in cases], enum_cls)
+    for name in BOOL_FIELDS:
+        columns[name] = pa.array([getattr(c, name) for c in cases], pa.bool_())
+    return pa.Table.from_pydict(columns, schema=INPUT_SCHEMA)
+
+def table_to_cases(table):
+    """Yields decision.Case objects back from a cohort table."""
+    members = {name: tuple(enum_cls) for name, enum_cls in ENUM_FIELDS.items()}
+    for batch in table.to_batches():
+        cols = batch_columns(batch)
+        for i in range(batch.num_rows):
+            psadt = cols['psadt_months'][i]
+            fields = {name: members[name][cols[name][i]] for name in ENUM_FIELDS}
+            fields.update({name: bool(cols[name][i]) for name in BOOL_FIELDS})
+            yield Case(
+                psa_pre_srt=float(cols['psa_pre_srt'][i]),
+                psadt_months=None if np.isnan(psadt) else float(psadt),
+                **fields
+            )
+
+def batch_columns(batch) -> dict:
+    """
+    numpy input columns of a record batch in the layout vectorized.py expects.
+    Enum codes and PSA are zero-copy views; PSADT nulls become NaN.
+    """
+    cols = {name: enum_codes(batch.column(name), enum_cls) for name, enum_cls in ENUM_FIELDS.items()}
+    psa = batch.column('psa_pre_srt')
+    cols['psa_pre_srt'] = psa.to_numpy(zero_copy_only=psa.null_count == 0)
+    cols['psadt_months'] = batch.column('psadt_months').to_numpy(zero_copy_only=False)
+    for name in BOOL_FIELDS:
+        # Arrow packs booleans as bits, so these are always converted
+        cols[name] = batch.column(name).to_numpy(zero_copy_only=False)
+    return cols
+
+def score(table, rules=None, rules_version=None) -> pa.Table:
+    """
+    Appends the decision outputs (OUTPUT_SCHEMA) to a cohort table, batch by batch,
+    using the vectorized pipeline. Records the benefit-tables version in the schema
+    metadata, and the rule-set version: the shipped rules' version by default; with
+    custom rules, only when rules_version is given (their version isn't known here).
+    """
+    if rules is None:
+        rules, rules_version = config_loader.load_rules(), config_loader.rules_version()
+    tables_version = benefit_tables.tables_version()
+    schema = pa.unify_schemas([INPUT_SCHEMA, OUTPUT_SCHEMA])
+    batches = []
+    for batch in table.select(INPUT_SCHEMA.names).to_batches():
+        out = vectorized.evaluate_columns(batch_columns(batch), rules)
+        arrays = [batch.column(name) for name in INPUT_SCHEMA.names]
+        arrays += [enum_array(out[name], enum_cls) for name, enum_cls in OUTPUT_ENUMS.items()]
+        arrays += [
+            pa.array(out['arr_5yr'], pa.float64(), from_pandas=True),
+            pa.array(out['nnt'], pa.int16(), mask=out['nnt'] < 0),
+            pa.array(out['baseline_risk'], pa.float64()),
+        ]
+        batches.append(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    metadata = {b'cohort_format': FORMAT_VERSION.encode(), b'tables_version': tables_version.encode()}
+    if rules_version is not None:
+        metadata[b'rules_version'] = rules_version.encode()
+    return pa.Table.from_batches(batches, schema=schema.with_metadata(metadata))
+
+def write_cohort(table, path):
+    """Writes a cohort as Arrow IPC (.arrow/.feather, memory-mappable) or Parquet (.parquet)."""
+    if path.endswith('.parquet'):
+        pq.write_table(table, path)
+        return
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=BATCH_ROWS)
+
+def read_cohort(path) -> pa.Table:
+    """
+    Reads a cohort. Arrow IPC files are memory-mapped: columns reference the
+    mapped file rather than being copied into memory.
+    """
+    if path.endswith('.parquet'):
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
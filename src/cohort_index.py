@@ -0,0 +1,227 @@
+"""
+Bitmap index over a scored cohort (see cohort.py) for sub-population queries.
+
+Every enum code, flag and PSA/PSADT band gets a bitmap (one bit per patient,
+packed into uint64 words). A query ANDs a few bitmaps and popcounts the result,
+so it never scans the patient rows.
+Range predicates (e.g. PSADT <= 6) are answered from the band bitmaps. When a
+threshold falls inside a band, only that band's rows are re-checked.
+
+    index = CohortIndex(cohort.score(table))
+    index.count(risk="VERY_HIGH", psadt_months=("<=", 6), pet_findings="NOT_PERFORMED")
+    index.group_count("adt", risk="HIGH", has_cardio=True)
+    (index.bitmap("risk", "HIGH") | index.bitmap("risk", "VERY_HIGH")).count()
+"""
+import numpy as np
+
+from . import cohort
+from .decision import ENUM_FIELDS, BOOL_FIELDS
+
+# Band upper edges; band i holds values in (edge[i-1], edge[i]], so the
+# thresholds used by the decision rules (PSA 0.3/0.7, PSADT 6/12) are band edges
+PSA_BAND_EDGES = (0.2, 0.3, 0.5, 0.7, 1.0, 2.0)
+PSADT_BAND_EDGES = (3.0, 6.0, 9.0, 12.0, 18.0, 24.0)
+BAND_FIELDS = {'psa_pre_srt': PSA_BAND_EDGES, 'psadt_months': PSADT_BAND_EDGES}
+
+_OPS = ('<', '<=', '>', '>=', '==')
+
+class Bitmap:
+    """Fixed-size bitset over n rows, stored as little-endian uint64 words."""
+    __slots__ = ('words', 'n')
+
+    def __init__(self, words, n):
+        self.words = words
+        self.n = n
+
+    @classmethod
+    def from_mask(cls, mask) -> "Bitmap":
+        packed = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+        padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+        padded[:len(packed)] = packed
+        return cls(padded.view(np.uint64), len(mask))
+
+    @classmethod
+    def from_rows(cls, rows, n) -> "Bitmap":
+        mask = np.zeros(n, dtype=bool)
+        mask[rows] = True
+        return cls.from_mask(mask)
+
+    @classmethod
+    def full(cls, n) -> "Bitmap":
+        return cls.from_mask(np.ones(n, dtype=bool))
+
+    def __and__(self, other):
+        return Bitmap(self.words & other.words, self.n)
+
+    def __or__(self, other):
+        return Bitmap(self.words | other.words, self.n)
+
+    def __invert__(self):
+        # Clear the padding bits past n so counts stay correct
+        return Bitmap(~self.words, self.n) & Bitmap.full(self.n)
+
+    def count(self) -> int:
+        return int(np.bitwise_count(self.words).sum())
+
+    def to_mask(self) -> np.ndarray:
+        return np.unpackbits(self.words.view(np.uint8), count=self.n, bitorder='little').astype(bool)
+
+    def rows(self) -> np.ndarray:
+        """Row numbers (cohort table positions) of the set bits."""
+        return np.flatnonzero(self.to_mask())
+
+def _band_bounds(edges):
+    """(lo, hi] per band, with open ends."""
+    lows = (-np.inf,) + tuple(edges)
+    highs = tuple(edges) + (np.inf,)
+    return list(zip(lows, highs))
+
+def _band_coverage(op, value, lo, hi):
+    """'all', 'none' or 'some': how many values in (lo, hi] satisfy `x op value`."""
+    if op == '<=':
+        return 'all' if hi <= value else 'none' if lo >= value else 'some'
+    if op == '<':
+        return 'all' if hi < value else 'none' if lo >= value else 'some'
+    if op == '>':
+        return 'all' if lo >= value else 'none' if hi <= value else 'some'
+    if op == '>=':
+        return 'all' if lo >= value else 'none' if hi < value else 'some'
+    return 'none' if value <= lo or value > hi else 'some'
+
+def _compare(values, op, value):
+    if op == '<':
+        return values < value
+    if op == '<=':
+        return values <= value
+    if op == '>':
+        return values > value
+    if op == '>=':
+        return values >= value
+    return values == value
+
+class CohortIndex:
+    """Bitmap index over a cohort table (inputs, plus outputs when scored)."""
+
+    def __init__(self, table):
+        batches = table.to_batches()
+        self.n = table.num_rows
+        self.enums = {name: enum_cls for name, enum_cls in ENUM_FIELDS.items()}
+        self.enums.update({name: enum_cls for name, enum_cls in cohort.OUTPUT_ENUMS.items() if name in table.column_names})
+
+        self._enum_bitmaps = {}
+        for name, enum_cls in self.enums.items():
+            codes = np.concatenate([cohort.enum_codes(b.column(name), enum_cls) for b in batches]) if batches else np.zeros(0, np.int8)
+            self._enum_bitmaps[name] = [Bitmap.from_mask(codes == i) for i in range(len(enum_cls))]
+
+        self._flag_bitmaps = {}
+        for name in BOOL_FIELDS:
+            values = np.concatenate([b.column(name).to_numpy(zero_copy_only=False) for b in batches]) if batches else np.zeros(0, bool)
+            self._flag_bitmaps[name] = Bitmap.from_mask(values)
+
+        self._bands = {}
+        for name, edges in BAND_FIELDS.items():
+            values = np.concatenate([b.column(name).to_numpy(zero_copy_only=False) for b in batches]).astype(np.float64) if batches else np.zeros(0)
+            known = ~np.isnan(values)
+            band = np.searchsorted(edges, values, side='left')
+            bitmaps = [Bitmap.from_mask(known & (band == i)) for i in range(len(edges) + 1)]
+            self._bands[name] = (edges, bitmaps, values, Bitmap.from_mask(~known))
+
+        self._all = Bitmap.full(self.n)
+
+    # --- Bitmaps ---
+
+    def _enum_code(self, field, value):
+        enum_cls = self.enums[field]
+        if isinstance(value, enum_cls):
+            member = value
+        elif isinstance(value, str) and value in enum_cls.__members__:
+            member = enum_cls[value]
+        else:
+            raise ValueError(f"invalid {field}: {value!r} (expected one of {', '.join(enum_cls.__members__)})")
+        return list(enum_cls).index(member)
+
+    def _range(self, field, op, value) -> Bitmap:
+        if op not in _OPS:
+            raise ValueError(f"invalid operator for {field}: {op!r} (expected one of {', '.join(_OPS)})")
+        edges, bitmaps, values, _ = self._bands[field]
+        result = Bitmap.from_mask(np.zeros(self.n, dtype=bool))
+        for (lo, hi), band in zip(_band_bounds(edges), bitmaps):
+            coverage = _band_coverage(op, value, lo, hi)
+            if coverage == 'all':
+                result = result | band
+            elif coverage == 'some':
+                # Threshold inside this band: re-check only the band's rows
+                rows = band.rows()
+                result = result | Bitmap.from_rows(rows[_compare(values[rows], op, value)], self.n)
+        return result
+
+    def bitmap(self, field, value) -> Bitmap:
+        """
+        Rows matching one condition:
+            enum field  -> member, name, or a list of them (any of)
+            flag        -> True / False
+            psa_pre_srt / psadt_months -> (op, number), a list of those (all of),
+                           or None for unknown PSADT
+        """
+        if field in self.enums:
+            if isinstance(value, (list, tuple, set, frozenset)):
+                result = Bitmap.from_mask(np.zeros(self.n, dtype=bool))
+                for v in value:
+                    result = result | self._enum_bitmaps[field][self._enum_code(field, v)]
+                return result
+            return self._enum_bitmaps[field][self._enum_code(field, value)]
+
+        if field in self._flag_bitmaps:
+            if not isinstance(value, bool):
+                raise ValueError(f"invalid {field}: {value!r} (expected true/false)")
+            flag = self._flag_bitmaps[field]
+            return flag if value else ~flag
+
+        if field in self._bands:
+            if value is None:
+                return self._bands[field][3]
+            conditions = value if isinstance(value, list) else [value]
+            result = self._all
+            for op, number in conditions:
+                result = result & self._range(field, op, float(number))
+            return result
+
+        raise ValueError(f"unknown field: {field}")
+
+    # --- Queries ---
+
+    def where(self, **filters) -> Bitmap:
+        """Rows matching every filter (see bitmap() for the value forms)."""
+        result = self._all
+        for field, value in filters.items():
+            result = result & self.bitmap(field, value)
+        return result
+
+    def count(self, **filters) -> int:
+        return self.where(**filters).count()
+
+    def rows(self, **filters) -> np.ndarray:
+        return self.where(**filters).rows()
+
+    def group_count(self, by, **filters) -> dict:
+        """
+        Counts per value of `by` among rows matching the filters.
+        by: an enum field or flag (keys: member names / True, False),
+        or a banded field (keys: "(lo, hi]" labels and "unknown").
+        """
+        selected = self.where(**filters)
+        if by in self._enum_bitmaps:
+            return {m.name: (selected & bm).count() for m, bm in zip(self.enums[by], self._enum_bitmaps[by])}
+        if by in self._flag_bitmaps:
+            flag = self._flag_bitmaps[by]
+            return {True: (selected & flag).count(), False: (selected & ~flag).count()}
+        if by in self._bands:
+            edges, bitmaps, _, unknown = self._bands[by]
+            counts = {
+                f"({lo:g}, {hi:g}]": (selected & bm).count()
+                for (lo, hi), bm in zip(_band_bounds(edges), bitmaps)
+            }
+            if unknown.count():
+                counts['unknown'] = (selected & unknown).count()
+            return counts
+        raise ValueError(f"unknown field: {by}")
@@ -1,21 +1,84 @@
 import csv
+import hashlib
+import io
 import os
-from .constants import RiskLevel, GleasonScore, TumorStage, PetFindings, MarginStatus
+from . import metrics
+from .constants import RiskLevel, GleasonScore, TumorStage, PetFindings, MarginStatus, NodalStage
 
-def load_rules(csv_path="config/risk_rules.csv"):
+# Next to the package, so imports work from any working directory
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "risk_rules.csv")
+
+# abs path -> (mtime_ns, size, rules, version)
+_RULES_CACHE = {}
+
+def _read_rules(csv_path):
+    """
+    Reads and parses the CSV once per file change.
+    Returns (rules, version); version is a short content hash ('' if no file).
+    """
+    try:
+        st = os.stat(csv_path)
+    except OSError:
+        return [], ""
+
+    key = os.path.abspath(csv_path)
+    cached = _RULES_CACHE.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2], cached[3]
+
+    with open(csv_path, 'rb') as f:
+        raw = f.read()
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    reader = csv.DictReader(io.StringIO(raw.decode('utf-8'), newline=''))
+    # Comment rows ("# ...") are notes, not rules
+    rules = [row for row in reader if not is_comment_row(row)]
+
+    _RULES_CACHE[key] = (st.st_mtime_ns, st.st_size, rules, version)
+    metrics.RULE_RELOADS.inc()
+    return rules, version
+
+def is_comment_row(row) -> bool:
+    """True for rows whose first cell starts with '#' (or is empty)."""
+    first = (row.get('risk_level') or '').strip()
+    return not first or first.startswith('#')
+
+def load_rules(csv_path=DEFAULT_RULES_PATH):
     """
     Loads rules from CSV.
     Returns a list of dicts: [{'risk': 'HIGH', 'var': 'gleason', 'op': 'IN', 'val': 'GG4;GG5'}, ...]
+    The parsed rules are cached and only re-read when the file changes.
     """
-    rules = []
-    if not os.path.exists(csv_path):
-        return []
-        
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rules.append(row)
-    return rules
+    rules, _ = _read_rules(csv_path)
+    return list(rules)
+
+def rules_version(csv_path=DEFAULT_RULES_PATH) -> str:
+    """
+    Short content hash of the rule set; changes whenever the CSV is edited.
+    Used to key and invalidate caches of anything derived from the rules.
+    """
+    _, version = _read_rules(csv_path)
+    return version
+
+def parse_rule_value(var_name, val_str):
+    """
+    Parses a rule's value cell based on the variable type.
+    Shared by the scalar rule check and the vectorized evaluator (vectorized.py).
+    """
+    if var_name == 'gleason':
+        return [getattr(GleasonScore, v.strip()) for v in val_str.split(';')] if ';' in val_str else getattr(GleasonScore, val_str.strip())
+    if var_name == 'stage':
+         return getattr(TumorStage, val_str.strip())
+    if var_name == 'pet_findings':
+        return [getattr(PetFindings, v.strip()) for v in val_str.split(';')] if ';' in val_str else getattr(PetFindings, val_str.strip())
+    if var_name == 'margin':
+        return getattr(MarginStatus, val_str.strip())
+    if var_name == 'n_stage':
+        return [getattr(NodalStage, v.strip()) for v in val_str.split(';')] if ';' in val_str else getattr(NodalStage, val_str.strip())
+    if var_name in ['psadt_months', 'psa_pre_srt']:
+         return float(val_str)
+    if var_name == 'has_psa_persistence':
+         return val_str.lower() == 'true'
+    return val_str
 
 def evaluate_risk_from_rules(inputs, rules):
     """
@@ -25,36 +88,22 @@ def evaluate_risk_from_rules(inputs, rules):
     if not rules:
         return None # Fallback to hardcoded
 
-    # Helper to parse value based on variable type
-    def parse_val(var_name, val_str):
-        if var_name == 'gleason':
-            return [getattr(GleasonScore, v.strip()) for v in val_str.split(';')] if ';' in val_str else getattr(GleasonScore, val_str.strip())
-        if var_name == 'stage':
-             return getattr(TumorStage, val_str.strip())
-        if var_name == 'pet_findings':
-            return [getattr(PetFindings, v.strip()) for v in val_str.split(';')] if ';' in val_str else getattr(PetFindings, val_str.strip())
-        if var_name in ['psadt_months', 'psa_pre_srt']:
-             return float(val_str)
-        if var_name == 'has_psa_persistence':
-             return val_str.lower() == 'true'
-        return val_str
-
     # Evaluate VERY HIGH rules first
     for r in rules:
         if r['risk_level'] == 'VERY_HIGH':
-            if check_rule(inputs, r, parse_val):
+            if check_rule(inputs, r, parse_rule_value):
                 return RiskLevel.VERY_HIGH
 
     # Evaluate HIGH rules first
     for r in rules:
         if r['risk_level'] == 'HIGH':
-            if check_rule(inputs, r, parse_val):
+            if check_rule(inputs, r, parse_rule_value):
                 return RiskLevel.HIGH
                 
     # Evaluate INTERMEDIATE
     for r in rules:
         if r['risk_level'] == 'INTERMEDIATE':
-            if check_rule(inputs, r, parse_val):
+            if check_rule(inputs, r, parse_rule_value):
                 return RiskLevel.INTERMEDIATE
                 
     return None
@@ -84,6 +133,12 @@ def check_rule(inputs, rule, parser):
         elif op == 'GT':
             target = parser(var, val_raw)
             return input_val > target
+        elif op == 'LE':
+            target = parser(var, val_raw)
+            return input_val <= target
+        elif op == 'GE':
+            target = parser(var, val_raw)
+            return input_val >= target
         elif op == 'BETWEEN':
             # Val format: "min;max"
             parts = val_raw.split(';')
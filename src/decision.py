@@ -0,0 +1,180 @@
+"""
+Embeddable decision API: stdlib only (no Streamlit, plotly or fpdf).
+
+    from src.decision import Case, evaluate
+    case = Case.from_dict({"psa_pre_srt": 0.5, "gleason": "ISUP4", "stage": "PT3A",
+                           "margin": "R1", "pet_findings": "NEGATIVE", "life_expectancy": "LONG"})
+    evaluate(case).adt  # ADTRecommendation.LONG
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from . import logic
+from .constants import (
+    RiskLevel, RTField, ADTRecommendation,
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+# Enum case fields -> enum type
+ENUM_FIELDS = {
+    'gleason': GleasonScore,
+    'stage': TumorStage,
+    'n_stage': NodalStage,
+    'margin': MarginStatus,
+    'pet_findings': PetFindings,
+    'life_expectancy': LifeExpectancy,
+}
+BOOL_FIELDS = ('has_psa_persistence', 'has_cardio', 'has_metabolic', 'has_bone', 'has_libido_concern')
+
+def _parse_table(enum_cls) -> dict:
+    """Member name (any case) and display label -> member."""
+    table = {}
+    for member in enum_cls:
+        table[member.name] = member
+        table[member.name.lower()] = member
+        table[member.value] = member
+    return table
+
+# Built once at import, so parsing a string is a single dict lookup
+_PARSE_TABLES = {enum_cls: _parse_table(enum_cls) for enum_cls in ENUM_FIELDS.values()}
+
+def parse_enum(enum_cls, value):
+    """Member for a member, name (any case) or display label; raises ValueError otherwise."""
+    if isinstance(value, enum_cls):
+        return value
+    member = _PARSE_TABLES[enum_cls].get(value) if isinstance(value, str) else None
+    if member is None:
+        raise ValueError(f"invalid {enum_cls.__name__}: {value!r} (expected one of {', '.join(enum_cls.__members__)})")
+    return member
+
+def _number(data, field, required):
+    val = data.get(field)
+    if val is None:
+        if required:
+            raise ValueError(f"missing field: {field}")
+        return None
+    # bool is an int subclass; reject it explicitly
+    if isinstance(val, bool) or not isinstance(val, (int, float)):
+        raise ValueError(f"invalid {field}: {val!r} (expected a non-negative number)")
+    try:
+        number = float(val)
+    except (OverflowError, TypeError):
+        # JSON integers have no size limit (e.g. 10**400); don't echo the digits back
+        raise ValueError(f"invalid {field}: out of range (expected a non-negative number)") from None
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"invalid {field}: {val!r} (expected a non-negative number)")
+    return number
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    """One patient case (the inputs of the decision pipeline)."""
+    psa_pre_srt: float
+    gleason: GleasonScore
+    stage: TumorStage
+    margin: MarginStatus
+    pet_findings: PetFindings
+    life_expectancy: LifeExpectancy
+    n_stage: NodalStage = NodalStage.NX
+    psadt_months: Optional[float] = None
+    has_psa_persistence: bool = False
+    has_cardio: bool = False
+    has_metabolic: bool = False
+    has_bone: bool = False
+    has_libido_concern: bool = False
+
+    @classmethod
+    def from_dict(cls, data) -> "Case":
+        """
+        Validated Case from a mapping (JSON payload or ui.render_inputs dict).
+        Enums may be members, names or labels; n_stage defaults to NX, flags to False.
+        Raises ValueError with a user-facing message on invalid input.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("case must be a JSON object")
+        fields = {}
+        for field, enum_cls in ENUM_FIELDS.items():
+            val = data.get(field)
+            if val is None:
+                if field == 'n_stage':
+                    continue
+                raise ValueError(f"missing field: {field}")
+            try:
+                fields[field] = parse_enum(enum_cls, val)
+            except ValueError:
+                raise ValueError(f"invalid {field}: {val!r} (expected one of {', '.join(enum_cls.__members__)})") from None
+
+        fields['psa_pre_srt'] = _number(data, 'psa_pre_srt', required=True)
+        fields['psadt_months'] = _number(data, 'psadt_months', required=False)
+
+        for field in BOOL_FIELDS:
+            val = data.get(field, False)
+            if not isinstance(val, bool):
+                raise ValueError(f"invalid {field}: {val!r} (expected true/false)")
+            fields[field] = val
+        return cls(**fields)
+
+    def to_inputs(self) -> dict:
+        """The loose inputs dict used by the Streamlit pipeline and cache fingerprint."""
+        return {field: getattr(self, field) for field in self.__dataclass_fields__}
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    """Pipeline output for one case."""
+    risk: RiskLevel
+    rt_field: RTField
+    adt: ADTRecommendation
+    arr_5yr: Union[float, str]
+    nnt: Union[int, str]
+    baseline_risk: float
+
+    @property
+    def benefits(self) -> dict:
+        """Same shape as logic.get_absolute_benefits."""
+        return {'arr_5yr': self.arr_5yr, 'nnt': self.nnt}
+
+    def to_dict(self) -> dict:
+        """JSON-able view: enum names plus display labels."""
+        return {
+            'risk': self.risk.name,
+            'risk_label': self.risk.value,
+            'rt_field': self.rt_field.name,
+            'rt_field_label': self.rt_field.value,
+            'adt': self.adt.name,
+            'adt_label': self.adt.value,
+            'benefits': self.benefits,
+            'baseline_risk': self.baseline_risk,
+        }
+
+def evaluate(case: Case) -> Decision:
+    """Runs the full decision pipeline (risk, RT field, ADT, benefits, baseline risk) for one case."""
+    risk = logic.classify_risk(
+        case.psa_pre_srt,
+        case.gleason,
+        case.stage,
+        case.psadt_months,
+        case.pet_findings,
+        case.margin,
+        case.n_stage,
+        case.has_psa_persistence
+    )
+    adt = logic.suggest_adt(
+        risk=risk,
+        life_expectancy=case.life_expectancy,
+        has_cardio_risk=case.has_cardio,
+        has_severe_metabolic=case.has_metabolic
+    )
+    benefits = logic.get_absolute_benefits(risk, adt)
+    return Decision(
+        risk=risk,
+        rt_field=logic.suggest_rt_field(risk=risk, pet_findings=case.pet_findings),
+        adt=adt,
+        arr_5yr=benefits['arr_5yr'],
+        nnt=benefits['nnt'],
+        baseline_risk=logic.get_baseline_recurrence_risk(risk),
+    )
+
+def evaluate_many(cases):
+    """Lazily evaluates an iterable of cases (yields Decisions in order)."""
+    for case in cases:
+        yield evaluate(case)
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from . import metrics
+
+# Artifact types stored in the shared cache
+ARTIFACT_KINDS = ("figure", "chart_png", "pdf", "summary")
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Only refresh last_access on reads when it is older than this (seconds),
+# so hot entries don't turn every lookup into a write
+_TOUCH_INTERVAL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    meta TEXT,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_lru ON artifacts (last_access);
+"""
+
+def artifact_key(kind, fingerprint, rules_version) -> str:
+    """Content address of an artifact: artifact type + rule-set version + input fingerprint."""
+    raw = f"{kind}:{rules_version}:{fingerprint}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class DiskCache:
+    """
+    Content-addressed artifact cache in a SQLite file (WAL mode), shared by
+    every Streamlit replica on the host and kept across restarts/deploys.
+
+    Writes are single transactions (insert + LRU eviction), so readers never
+    see a partial artifact. Total stored bytes are bounded by max_bytes,
+    evicting least recently used entries first. Any SQLite error is treated
+    as a cache miss so the app keeps working without the cache.
+    """
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        # sqlite3 connections can't be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, kind, fingerprint, rules_version):
+        """Returns (value bytes, meta str or None), or None on a miss."""
+        key = artifact_key(kind, fingerprint, rules_version)
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, meta, last_access FROM artifacts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                metrics.CACHE_MISSES.labels(f"disk_{kind}").inc()
+                return None
+            metrics.CACHE_HITS.labels(f"disk_{kind}").inc()
+            now = time.time()
+            if now - row[2] > _TOUCH_INTERVAL:
+                conn.execute("UPDATE artifacts SET last_access = ? WHERE key = ?", (now, key))
+            return bytes(row[0]), row[1]
+        except sqlite3.Error as e:
+            print(f"Disk cache read failed: {e}")
+            return None
+
+    def get(self, kind, fingerprint, rules_version):
+        """Returns the artifact bytes, or None on a miss."""
+        entry = self.get_entry(kind, fingerprint, rules_version)
+        return entry[0] if entry else None
+
+    def put(self, kind, fingerprint, rules_version, value, meta=None):
+        """Stores an artifact (bytes or str) and evicts LRU entries beyond max_bytes."""
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}")
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        if len(value) > self.max_bytes:
+            return
+
+        key = artifact_key(kind, fingerprint, rules_version)
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (key, kind, size, last_access, meta, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, kind, len(value), time.time(), meta, value)
+                )
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"Disk cache write failed: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM artifacts ORDER BY last_access").fetchall():
+            conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        """Entry count and stored bytes per artifact kind ({} when the cache can't be read)."""
+        try:
+            rows = self._conn().execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM artifacts GROUP BY kind"
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Disk cache read failed: {e}")
+            return {}
+        return {kind: {'entries': n, 'bytes': size} for kind, n, size in rows}
+
+_shared = {'cache': None, 'configured': False}
+_shared_lock = threading.Lock()
+
+def get_shared_cache():
+    """
+    Process-wide DiskCache configured from the environment, or None when disabled.
+    ADT_CACHE_DIR enables it (cache file: <dir>/artifacts.sqlite);
+    ADT_CACHE_MAX_MB bounds its size (default 256). An invalid setting or an
+    unusable cache file is reported once and leaves only the in-memory caches.
+    """
+    with _shared_lock:
+        if not _shared['configured']:
+            cache_dir = os.environ.get("ADT_CACHE_DIR")
+            if cache_dir:
+                try:
+                    raw = os.environ.get("ADT_CACHE_MAX_MB", "256")
+                    max_mb = float(raw)
+                    if not 0 < max_mb < float('inf'):
+                        raise ValueError(f"Invalid ADT_CACHE_MAX_MB: {raw!r}")
+                    _shared['cache'] = DiskCache(
+                        os.path.join(cache_dir, "artifacts.sqlite"),
+                        max_bytes=int(max_mb * 1024 * 1024)
+                    )
+                except Exception as e:
+                    print(f"Disk cache disabled: {e}")
+            _shared['configured'] = True
+        return _shared['cache']
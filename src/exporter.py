@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import disk_cache, metrics, telemetry, utils, visuals
+
+class ExportJob:
+    """
+    One background report render. Progress is written by the worker thread and
+    read by the UI poller; a float and a string are safe to swap without a lock.
+    """
+    def __init__(self, key):
+        self.key = key
+        self.progress = 0.0
+        self.message = "Na fila..."
+        self.future = None
+        self.failed_at = None
+
+    def update(self, progress, message):
+        self.progress = progress
+        self.message = message
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+class ExportManager:
+    """
+    Runs report exports on a bounded thread pool.
+
+    - Finished results are kept in an LRU keyed by job key (input fingerprint,
+      rule-set version and chart mode), so the same report is rendered once.
+    - Identical concurrent requests are coalesced onto the in-flight job.
+    - At most max_pending jobs are queued or running; submit() returns None
+      beyond that so the caller can ask the user to retry.
+    - Failed jobs stay visible for error_ttl seconds so the UI can report them,
+      then are dropped.
+    """
+    def __init__(self, max_workers=2, max_pending=8, max_results=64, error_ttl=300):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._results = OrderedDict()
+        self.max_pending = max_pending
+        self.max_results = max_results
+        self.error_ttl = error_ttl
+
+    def result(self, key, loader=None):
+        """
+        Cached result for key, or None.
+        On a miss, loader() (e.g. a disk cache lookup) may supply the result.
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        if loader is None:
+            return None
+        result = loader()
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def _expire_failed(self):
+        # Caller holds the lock
+        cutoff = time.monotonic() - self.error_ttl
+        for key in [k for k, j in self._jobs.items() if j.failed_at is not None and j.failed_at <= cutoff]:
+            del self._jobs[key]
+
+    def job(self, key):
+        """In-flight (or recently failed) job for key, or None."""
+        with self._lock:
+            self._expire_failed()
+            return self._jobs.get(key)
+
+    def active(self) -> int:
+        """Number of jobs queued or running."""
+        with self._lock:
+            self._expire_failed()
+            return sum(1 for job in self._jobs.values() if not job.done())
+
+    def submit(self, key, fn, *args):
+        """
+        Schedules fn(job, *args) unless the result is cached or already in flight.
+        Returns the job (None when the result is cached or the queue is full).
+        """
+        with self._lock:
+            if key in self._results:
+                return None
+            self._expire_failed()
+            job = self._jobs.get(key)
+            if job is not None and not (job.done() and job.future.exception()):
+                return job
+            if sum(1 for j in self._jobs.values() if not j.done()) >= self.max_pending:
+                return None
+            job = ExportJob(key)
+            self._jobs[key] = job
+            job.future = self._executor.submit(self._run, job, fn, args)
+            return job
+
+    def _run(self, job, fn, args):
+        # On failure the job stays in _jobs for error_ttl so the UI can show
+        # the error; a resubmit replaces it
+        started = time.perf_counter()
+        try:
+            result = fn(job, *args)
+        except Exception:
+            job.failed_at = time.monotonic()
+            metrics.EXPORTS.labels('error').inc()
+            telemetry.record('export', outcome='error', duration_ms=(time.perf_counter() - started) * 1000)
+            raise
+        metrics.EXPORTS.labels('ok').inc()
+        telemetry.record('export', outcome='ok', duration_ms=(time.perf_counter() - started) * 1000)
+        self._remember(job.key, result)
+        with self._lock:
+            self._jobs.pop(job.key, None)
+        return result
+
+def job_key(fingerprint, rules_version, chart_mode) -> str:
+    return f"pdf:{fingerprint}:{rules_version}:{chart_mode}"
+
+def load_cached_report(fingerprint, rules_version, chart_mode):
+    """Report from the shared disk cache (see disk_cache.py), or None."""
+    store = disk_cache.get_shared_cache()
+    if store is None:
+        return None
+    entry = store.get_entry('pdf', f"{fingerprint}:{chart_mode}", rules_version)
+    if entry is None or entry[1] is None:
+        return None
+    return {'pdf': entry[0], 'stats': json.loads(entry[1])}
+
+def _chart_png(name, builder, args, chart_mode, width_mm):
+    """Renders a chart PNG, going through the shared disk cache when enabled."""
+    store = disk_cache.get_shared_cache()
+    # Charts only depend on their numeric arguments and render settings
+    fp = f"{name}:{':'.join(repr(a) for a in args)}:{chart_mode}:{width_mm}"
+    if store is not None:
+        cached = store.get('chart_png', fp, "")
+        if cached is not None:
+            return cached
+    with metrics.FIGURE_SECONDS.labels(name).time():
+        fig = builder(*args)
+    png = visuals.get_chart_image(fig, mode=chart_mode, width_mm=width_mm)
+    if store is not None:
+        store.put('chart_png', fp, "", png)
+    return png
+
+def build_pdf_report(job, inputs, result, chart_mode, fingerprint=None, rules_version=None) -> dict:
+    """
+    Renders the charts and compiles the PDF for one pipeline result.
+    Returns {'pdf': bytes, 'stats': utils.report_size_stats(...)}.
+    With a fingerprint, the report is also stored in the shared disk cache.
+    """
+    benefit_data = result['benefits']
+    visuals_map = {}
+    if benefit_data['arr_5yr'] != 0.0:
+        # Compact mode renders each chart at its width in the PDF layout
+        slots = utils.ReportTemplate.CHART_SLOTS
+
+        job.update(0.1, "Gerando gráfico de benefício...")
+        visuals_map['arr_gauge'] = _chart_png(
+            "arr_gauge", visuals.create_arr_gauge, (benefit_data['arr_5yr'],),
+            chart_mode, slots['arr_gauge'][1]
+        )
+
+        job.update(0.5, "Gerando gráfico de 100 pacientes...")
+        visuals_map['waffle'] = _chart_png(
+            "waffle", visuals.create_waffle_chart, (benefit_data['arr_5yr'], result['baseline_risk']),
+            chart_mode, slots['waffle'][1]
+        )
+
+    job.update(0.9, "Compilando PDF...")
+    pdf_bytes = utils.create_pdf(inputs, result['risk'], result['rt_field'], result['adt'], benefit_data, visuals_map)
+    report = {'pdf': pdf_bytes, 'stats': utils.report_size_stats(pdf_bytes, visuals_map)}
+
+    store = disk_cache.get_shared_cache()
+    if store is not None and fingerprint is not None:
+        store.put('pdf', f"{fingerprint}:{chart_mode}", rules_version, pdf_bytes, meta=json.dumps(report['stats']))
+
+    job.update(1.0, "Pronto")
+    return report
+
+# Shared by every session in this process, so identical exports coalesce
+MANAGER = ExportManager(max_workers=int(os.environ.get("ADT_EXPORT_WORKERS", "2")))
+metrics.Gauge("adt_export_jobs_active", "PDF export jobs queued or running.", MANAGER.active)
+metrics.Gauge("adt_export_workers", "PDF renderer threads in the export pool.", lambda: MANAGER.max_workers)
@@ -1,8 +1,16 @@
+from . import metrics
 from .constants import (
     RiskLevel, RTField, ADTRecommendation,
     GleasonScore, TumorStage, PetFindings, LifeExpectancy, MarginStatus, NodalStage
 )
 
+# Risk cut-offs used by classify_risk (the CSV rules mirror some of them)
+PSA_INTERMEDIATE_CUTOFF = 0.3   # PSA > 0.3 ng/mL -> at least Intermediate
+PSA_HIGH_CUTOFF = 0.7           # PSA > 0.7 ng/mL -> at least High
+PSADT_VERY_HIGH_CUTOFF = 6.0    # PSADT <= 6 months -> Very High
+PSADT_HIGH_CUTOFF = 12.0        # PSADT <= 12 months -> at least High
+
+@metrics.timed(metrics.CLASSIFY_SECONDS)
 def classify_risk(
     psa_pre_srt: float,
     gleason: GleasonScore,
@@ -40,7 +48,34 @@ def classify_risk(
     # Get risk from rules (can be None)
     risk_from_config = config_loader.evaluate_risk_from_rules(inputs_dict, rules)
 
-    # Calculate Risk from Python Logic (V4.2026 Codebase)
+    risk_from_code = classify_risk_from_code(**inputs_dict)
+
+    # --- COMBINE AND RETURN MAX ---
+    # Define weight for comparison
+    def risk_weight(r):
+        if r == RiskLevel.VERY_HIGH: return 4
+        if r == RiskLevel.HIGH: return 3
+        if r == RiskLevel.INTERMEDIATE: return 2
+        return 1
+        
+    if risk_from_config:
+        # Return whichever is higher (Conservative approach for safety)
+        if risk_weight(risk_from_config) > risk_weight(risk_from_code):
+            return risk_from_config
+            
+    return risk_from_code
+
+def classify_risk_from_code(
+    psa_pre_srt: float,
+    gleason: GleasonScore,
+    stage: TumorStage,
+    psadt_months: float,
+    pet_findings: PetFindings,
+    margin: MarginStatus,
+    n_stage: NodalStage = NodalStage.NX,
+    has_psa_persistence: bool = False
+) -> RiskLevel:
+    """Risk from the Python logic alone (V4.2026 Codebase), without the CSV rules."""
     risk_from_code = RiskLevel.LOW # Default
     
     # Helper booleans
@@ -59,12 +94,12 @@ def classify_risk(
     is_n1 = (pet_findings in [PetFindings.PELVIC_LN, PetFindings.EXTRA_PELVIC]) or (n_stage == NodalStage.N1)
     
     # Kinetic
-    is_psadt_le_6 = psadt_months is not None and psadt_months <= 6.0
-    is_psadt_le_12 = psadt_months is not None and psadt_months <= 12.0
+    is_psadt_le_6 = psadt_months is not None and psadt_months <= PSADT_VERY_HIGH_CUTOFF
+    is_psadt_le_12 = psadt_months is not None and psadt_months <= PSADT_HIGH_CUTOFF
     
     # PSA Levels (New Logic: >0.7 High, >0.3 Intermediate)
-    is_psa_high = psa_pre_srt > 0.7
-    is_psa_int = psa_pre_srt > 0.3 # Covers 0.31 to 0.7 (if high is false)
+    is_psa_high = psa_pre_srt > PSA_HIGH_CUTOFF
+    is_psa_int = psa_pre_srt > PSA_INTERMEDIATE_CUTOFF # Covers 0.31 to 0.7 (if high is false)
     
     # --- 1. VERY HIGH RISK ---
     if (is_n1 or is_psadt_le_6 or (has_psa_persistence and is_gg4_5)):
@@ -78,19 +113,6 @@ def classify_risk(
     elif (is_gg2_3 or is_pt3a or is_r1 or is_psa_int):
         risk_from_code = RiskLevel.INTERMEDIATE
         
-    # --- 4. COMBINE AND RETURN MAX ---
-    # Define weight for comparison
-    def risk_weight(r):
-        if r == RiskLevel.VERY_HIGH: return 4
-        if r == RiskLevel.HIGH: return 3
-        if r == RiskLevel.INTERMEDIATE: return 2
-        return 1
-        
-    if risk_from_config:
-        # Return whichever is higher (Conservative approach for safety)
-        if risk_weight(risk_from_config) > risk_weight(risk_from_code):
-            return risk_from_config
-            
     return risk_from_code
 
 def suggest_rt_field(
@@ -151,54 +173,29 @@ def suggest_adt(
 
 def get_absolute_benefits(risk: RiskLevel, adt: ADTRecommendation) -> dict:
     """
-    Returns estimated Absolute Risk Reduction (ARR) and Number Needed to Treat (NNT)
-    for Metastasis-Free Survival (10-year horizon per requested data).
+    Returns estimated 5-year Absolute Risk Reduction (ARR, %) and Number Needed
+    to Treat (NNT) for Metastasis-Free Survival, from config/benefit_tables.csv.
     
     Ref updated:
     - Very High: NNT ~8-9
     - High: NNT ~9-11
     - Intermediate: NNT ~17
     - Low: NNT >33 (Poor benefit)
-    """
     
-    if adt == ADTRecommendation.NONE:
-         return {'arr_5yr': 0.0, 'nnt': "-"}
-
-    if risk == RiskLevel.VERY_HIGH:
-        # NNT ~8 -> ARR ~ 12.5%
-        nnt = 8
-        arr = 12.5
-        return {'arr_5yr': arr, 'nnt': nnt}
-        
-    if risk == RiskLevel.HIGH:
-        # NNT ~10 -> ARR ~ 10%
-        nnt = 10
-        arr = 10.0
-        return {'arr_5yr': arr, 'nnt': nnt}
-        
-    if risk == RiskLevel.INTERMEDIATE:
-        # NNT ~17 -> ARR ~ 5.9%
-        nnt = 17
-        arr = 5.9
-        return {'arr_5yr': arr, 'nnt': nnt}
-        
-    # Low Risk (if ADT selected manually or overrides)
-    return {'arr_5yr': "< 3.0", 'nnt': "> 33"}
+    Bounds keep their historical text form ("< 3.0", "> 33"); use
+    benefit_tables.load_knots().estimate() for typed values at any horizon.
+    """
+    from . import benefit_tables
+    return benefit_tables.load_knots().estimate(risk, adt).legacy()
 
 def get_baseline_recurrence_risk(risk: RiskLevel) -> float:
     """
     Returns estimated 5-year baseline recurrence/metastasis risk WITHOUT ADT (sRT alone).
     Used for visualization (Icon Array).
-    illustrative values.
+    illustrative values (config/benefit_tables.csv).
     """
-    if risk == RiskLevel.VERY_HIGH:
-        return 60.0 # Aggressive recurrence risk
-    elif risk == RiskLevel.HIGH:
-        return 40.0 # High risk of failure with sRT alone
-    elif risk == RiskLevel.INTERMEDIATE:
-        return 20.0 # Moderate risk
-    else:
-        return 10.0 # Low risk
+    from . import benefit_tables
+    return benefit_tables.load_knots().baseline(risk)
 
 import math
 from datetime import date
@@ -0,0 +1,292 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+    ADT_METRICS_PORT=9464 streamlit run app.py
+    curl http://127.0.0.1:9464/metrics
+
+Writers never take a lock on the hot path: each thread accumulates into its
+own shard and a scrape sums the shards. Shards of finished threads are folded
+into a retired total whenever PRUNE_EVERY new shards have been created (and at
+scrape time), so memory stays bounded under thread churn even when nothing
+ever scrapes (Streamlit runs each rerun on a new thread).
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2)
+PRUNE_EVERY = 64  # new shards between dead-thread sweeps
+
+class _Shards:
+    """Per-thread value arrays; the owning thread writes without locking."""
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live = []
+        self._retired = [0.0] * size
+        self._since_prune = 0
+
+    def values(self) -> list:
+        values = getattr(self._local, 'values', None)
+        if values is None:
+            values = [0.0] * self._size
+            with self._lock:
+                self._live.append((threading.current_thread(), values))
+                self._since_prune += 1
+                if self._since_prune >= PRUNE_EVERY:
+                    self._prune()
+            self._local.values = values
+        return values
+
+    def _prune(self):
+        """Folds shards of finished threads into the retired total (caller holds the lock)."""
+        live = []
+        for thread, values in self._live:
+            if thread.is_alive():
+                live.append((thread, values))
+            else:
+                self._retired = [a + b for a, b in zip(self._retired, values)]
+        self._live = live
+        self._since_prune = 0
+
+    def total(self) -> list:
+        with self._lock:
+            self._prune()
+            total = list(self._retired)
+            for _, values in self._live:
+                total = [a + b for a, b in zip(total, values)]
+        return total
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount=1):
+        self._shards.values()[0] += amount
+
+    def samples(self, name, labels):
+        return [(name, labels, self._shards.total()[0])]
+
+class _Timer:
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf, one for the sum
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value):
+        values = self._shards.values()
+        values[bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+    def samples(self, name, labels):
+        total = self._shards.total()
+        out, cumulative = [], 0.0
+        for bound, count in zip(self._buckets + (float('inf'),), total[:-1]):
+            cumulative += count
+            out.append((f"{name}_bucket", labels + (('le', _format_value(bound)),), cumulative))
+        out.append((f"{name}_sum", labels, total[-1]))
+        out.append((f"{name}_count", labels, cumulative))
+        return out
+
+class _Family:
+    kind = None
+
+    def __init__(self, name, help, labelnames=(), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        out = []
+        for values, child in children:
+            out.extend(child.samples(self.name, tuple(zip(self.labelnames, values))))
+        return out
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+class Gauge:
+    """Value read from a callback at scrape time (no cost on the hot path)."""
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, registry=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        (registry or REGISTRY).register(self)
+
+    def samples(self):
+        return [(self.name, (), float(self.fn()))]
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        # Re-registering a name (e.g. a module reload) replaces the old metric
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+REGISTRY = Registry()
+
+def render() -> str:
+    return REGISTRY.render()
+
+def timed(histogram):
+    """Decorator observing the wrapped call's duration in histogram."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time():
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# --- Application metrics ---
+
+RERUN_SECONDS = Histogram("adt_rerun_seconds", "Full Streamlit script run time.")
+CLASSIFY_SECONDS = Histogram("adt_classify_risk_seconds", "logic.classify_risk time.", buckets=FAST_BUCKETS)
+FIGURE_SECONDS = Histogram("adt_figure_build_seconds", "Plotly figure build time.", ("figure",))
+CHART_RENDER_SECONDS = Histogram("adt_chart_render_seconds", "visuals.get_chart_image (PNG render) time.")
+PDF_SECONDS = Histogram("adt_create_pdf_seconds", "utils.create_pdf time.")
+CACHE_HITS = Counter("adt_cache_hits_total", "Cache lookups served from the cache.", ("cache",))
+CACHE_MISSES = Counter("adt_cache_misses_total", "Cache lookups that computed the value.", ("cache",))
+EXPORTS = Counter("adt_exports_total", "PDF export jobs by outcome.", ("outcome",))
+RULE_RELOADS = Counter("adt_rule_reloads_total", "Rule CSV parses after a file change.")
+
+_calls = threading.local()
+
+def mark_miss(name):
+    """Called from inside a cached function body: the current lookup missed."""
+    _calls.__dict__.setdefault('missed', set()).add(name)
+
+def cached_call(name, fn, *args):
+    """Calls a cached function and counts a hit, or a miss if its body ran (see mark_miss)."""
+    missed = _calls.__dict__.setdefault('missed', set())
+    missed.discard(name)
+    result = fn(*args)
+    (CACHE_MISSES if name in missed else CACHE_HITS).labels(name).inc()
+    return result
+
+# --- Scrape endpoint ---
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(host="127.0.0.1", port=0) -> ThreadingHTTPServer:
+    """Serves /metrics on a background thread (port 0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+_shared = {'server': None, 'configured': False}
+_shared_lock = threading.Lock()
+
+def start_from_env():
+    """
+    Starts the process-wide endpoint once when ADT_METRICS_PORT is set
+    (host: ADT_METRICS_HOST, default 127.0.0.1). Returns the server or None.
+    """
+    with _shared_lock:
+        if not _shared['configured']:
+            port = os.environ.get("ADT_METRICS_PORT", "")
+            if port:
+                host = os.environ.get("ADT_METRICS_HOST", "127.0.0.1")
+                try:
+                    _shared['server'] = start_server(host, int(port))
+                except OSError as e:
+                    # Another process (e.g. a second replica) already owns the port
+                    print(f"Metrics endpoint not started: {e}")
+            _shared['configured'] = True
+        return _shared['server']
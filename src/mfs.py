@@ -0,0 +1,44 @@
+"""
+Projected metastasis-free survival (MFS) curves per risk tier and ADT option.
+
+Curves come from the benefit tables (see benefit_tables.py) on their
+precomputed horizon grid:
+    sRT alone:  MFS(t) = 100 - baseline(t)
+    with ADT:   MFS(t) = 100 - (baseline(t) - ARR(t))
+The tables carry no confidence intervals, so the bands are illustrative:
+the cumulative hazard H(t) = -ln(MFS(t)) is scaled by exp(+/- BAND_Z * HAZARD_LOG_SD).
+"""
+import numpy as np
+
+from . import benefit_tables
+from .constants import RiskLevel, ADTRecommendation
+
+HAZARD_LOG_SD = 0.20
+BAND_Z = 1.96
+
+def band(mfs, log_sd=HAZARD_LOG_SD, z=BAND_Z):
+    """(low, high) MFS bands (percent) from a log-normal spread of the cumulative hazard."""
+    hazard = -np.log(np.clip(np.asarray(mfs, dtype=float) / 100, 1e-12, 1.0))
+    factor = np.exp(z * log_sd)
+    return 100 * np.exp(-hazard * factor), 100 * np.exp(-hazard / factor)
+
+def curve_table(risk: RiskLevel, tables=None) -> dict:
+    """
+    MFS curves of every ADT option for a risk tier.
+    Returns {'years': grid, 'curves': [{'options': (ADTRecommendation, ...), 'mfs', 'low', 'high'}]};
+    options with identical curves (e.g. every ADT duration at one tier) share one entry.
+    """
+    tables = tables or benefit_tables.load_tables()
+    r = list(RiskLevel).index(risk)
+    baseline = tables.baseline_grid[r]
+    curves = []
+    for a, adt in enumerate(ADTRecommendation):
+        mfs = 100 - (baseline - tables.arr_grid[r, a])
+        for curve in curves:
+            if np.allclose(curve['mfs'], mfs):
+                curve['options'] += (adt,)
+                break
+        else:
+            low, high = band(mfs)
+            curves.append({'options': (adt,), 'mfs': mfs, 'low': low, 'high': high})
+    return {'years': tables.grid, 'curves': curves}
@@ -0,0 +1,321 @@
+"""
+Fits the risk-group cut-offs to a labelled cohort (e.g. metastasis within 5 years).
+
+Searched, per candidate rule set:
+    gleason / stage tiers  which risk group each ISUP grade / pT stage reaches on its
+                           own (LOW..HIGH), non-decreasing with grade / stage
+    PSA cut-offs           psa_intermediate < psa_high, on PSA_GRID
+    PSADT cut-offs         psadt_very_high < psadt_high, on PSADT_GRID
+The remaining hierarchy of classify_risk is fixed: N1 / PET nodal or distant disease
+and persistence with ISUP 4-5 are Very High, R1 is at least Intermediate.
+With the current values the candidate reproduces vectorized.classify_risk_codes.
+The objective is the AUC of the risk group (ordinal, ties count half) for the outcome.
+
+Candidates are numbered in mixed radix (gleason tiers, stage tiers, PSA pair, PSADT pair).
+The cohort is reduced to outcome counts per (structural tier, PSA bin, PSADT bin) cell
+and 2D prefix sums, so every candidate is scored with a few table lookups, vectorized
+over all threshold pairs of a tier combination. Tier combinations are spread across
+worker processes; with a checkpoint path, finished combinations are recorded and a
+rerun resumes where the previous one stopped.
+
+    python -m src.optimizer cohort.arrow --outcome metastasis_5yr --checkpoint fit.json
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from . import cohort, vectorized
+from .constants import (
+    RiskLevel, GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings
+)
+
+PSA_GRID = np.round(np.arange(0.1, 1.5001, 0.05), 2)
+PSADT_GRID = np.arange(1.0, 24.0001, 1.0)
+
+# Highest group a single grade / stage can reach on its own (Very High needs N1, PSADT or persistence)
+MAX_TIER = vectorized.RISK[RiskLevel.HIGH]
+
+# Current classify_risk tiers, in enum definition order
+CURRENT_GLEASON_TIERS = (0, 1, 1, 2, 2)
+CURRENT_STAGE_TIERS = (0, 1, 2)
+
+_VERY_HIGH = vectorized.RISK[RiskLevel.VERY_HIGH]
+_LEVELS = tuple(RiskLevel)
+
+def monotone_tiers(n_items, max_tier=MAX_TIER):
+    """All non-decreasing tier assignments of n_items ordered categories."""
+    return list(itertools.combinations_with_replacement(range(max_tier + 1), n_items))
+
+class SearchSpace:
+    """Candidate rule sets and their mixed-radix numbering."""
+
+    def __init__(self, psa_grid=PSA_GRID, psadt_grid=PSADT_GRID):
+        self.psa_grid = np.asarray(psa_grid, dtype=np.float64)
+        self.psadt_grid = np.asarray(psadt_grid, dtype=np.float64)
+        self.gleason_tiers = monotone_tiers(len(GleasonScore))
+        self.stage_tiers = monotone_tiers(len(TumorStage))
+        self.psa_pairs = np.array(list(itertools.combinations(range(len(self.psa_grid)), 2)))
+        self.psadt_pairs = np.array(list(itertools.combinations(range(len(self.psadt_grid)), 2)))
+        self.dims = (len(self.gleason_tiers), len(self.stage_tiers), len(self.psa_pairs), len(self.psadt_pairs))
+        self.combos = self.dims[0] * self.dims[1]
+        self.size = int(np.prod(self.dims, dtype=np.int64))
+
+    def signature(self) -> str:
+        h = hashlib.sha1()
+        h.update(self.psa_grid.tobytes())
+        h.update(self.psadt_grid.tobytes())
+        return h.hexdigest()
+
+    def decode(self, index) -> dict:
+        g, s, p, q = (int(x) for x in np.unravel_index(index, self.dims))
+        i, j = self.psa_pairs[p]
+        k, l = self.psadt_pairs[q]
+        return {
+            'gleason': dict(zip(GleasonScore, (_LEVELS[t] for t in self.gleason_tiers[g]))),
+            'stage': dict(zip(TumorStage, (_LEVELS[t] for t in self.stage_tiers[s]))),
+            'psa_intermediate': float(self.psa_grid[i]),
+            'psa_high': float(self.psa_grid[j]),
+            'psadt_very_high': float(self.psadt_grid[k]),
+            'psadt_high': float(self.psadt_grid[l]),
+        }
+
+    def encode(self, gleason_tiers, stage_tiers, psa_intermediate, psa_high, psadt_very_high, psadt_high) -> int:
+        """Index of a candidate; raises ValueError when it isn't in the space."""
+        def grid_index(grid, value):
+            hits = np.flatnonzero(np.isclose(grid, value))
+            if not len(hits):
+                raise ValueError(f"{value} is not on the search grid")
+            return int(hits[0])
+        def pair_index(pairs, a, b):
+            hits = np.flatnonzero((pairs[:, 0] == a) & (pairs[:, 1] == b))
+            if not len(hits):
+                raise ValueError(f"cut-offs out of order: {a} >= {b}")
+            return int(hits[0])
+        try:
+            g = self.gleason_tiers.index(tuple(gleason_tiers))
+            s = self.stage_tiers.index(tuple(stage_tiers))
+        except ValueError:
+            raise ValueError("tiers must be non-decreasing and at most HIGH") from None
+        p = pair_index(self.psa_pairs, grid_index(self.psa_grid, psa_intermediate), grid_index(self.psa_grid, psa_high))
+        q = pair_index(self.psadt_pairs, grid_index(self.psadt_grid, psadt_very_high), grid_index(self.psadt_grid, psadt_high))
+        return int(np.ravel_multi_index((g, s, p, q), self.dims))
+
+    def current(self) -> int:
+        """Index of the rule set classify_risk uses today."""
+        t = vectorized.DEFAULT_THRESHOLDS
+        return self.encode(CURRENT_GLEASON_TIERS, CURRENT_STAGE_TIERS, t['psa_intermediate'], t['psa_high'],
+                           t['psadt_very_high'], t['psadt_high'])
+
+# --- Cohort reduction ---
+
+def _fixed_tier(cols):
+    """Per-patient group from the parts of the hierarchy that aren't searched."""
+    gleason = cols['gleason']
+    is_gg4_5 = np.isin(gleason, [vectorized.codes(GleasonScore)[g] for g in (GleasonScore.ISUP4, GleasonScore.ISUP5)])
+    pet = vectorized.codes(PetFindings)
+    is_n1 = (np.isin(cols['pet_findings'], [pet[PetFindings.PELVIC_LN], pet[PetFindings.EXTRA_PELVIC]])
+             | (cols['n_stage'] == vectorized.codes(NodalStage)[NodalStage.N1]))
+    is_r1 = cols['margin'] == vectorized.codes(MarginStatus)[MarginStatus.R1]
+    return np.where(is_n1 | (cols['has_psa_persistence'] & is_gg4_5), _VERY_HIGH,
+                    np.where(is_r1, vectorized.RISK[RiskLevel.INTERMEDIATE], 0)).astype(np.int8)
+
+def reduce_cohort(cols, outcome, space: SearchSpace) -> dict:
+    """
+    Outcome counts per distinct (gleason, stage, fixed tier, PSA bin, PSADT bin).
+    PSA bin a satisfies `psa > grid[i]` iff a > i; PSADT bin d satisfies
+    `psadt <= grid[k]` iff d <= k (unknown PSADT gets a bin past every k).
+    """
+    outcome = np.asarray(outcome, dtype=bool)
+    psadt = np.asarray(cols['psadt_months'], dtype=np.float64)
+    a = np.searchsorted(space.psa_grid, cols['psa_pre_srt'], side='left')
+    d = np.where(np.isnan(psadt), len(space.psadt_grid) + 1, np.searchsorted(space.psadt_grid, psadt, side='left'))
+    keys = np.stack([cols['gleason'], cols['stage'], _fixed_tier(cols), a, d]).astype(np.int64)
+    cells, inverse = np.unique(keys, axis=1, return_inverse=True)
+    inverse = inverse.ravel()
+    return {
+        'gleason': cells[0], 'stage': cells[1], 'fixed': cells[2], 'a': cells[3], 'd': cells[4],
+        'pos': np.bincount(inverse, weights=outcome, minlength=cells.shape[1]).astype(np.int64),
+        'neg': np.bincount(inverse, weights=~outcome, minlength=cells.shape[1]).astype(np.int64),
+    }
+
+# --- Scoring ---
+
+def _prefix_sums(cells, structural, counts, shape):
+    """2D prefix sums over (PSA bin, PSADT bin), with the structural tier as the last axis."""
+    table = np.zeros(shape, dtype=np.int64)
+    np.add.at(table, (cells['a'], cells['d'], structural), counts)
+    prefix = np.zeros((shape[0] + 1, shape[1] + 1, shape[2]), dtype=np.int64)
+    prefix[1:, 1:] = table.cumsum(axis=0).cumsum(axis=1)
+    return prefix
+
+def _rect(prefix, a0, a1, d0, d1):
+    """Sums over a0 <= PSA bin < a1, d0 <= PSADT bin < d1; shape (*broadcast, 4)."""
+    return prefix[a1, d1] - prefix[a0, d1] - prefix[a1, d0] + prefix[a0, d0]
+
+def _level_counts(prefix, i, j, k, l):
+    """Patients per final risk group, shape (4, *broadcast(i, k))."""
+    n_a, n_d = prefix.shape[0] - 1, prefix.shape[1] - 1
+    regions = (
+        (0, _rect(prefix, 0, i + 1, l + 1, n_d)),                                        # no PSA/PSADT criterion
+        (1, _rect(prefix, i + 1, j + 1, l + 1, n_d)),                                    # PSA > intermediate
+        (2, _rect(prefix, 0, n_a, k + 1, l + 1) + _rect(prefix, j + 1, n_a, l + 1, n_d)),  # PSADT <= high or PSA > high
+        (3, _rect(prefix, 0, n_a, 0, k + 1)),                                            # PSADT <= very high
+    )
+    shape = np.broadcast_shapes(np.shape(i), np.shape(k))
+    counts = np.zeros((4,) + shape, dtype=np.int64)
+    for region_level, sums in regions:
+        for structural in range(4):
+            counts[max(structural, region_level)] += np.broadcast_to(sums[..., structural], shape)
+    return counts
+
+def _auc_numerator(pos, neg):
+    """2 * AUC * P * N for ordinal scores (ties count half), exact in integers."""
+    below = np.cumsum(neg, axis=0) - neg
+    return np.sum(pos * (2 * below + neg), axis=0)
+
+# Candidates scored per block inside one tier combination (bounds memory)
+BLOCK_CANDIDATES = 1 << 20
+
+_worker = {}
+
+def _init_worker(cells, space):
+    _worker['cells'] = cells
+    _worker['space'] = space
+
+def score_combo(combo) -> tuple:
+    """(combo, best AUC numerator, best candidate index) for one gleason x stage tier combination."""
+    cells, space = _worker['cells'], _worker['space']
+    g, s = divmod(combo, space.dims[1])
+    gleason_tiers = np.array(space.gleason_tiers[g])
+    stage_tiers = np.array(space.stage_tiers[s])
+    structural = np.maximum(np.maximum(gleason_tiers[cells['gleason']], stage_tiers[cells['stage']]), cells['fixed'])
+    shape = (len(space.psa_grid) + 1, len(space.psadt_grid) + 2, 4)
+    pos_prefix = _prefix_sums(cells, structural, cells['pos'], shape)
+    neg_prefix = _prefix_sums(cells, structural, cells['neg'], shape)
+
+    k = space.psadt_pairs[:, 0][np.newaxis, :]
+    l = space.psadt_pairs[:, 1][np.newaxis, :]
+    n_q = len(space.psadt_pairs)
+    block = max(1, BLOCK_CANDIDATES // n_q)
+    best_num, best_inner = -1, 0
+    for start in range(0, len(space.psa_pairs), block):
+        pairs = space.psa_pairs[start:start + block]
+        i, j = pairs[:, 0][:, np.newaxis], pairs[:, 1][:, np.newaxis]
+        num = _auc_numerator(_level_counts(pos_prefix, i, j, k, l), _level_counts(neg_prefix, i, j, k, l))
+        arg = int(np.argmax(num))
+        if num.flat[arg] > best_num:
+            best_num, best_inner = int(num.flat[arg]), start * n_q + arg
+    return combo, best_num, combo * len(space.psa_pairs) * n_q + best_inner
+
+def auc_of(cells, space, index) -> float:
+    """AUC of one candidate on the reduced cohort."""
+    g, s, p, q = np.unravel_index(index, space.dims)
+    structural = np.maximum(np.maximum(np.array(space.gleason_tiers[g])[cells['gleason']],
+                                       np.array(space.stage_tiers[s])[cells['stage']]), cells['fixed'])
+    shape = (len(space.psa_grid) + 1, len(space.psadt_grid) + 2, 4)
+    (i, j), (k, l) = space.psa_pairs[p], space.psadt_pairs[q]
+    pos = _level_counts(_prefix_sums(cells, structural, cells['pos'], shape), i, j, k, l)
+    neg = _level_counts(_prefix_sums(cells, structural, cells['neg'], shape), i, j, k, l)
+    return float(_auc_numerator(pos, neg)) / (2 * pos.sum() * neg.sum())
+
+def candidate_risk(cols, candidate) -> np.ndarray:
+    """Per-patient risk codes under a decoded candidate (see SearchSpace.decode)."""
+    gleason_tiers = np.array([vectorized.RISK[candidate['gleason'][g]] for g in GleasonScore], dtype=np.int8)
+    stage_tiers = np.array([vectorized.RISK[candidate['stage'][t]] for t in TumorStage], dtype=np.int8)
+    psa = cols['psa_pre_srt']
+    psadt = cols['psadt_months']
+    kinetic = np.where(psadt <= candidate['psadt_very_high'], 3,
+              np.where((psadt <= candidate['psadt_high']) | (psa > candidate['psa_high']), 2,
+              np.where(psa > candidate['psa_intermediate'], 1, 0)))
+    return np.maximum.reduce([gleason_tiers[cols['gleason']], stage_tiers[cols['stage']],
+                              _fixed_tier(cols), kinetic.astype(np.int8)])
+
+# --- Search ---
+
+def _load_checkpoint(path, signature):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    return state if state.get('signature') == signature else None
+
+def _save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+def optimize(cols, outcome, space=None, workers=None, checkpoint=None) -> dict:
+    """
+    Exhaustive search of the space. Returns the best candidate (lowest index among
+    ties), its AUC, the AUC of the current rules and the number of candidates scored.
+    With checkpoint set, progress is saved after every tier combination and resumed.
+    """
+    space = space or SearchSpace()
+    cells = reduce_cohort(cols, outcome, space)
+    if not cells['pos'].sum() or not cells['neg'].sum():
+        raise ValueError("the outcome needs both events and non-events")
+
+    h = hashlib.sha1(space.signature().encode())
+    for name in sorted(cells):
+        h.update(cells[name].tobytes())
+    signature = h.hexdigest()
+    state = _load_checkpoint(checkpoint, signature) or {'signature': signature, 'done': [], 'best': None}
+    done = set(state['done'])
+    todo = [c for c in range(space.combos) if c not in done]
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cells, space)) as pool:
+            for future in as_completed([pool.submit(score_combo, c) for c in todo]):
+                combo, num, index = future.result()
+                best = state['best']
+                if best is None or num > best['num'] or (num == best['num'] and index < best['index']):
+                    state['best'] = {'num': num, 'index': index}
+                state['done'].append(combo)
+                if checkpoint:
+                    _save_checkpoint(checkpoint, state)
+
+    best_index = state['best']['index']
+    return {
+        'candidate': space.decode(best_index),
+        'index': best_index,
+        'auc': auc_of(cells, space, best_index),
+        'current_auc': auc_of(cells, space, space.current()),
+        'candidates': space.size,
+        'resumed': len(done),
+    }
+
+def format_result(result) -> str:
+    c = result['candidate']
+    lines = [
+        f"Candidates: {result['candidates']:,}",
+        f"AUC: {result['auc']:.4f} (current rules: {result['current_auc']:.4f})",
+        f"PSA cut-offs: > {c['psa_intermediate']:g} Intermediate, > {c['psa_high']:g} High",
+        f"PSADT cut-offs: <= {c['psadt_very_high']:g} Very High, <= {c['psadt_high']:g} High",
+        "Gleason: " + ", ".join(f"{g.name} {r.name}" for g, r in c['gleason'].items()),
+        "Stage: " + ", ".join(f"{t.name} {r.name}" for t, r in c['stage'].items()),
+    ]
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit risk cut-offs to a labelled cohort.")
+    parser.add_argument("cohort", help="Cohort file (.arrow / .parquet, see cohort.py) with an outcome column")
+    parser.add_argument("--outcome", required=True, help="Boolean outcome column, e.g. metastasis_5yr")
+    parser.add_argument("--checkpoint", help="Progress file; rerun with the same path to resume")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    table = cohort.read_cohort(args.cohort)
+    if args.outcome not in table.column_names:
+        parser.error(f"no column {args.outcome!r} in {args.cohort}")
+    cols = cohort.batch_columns(table.combine_chunks().to_batches()[0])
+    outcome = table.column(args.outcome).to_numpy(zero_copy_only=False)
+    print(format_result(optimize(cols, outcome, workers=args.workers, checkpoint=args.checkpoint)))
+
+if __name__ == "__main__":
+    main()
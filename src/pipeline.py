@@ -0,0 +1,31 @@
+import hashlib
+
+from . import codec, decision
+
+_CASE_FIELDS = frozenset(decision.Case.__dataclass_fields__)
+
+def fingerprint(inputs: dict) -> str:
+    """
+    Canonical fingerprint of an inputs dict (as returned by ui.render_inputs):
+    the case's codec token, plus a short hash of extra display-only fields
+    (e.g. psa_label) when present. Independent of key order.
+    """
+    token = codec.to_token(decision.Case.from_dict(inputs))
+    extras = sorted((key, str(val)) for key, val in inputs.items() if key not in _CASE_FIELDS)
+    if extras:
+        token += "-" + hashlib.sha1(repr(extras).encode('utf-8')).hexdigest()[:8]
+    return token
+
+def run_pipeline(inputs: dict) -> dict:
+    """
+    Runs the full decision pipeline for one case (see decision.evaluate).
+    Returns a dict with risk, rt_field, adt, benefits and baseline_risk.
+    """
+    result = decision.evaluate(decision.Case.from_dict(inputs))
+    return {
+        'risk': result.risk,
+        'rt_field': result.rt_field,
+        'adt': result.adt,
+        'benefits': result.benefits,
+        'baseline_risk': result.baseline_risk,
+    }
@@ -0,0 +1,95 @@
+"""
+Continuous 5-year metastasis risk score (optional companion to classify_risk).
+
+A logistic model over the same inputs as the four-tier classification, with
+PSA and PSADT kept continuous:
+
+    logit(p) = INTERCEPT
+             + PSA_LOG_COEF * ln(PSA / PSA_REFERENCE)        (PSA clipped to PSA_RANGE)
+             + PSADT_RATE_COEF * 12 / PSADT                  (doublings per year, capped)
+             + per-level terms for grade, pT, pN, margin, PET and PSA persistence
+
+Per-level terms are precomputed numpy tables indexed by enum code (definition
+order, as in vectorized.py), so scoring a cohort is a handful of array
+gathers. Coefficients are illustrative and calibrated so the typical patient
+of each tier lands near that tier's 5-year baseline risk in
+config/benefit_tables.csv; tier_from_probability maps a score back to a
+RiskLevel using the midpoints between those baselines.
+"""
+import numpy as np
+
+from . import benefit_tables
+from .constants import RiskLevel, GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings
+
+INTERCEPT = -2.40
+PSA_REFERENCE = 0.3      # ng/mL
+PSA_RANGE = (0.01, 50.0)  # ng/mL
+PSA_LOG_COEF = 0.90
+PSADT_RATE_COEF = 0.50   # per doubling per year
+MAX_DOUBLINGS_PER_YEAR = 12.0
+PSADT_UNKNOWN_COEF = 0.40
+PERSISTENCE_COEF = 0.60
+
+def _table(enum_cls, coefficients):
+    """Coefficient per enum code; every member must be listed."""
+    return np.array([coefficients[m] for m in enum_cls])
+
+GLEASON_COEF = _table(GleasonScore, {
+    GleasonScore.ISUP1: 0.0, GleasonScore.ISUP2: 0.35, GleasonScore.ISUP3: 0.70,
+    GleasonScore.ISUP4: 1.20, GleasonScore.ISUP5: 1.50,
+})
+STAGE_COEF = _table(TumorStage, {TumorStage.PT2: 0.0, TumorStage.PT3A: 0.35, TumorStage.PT3B: 0.80})
+NODAL_COEF = _table(NodalStage, {NodalStage.NX: 0.0, NodalStage.N0: -0.20, NodalStage.N1: 1.20})
+MARGIN_COEF = _table(MarginStatus, {MarginStatus.R0: 0.0, MarginStatus.R1: 0.20})
+PET_COEF = _table(PetFindings, {
+    PetFindings.NOT_PERFORMED: 0.0, PetFindings.NEGATIVE: 0.0, PetFindings.BED: 0.20,
+    PetFindings.PELVIC_LN: 1.00, PetFindings.EXTRA_PELVIC: 2.00,
+})
+
+_ENUM_TERMS = (
+    ('gleason', GleasonScore, GLEASON_COEF),
+    ('stage', TumorStage, STAGE_COEF),
+    ('n_stage', NodalStage, NODAL_COEF),
+    ('margin', MarginStatus, MARGIN_COEF),
+    ('pet_findings', PetFindings, PET_COEF),
+)
+
+def linear_predictor(cols) -> np.ndarray:
+    """Logit of the 5-year metastasis probability for columns in vectorized.py format."""
+    psa = np.clip(np.asarray(cols['psa_pre_srt'], dtype=float), *PSA_RANGE)
+    psadt = np.asarray(cols['psadt_months'], dtype=float)
+    known = np.isfinite(psadt) & (psadt > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.minimum(12.0 / np.where(known, psadt, np.inf), MAX_DOUBLINGS_PER_YEAR)
+    lp = (INTERCEPT + PSA_LOG_COEF * np.log(psa / PSA_REFERENCE)
+          + np.where(known, PSADT_RATE_COEF * rate, PSADT_UNKNOWN_COEF))
+    for field, _, table in _ENUM_TERMS:
+        lp = lp + table[np.asarray(cols[field])]
+    return lp + PERSISTENCE_COEF * np.asarray(cols.get('has_psa_persistence', False), dtype=bool)
+
+def probability(cols) -> np.ndarray:
+    """5-year metastasis probability (0-1) per row."""
+    return 1.0 / (1.0 + np.exp(-linear_predictor(cols)))
+
+def case_columns(case) -> dict:
+    """One-row columns for a decision.Case (or anything with the same attributes)."""
+    cols = {field: np.array([list(enum_cls).index(getattr(case, field))]) for field, enum_cls, _ in _ENUM_TERMS}
+    cols['psa_pre_srt'] = np.array([case.psa_pre_srt])
+    cols['psadt_months'] = np.array([np.nan if case.psadt_months is None else case.psadt_months])
+    cols['has_psa_persistence'] = np.array([bool(case.has_psa_persistence)])
+    return cols
+
+def case_probability(case) -> float:
+    return float(probability(case_columns(case))[0])
+
+def tier_cutoffs(horizon=benefit_tables.DEFAULT_HORIZON) -> np.ndarray:
+    """Probability cut-offs between tiers: midpoints of consecutive tier baselines."""
+    baseline = np.sort(benefit_tables.load_tables().at(horizon)[0])
+    return (baseline[:-1] + baseline[1:]) / 200
+
+def tier_codes(p) -> np.ndarray:
+    """RiskLevel codes (0 = LOW ... 3 = VERY_HIGH) for probabilities."""
+    return np.searchsorted(tier_cutoffs(), np.asarray(p), side='right')
+
+def tier_from_probability(p: float) -> RiskLevel:
+    return list(RiskLevel)[int(tier_codes(p))]
@@ -0,0 +1,291 @@
+"""
+Consistency checker between config/risk_rules.csv and the risk logic in logic.py.
+
+classify_risk takes the higher of the CSV rules and the Python logic, so a rule
+that drifts from the code silently changes decisions. The checker enumerates the
+whole discrete input space (every enum combination, persistence on/off) against
+PSA and PSADT boundary values: every cut-off used by the code or the CSV, plus the
+midpoints between them and values outside them, plus unknown PSADT. This covers
+every region where the rules can change. It reports:
+    parse failures   rows with an unknown level / variable / operator or an unparsable value
+    dead rules       valid rows that match no case
+    disagreements    cases where the CSV tier differs from the code tier, except the
+                     compound rules the CSV format can't express (CODE_ONLY_RULES)
+    vectorized       cases where vectorized.classify_risk_codes differs from classify_risk
+
+    python -m src.rules_check                      # exit status 1 on any finding
+    python -m src.rules_check --rules my_rules.csv --json report.json
+"""
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import config_loader, logic, vectorized
+from .constants import (
+    RiskLevel, GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings
+)
+
+RULE_LEVELS = ('VERY_HIGH', 'HIGH', 'INTERMEDIATE')
+OPERATORS = ('EQ', 'IN', 'LT', 'GT', 'LE', 'GE', 'BETWEEN')
+ORDERING_OPERATORS = ('LT', 'GT', 'LE', 'GE', 'BETWEEN')
+
+INPUT_ENUMS = {
+    'gleason': GleasonScore,
+    'stage': TumorStage,
+    'n_stage': NodalStage,
+    'margin': MarginStatus,
+    'pet_findings': PetFindings,
+}
+INPUT_NUMBERS = ('psa_pre_srt', 'psadt_months')
+INPUT_FLAGS = ('has_psa_persistence',)
+
+# Compound rules that only exist in the code (the CSV has one variable per row)
+CODE_ONLY_RULES = (
+    ("persistence + ISUP 4-5 -> VERY_HIGH",
+     lambda case: case['has_psa_persistence'] and case['gleason'] in (GleasonScore.ISUP4, GleasonScore.ISUP5),
+     RiskLevel.VERY_HIGH),
+)
+
+_ORDER = {level: i for i, level in enumerate(RiskLevel)}
+
+def read_rule_rows(csv_path):
+    """(line number, row) for every non-comment row of a rules CSV."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = []
+        for row in reader:
+            if not config_loader.is_comment_row(row):
+                rows.append((reader.line_num, row))
+        return rows
+
+def rule_problem(rule):
+    """Why a rule can't work as written, or None."""
+    level, var, op, value = (rule.get(k) for k in ('risk_level', 'variable', 'operator', 'value'))
+    if level not in RULE_LEVELS:
+        return f"unknown risk level {level!r} (expected one of {', '.join(RULE_LEVELS)})"
+    if var not in INPUT_ENUMS and var not in INPUT_NUMBERS and var not in INPUT_FLAGS:
+        return f"unknown variable {var!r}"
+    if op not in OPERATORS:
+        return f"unsupported operator {op!r} (expected one of {', '.join(OPERATORS)})"
+    if value is None or not value.strip():
+        return "empty value"
+    if var in INPUT_ENUMS and op in ORDERING_OPERATORS:
+        return f"{op} can't compare {var} (enums only support EQ / IN)"
+    try:
+        if op == 'BETWEEN':
+            low, high = (float(v) for v in value.split(';'))
+            if low >= high:
+                return f"empty BETWEEN range {value!r}"
+        else:
+            parsed = config_loader.parse_rule_value(var, value)
+            if op == 'EQ' and isinstance(parsed, list):
+                return f"EQ with a list value {value!r} (use IN)"
+    except (ValueError, AttributeError) as e:
+        return f"can't parse value {value!r}: {e}"
+    return None
+
+def boundary_values(cutoffs, include_unknown=False):
+    """
+    The cut-offs, the midpoints between them and one value past each end,
+    within the valid range (PSA and PSADT are never negative).
+    """
+    cutoffs = sorted(set(c for c in cutoffs if c >= 0))
+    if not cutoffs:
+        values = [0.0]
+    else:
+        values = list(cutoffs)
+        values += [(a + b) / 2 for a, b in zip(cutoffs, cutoffs[1:])]
+        values.append(cutoffs[-1] * 2 + 1)
+        if cutoffs[0] > 0:
+            values.append(cutoffs[0] / 2)
+    values = sorted(values)
+    return values + [None] if include_unknown else values
+
+def _rule_cutoffs(rules, var):
+    cutoffs = []
+    for rule in rules:
+        if rule.get('variable') != var or rule_problem(rule):
+            continue
+        if rule['operator'] == 'BETWEEN':
+            cutoffs += [float(v) for v in rule['value'].split(';')]
+        else:
+            parsed = config_loader.parse_rule_value(var, rule['value'])
+            cutoffs += parsed if isinstance(parsed, list) else [parsed]
+    return cutoffs
+
+def cutoffs(rules):
+    """(PSA cut-offs, PSADT cut-offs) used by these rules or the code, unsorted."""
+    psa = _rule_cutoffs(rules, 'psa_pre_srt') + [logic.PSA_INTERMEDIATE_CUTOFF, logic.PSA_HIGH_CUTOFF]
+    psadt = _rule_cutoffs(rules, 'psadt_months') + [logic.PSADT_VERY_HIGH_CUTOFF, logic.PSADT_HIGH_CUTOFF]
+    return psa, psadt
+
+def input_space(rules):
+    """PSA and PSADT boundary values for these rules and the code's cut-offs."""
+    psa_cuts, psadt_cuts = cutoffs(rules)
+    return boundary_values(psa_cuts), boundary_values(psadt_cuts, include_unknown=True)
+
+def _cases(gleason, stage, psa_values, psadt_values):
+    for n_stage, margin, pet, persistence, psa, psadt in itertools.product(
+        NodalStage, MarginStatus, PetFindings, (False, True), psa_values, psadt_values
+    ):
+        yield {
+            'psa_pre_srt': psa, 'gleason': gleason, 'stage': stage, 'psadt_months': psadt,
+            'pet_findings': pet, 'margin': margin, 'has_psa_persistence': persistence, 'n_stage': n_stage,
+        }
+
+def _explained(case, code, csv_tier):
+    """A CSV tier below the code's tier that a code-only compound rule accounts for."""
+    if csv_tier is not None and _ORDER[csv_tier] > _ORDER[code]:
+        return None
+    for description, applies, level in CODE_ONLY_RULES:
+        if level == code and applies(case):
+            return description
+    return None
+
+def check_chunk(rules, gleason, stage, psa_values, psadt_values) -> dict:
+    """Checks every case with this gleason / stage; run in a worker process."""
+    valid = [rule_problem(r) is None for r in rules]
+    fired = [0] * len(rules)
+    disagreements = []
+    combined = []
+    n = 0
+    # check_rule prints each failed comparison; the report covers those rows
+    with contextlib.redirect_stdout(io.StringIO()):
+        for case in _cases(gleason, stage, psa_values, psadt_values):
+            n += 1
+            for i, rule in enumerate(rules):
+                if valid[i] and config_loader.check_rule(case, rule, config_loader.parse_rule_value):
+                    fired[i] += 1
+            code = logic.classify_risk_from_code(**case)
+            csv_tier = config_loader.evaluate_risk_from_rules(case, rules)
+            final = csv_tier if csv_tier is not None and _ORDER[csv_tier] > _ORDER[code] else code
+            combined.append(_ORDER[final])
+            if (csv_tier or RiskLevel.LOW) != code:
+                disagreements.append({
+                    'case': {k: v.name if hasattr(v, 'name') else v for k, v in case.items()},
+                    'code': code.name,
+                    'csv': csv_tier.name if csv_tier else None,
+                    'explained_by': _explained(case, code, csv_tier),
+                })
+    return {'n': n, 'fired': fired, 'disagreements': disagreements, 'combined': combined}
+
+def _vectorized_codes(gleason, stage, psa_values, psadt_values, rules):
+    """classify_risk_codes over the same cases, in the same order as _cases."""
+    grid = list(itertools.product(NodalStage, MarginStatus, PetFindings, (False, True), psa_values, psadt_values))
+    cols = {
+        'gleason': np.full(len(grid), vectorized.codes(GleasonScore)[gleason], dtype=np.int8),
+        'stage': np.full(len(grid), vectorized.codes(TumorStage)[stage], dtype=np.int8),
+        'n_stage': np.array([vectorized.codes(NodalStage)[g[0]] for g in grid], dtype=np.int8),
+        'margin': np.array([vectorized.codes(MarginStatus)[g[1]] for g in grid], dtype=np.int8),
+        'pet_findings': np.array([vectorized.codes(PetFindings)[g[2]] for g in grid], dtype=np.int8),
+        'has_psa_persistence': np.array([g[3] for g in grid], dtype=bool),
+        'psa_pre_srt': np.array([g[4] for g in grid], dtype=np.float64),
+        'psadt_months': np.array([np.nan if g[5] is None else g[5] for g in grid], dtype=np.float64),
+    }
+    return vectorized.classify_risk_codes(cols, rules)
+
+def check(rules_path=config_loader.DEFAULT_RULES_PATH, workers=None) -> dict:
+    """Runs every check over a rules CSV; see format_report / failed."""
+    rows = read_rule_rows(rules_path)
+    rules = [row for _, row in rows]
+    psa_values, psadt_values = input_space(rules)
+    chunks = list(itertools.product(GleasonScore, TumorStage))
+
+    if workers == 1:
+        results = [check_chunk(rules, g, s, psa_values, psadt_values) for g, s in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(check_chunk, rules, g, s, psa_values, psadt_values) for g, s in chunks]
+            results = [f.result() for f in futures]
+
+    fired = np.sum([r['fired'] for r in results], axis=0) if rules else np.zeros(0, dtype=int)
+    parse_failures = []
+    dead = []
+    for (line, rule), count in zip(rows, fired):
+        problem = rule_problem(rule)
+        if problem:
+            parse_failures.append({'line': line, 'rule': rule, 'problem': problem})
+        elif count == 0:
+            dead.append({'line': line, 'rule': rule})
+
+    vectorized_mismatches = 0
+    for (g, s), result in zip(chunks, results):
+        codes = _vectorized_codes(g, s, psa_values, psadt_values, rules)
+        vectorized_mismatches += int(np.sum(codes != np.array(result['combined'])))
+
+    disagreements = [d for r in results for d in r['disagreements']]
+    return {
+        'rules_path': rules_path,
+        'cases': sum(r['n'] for r in results),
+        'psa_values': psa_values,
+        'psadt_values': psadt_values,
+        'rule_fires': [{'line': line, 'rule': rule, 'cases': int(count)} for (line, rule), count in zip(rows, fired)],
+        'parse_failures': parse_failures,
+        'dead_rules': dead,
+        'disagreements': [d for d in disagreements if not d['explained_by']],
+        'explained': [d for d in disagreements if d['explained_by']],
+        'vectorized_mismatches': vectorized_mismatches,
+    }
+
+def failed(report) -> bool:
+    return bool(report['parse_failures'] or report['dead_rules'] or report['disagreements']
+                or report['vectorized_mismatches'])
+
+def _rule_text(rule):
+    return ",".join(str(rule.get(k)) for k in ('risk_level', 'variable', 'operator', 'value'))
+
+def format_report(report, examples=3) -> str:
+    lines = [
+        f"Rules: {report['rules_path']}",
+        f"Cases checked: {report['cases']:,} "
+        f"(PSA {len(report['psa_values'])} values, PSADT {len(report['psadt_values'])} values)",
+    ]
+    for entry in report['parse_failures']:
+        lines.append(f"PARSE  line {entry['line']}: {_rule_text(entry['rule'])} -> {entry['problem']}")
+    for entry in report['dead_rules']:
+        lines.append(f"DEAD   line {entry['line']}: {_rule_text(entry['rule'])} matches no case")
+
+    groups = {}
+    for d in report['disagreements']:
+        groups.setdefault((d['code'], d['csv']), []).append(d['case'])
+    for (code, csv_tier), cases in sorted(groups.items(), key=lambda item: str(item[0])):
+        lines.append(f"DIFF   code {code} vs CSV {csv_tier or 'no match'}: {len(cases)} cases, e.g.")
+        for case in cases[:examples]:
+            lines.append("         " + ", ".join(f"{k}={v}" for k, v in case.items()))
+
+    explained = {}
+    for d in report['explained']:
+        explained[d['explained_by']] = explained.get(d['explained_by'], 0) + 1
+    for description, count in explained.items():
+        lines.append(f"ok     {count} cases decided by the code-only rule: {description}")
+    if report['vectorized_mismatches']:
+        lines.append(f"VECTOR {report['vectorized_mismatches']} cases where classify_risk_codes differs from classify_risk")
+    lines.append("FAILED" if failed(report) else "OK: CSV rules and code agree")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check risk_rules.csv against the risk logic.")
+    parser.add_argument("--rules", default=config_loader.DEFAULT_RULES_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", help="Also write the full report (every case) as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.rules):
+        parser.error(f"no rules file at {args.rules}")
+    report = check(args.rules, workers=args.workers)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    return 1 if failed(report) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
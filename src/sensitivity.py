@@ -0,0 +1,90 @@
+"""
+Sensitivity of the risk classification to the PSA / PSADT cut-offs.
+
+Everything is one broadcast array computation through vectorized.classify_risk_codes:
+    risk_surface     -> risk codes over a PSADT x PSA grid for a fixed case context
+    threshold_sweep  -> one surface per candidate value of a cut-off, shape (k, psadt, psa)
+    cohort_sweep     -> patients per risk tier in a cohort for each candidate value
+
+Codes follow RiskLevel definition order (vectorized.RISK). The PSADT grid has a
+trailing NaN row for "unknown PSADT" when include_unknown is set.
+"""
+import numpy as np
+
+from . import config_loader, vectorized
+from .decision import Case, ENUM_FIELDS, BOOL_FIELDS
+
+PSA_GRID = np.round(np.arange(0.0, 2.0001, 0.05), 2)
+PSADT_GRID = np.round(np.arange(0.5, 30.0001, 0.5), 1)
+
+# Default candidate values per cut-off for threshold_sweep
+SWEEP_GRIDS = {
+    'psa_intermediate': np.round(np.arange(0.1, 0.6001, 0.05), 2),
+    'psa_high': np.round(np.arange(0.4, 1.5001, 0.1), 1),
+    'psadt_very_high': np.arange(3.0, 12.0001, 1.0),
+    'psadt_high': np.arange(6.0, 24.0001, 1.0),
+}
+
+def _context_columns(case: Case) -> dict:
+    """Columns of everything but PSA/PSADT, as 0-d arrays that broadcast over any grid."""
+    cols = {name: np.asarray(vectorized.codes(enum_cls)[getattr(case, name)], dtype=np.int8)
+            for name, enum_cls in ENUM_FIELDS.items()}
+    cols.update({name: np.asarray(getattr(case, name)) for name in BOOL_FIELDS})
+    return cols
+
+def _grid_columns(case, psa_grid, psadt_grid, include_unknown):
+    psadt = np.asarray(psadt_grid, dtype=np.float64)
+    if include_unknown:
+        psadt = np.append(psadt, np.nan)
+    cols = _context_columns(case)
+    cols['psa_pre_srt'] = np.asarray(psa_grid, dtype=np.float64)[np.newaxis, :]
+    cols['psadt_months'] = psadt[:, np.newaxis]
+    return cols
+
+def risk_surface(case: Case, psa_grid=PSA_GRID, psadt_grid=PSADT_GRID,
+                 rules=None, thresholds=None, include_unknown=False) -> np.ndarray:
+    """
+    Risk codes for the case's context at every (PSADT, PSA) grid point, shape
+    (len(psadt_grid) [+1], len(psa_grid)). The case's own PSA/PSADT are ignored.
+    """
+    if rules is None:
+        rules = config_loader.load_rules()
+    cols = _grid_columns(case, psa_grid, psadt_grid, include_unknown)
+    shape = (cols['psadt_months'].shape[0], cols['psa_pre_srt'].shape[1])
+    return np.broadcast_to(vectorized.classify_risk_codes(cols, rules, thresholds), shape)
+
+def threshold_sweep(case: Case, name, values=None, psa_grid=PSA_GRID, psadt_grid=PSADT_GRID,
+                    rules=None, include_unknown=False) -> np.ndarray:
+    """
+    Surfaces for each candidate value of one cut-off (see vectorized.DEFAULT_THRESHOLDS),
+    shape (len(values), psadt, psa), evaluated in a single broadcast.
+    """
+    if name not in vectorized.DEFAULT_THRESHOLDS:
+        raise ValueError(f"unknown threshold: {name} (expected one of {', '.join(vectorized.DEFAULT_THRESHOLDS)})")
+    if values is None:
+        values = SWEEP_GRIDS[name]
+    if rules is None:
+        rules = config_loader.load_rules()
+    values = np.asarray(values, dtype=np.float64)
+    cols = _grid_columns(case, psa_grid, psadt_grid, include_unknown)
+    shape = (len(values), cols['psadt_months'].shape[0], cols['psa_pre_srt'].shape[1])
+    risk = vectorized.classify_risk_codes(cols, rules, {name: values[:, np.newaxis, np.newaxis]})
+    return np.broadcast_to(risk, shape)
+
+def cohort_sweep(cols, name, values=None, rules=None) -> np.ndarray:
+    """
+    Patients per risk tier for each candidate value of one cut-off over cohort
+    columns (e.g. cohort.batch_columns). Returns counts of shape (len(values), len(RISK)).
+    """
+    if name not in vectorized.DEFAULT_THRESHOLDS:
+        raise ValueError(f"unknown threshold: {name} (expected one of {', '.join(vectorized.DEFAULT_THRESHOLDS)})")
+    if values is None:
+        values = SWEEP_GRIDS[name]
+    if rules is None:
+        rules = config_loader.load_rules()
+    counts = np.zeros((len(values), len(vectorized.RISK)), dtype=np.int64)
+    # One value at a time keeps memory at one cohort-sized mask per comparison
+    for i, value in enumerate(values):
+        risk = vectorized.classify_risk_codes(cols, rules, {name: float(value)})
+        counts[i] = np.bincount(risk.ravel(), minlength=len(vectorized.RISK))
+    return counts
@@ -0,0 +1,226 @@
+"""
+Headless decision API (no Streamlit), for EHR / order-entry integration.
+
+    python -m src.server --port 8080 --workers 4
+
+Endpoints:
+    GET  /healthz              -> {"status": "ok", "rules_version": ...}
+    POST /v1/decision          JSON case -> JSON decision
+    POST /v1/decisions/bulk    NDJSON cases -> NDJSON decisions, streamed as batches finish
+                               (each output line carries the input "line" and optional "id")
+
+Cases use enum member names, e.g.:
+    {"psa_pre_srt": 0.5, "gleason": "ISUP4", "stage": "PT3A", "margin": "R1",
+     "pet_findings": "NEGATIVE", "psadt_months": 8.0, "life_expectancy": "LONG"}
+"""
+import argparse
+import json
+import os
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import config_loader
+from .decision import Case, evaluate
+
+MAX_CASE_BYTES = 64 * 1024
+MAX_BULK_BYTES = 256 * 1024 * 1024
+BATCH_SIZE = 500
+
+def decide(payload) -> dict:
+    """Validates and evaluates one JSON case; raises ValueError on invalid input."""
+    return evaluate(Case.from_dict(payload)).to_dict()
+
+# --- Worker pool (bulk) ---
+
+def _init_worker():
+    # Parse the rule set once per worker; later lookups hit the parsed cache
+    config_loader.load_rules()
+
+def error_lines(line_numbers, message) -> str:
+    """NDJSON "error" entries for lines that produced no decision."""
+    return "".join(json.dumps({'line': n, 'error': message}, ensure_ascii=False) + "\n" for n in line_numbers)
+
+def decide_lines(lines) -> str:
+    """
+    Evaluates a batch of (line number, NDJSON text) pairs in a worker.
+    Returns the NDJSON output for the batch; lines that fail get an "error" entry.
+    """
+    out = []
+    for line_no, text in lines:
+        entry = {'line': line_no}
+        try:
+            payload = json.loads(text)
+            if isinstance(payload, dict) and 'id' in payload:
+                entry['id'] = payload['id']
+            entry['decision'] = decide(payload)
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            entry['error'] = str(e)
+        except Exception as e:
+            # Anything else is a bug, but it must not cost the rest of the stream
+            entry['error'] = f"internal error: {type(e).__name__}"
+        out.append(json.dumps(entry, ensure_ascii=False))
+    return "\n".join(out) + "\n"
+
+class DecisionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "calculadora-adt"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _content_length(self, limit):
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._send_json(411, {'error': "Content-Length required"})
+            return None
+        if length < 0 or length > limit:
+            self._send_json(413, {'error': f"body larger than {limit} bytes"})
+            self.close_connection = True
+            return None
+        return length
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send_json(200, {'status': "ok", 'rules_version': config_loader.rules_version()})
+        else:
+            self._send_json(404, {'error': "not found"})
+
+    def do_POST(self):
+        if self.path == "/v1/decision":
+            self._single()
+        elif self.path == "/v1/decisions/bulk":
+            self._bulk()
+        else:
+            self._send_json(404, {'error': "not found"})
+
+    def _single(self):
+        length = self._content_length(MAX_CASE_BYTES)
+        if length is None:
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+            self._send_json(200, decide(payload))
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            # A bug, not bad input: log it in full (even when quiet) and still answer in JSON
+            traceback.print_exc()
+            self._send_json(500, {'error': f"internal error: {type(e).__name__}"})
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _bulk(self):
+        length = self._content_length(MAX_BULK_BYTES)
+        if length is None:
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        pool = self.server.pool
+        # Bound in-flight batches so a huge upload doesn't queue unbounded work
+        max_in_flight = 2 * self.server.workers
+        # future -> its batch, to report the batch's lines if the worker fails
+        pending = {}
+        batch = []
+        line_no = 0
+        remaining = length
+
+        def drain(block_until):
+            while len(pending) > block_until:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    lines = pending.pop(future)
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        # e.g. BrokenProcessPool: fail this batch, keep streaming the rest
+                        text = error_lines((n for n, _ in lines), f"internal error: {type(e).__name__}")
+                    self._write_chunk(text)
+
+        while remaining > 0:
+            raw = self.rfile.readline(min(remaining, MAX_CASE_BYTES + 1))
+            if not raw:
+                break
+            remaining -= len(raw)
+            line_no += 1
+            if len(raw) > MAX_CASE_BYTES and not raw.endswith(b"\n"):
+                # Skip the rest of the line so later line numbers stay right
+                while remaining > 0 and not raw.endswith(b"\n"):
+                    raw = self.rfile.readline(min(remaining, MAX_CASE_BYTES + 1))
+                    if not raw:
+                        break
+                    remaining -= len(raw)
+                self._write_chunk(error_lines([line_no], f"line too long (max {MAX_CASE_BYTES} bytes)"))
+                continue
+            text = raw.decode('utf-8', errors='replace').strip()
+            if not text:
+                continue
+            batch.append((line_no, text))
+            if len(batch) >= BATCH_SIZE:
+                pending[pool.submit(decide_lines, batch)] = batch
+                batch = []
+                drain(max_in_flight - 1)
+        if batch:
+            pending[pool.submit(decide_lines, batch)] = batch
+        drain(0)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+class DecisionServer(ThreadingHTTPServer):
+    """HTTP server owning the bulk worker pool (one rule-set load per worker)."""
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, quiet=False):
+        super().__init__(address, DecisionHandler)
+        self.workers = workers or os.cpu_count() or 1
+        self.quiet = quiet
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+def start_background(host="127.0.0.1", port=0, workers=None) -> DecisionServer:
+    """Starts a server on a background thread (port 0 picks a free port); call shutdown() + server_close() to stop."""
+    server = DecisionServer((host, port), workers=workers, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless ADT decision API.")
+    parser.add_argument("--host", default=os.environ.get("ADT_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("ADT_API_PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("ADT_API_WORKERS", "0")) or None,
+                        help="Bulk worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    config_loader.load_rules()
+    server = DecisionServer((args.host, args.port), workers=args.workers)
+    print(f"Decision API on http://{args.host}:{server.server_address[1]} ({server.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
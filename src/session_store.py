@@ -0,0 +1,194 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import tempfile
+import threading
+import time
+from enum import Enum
+
+from .constants import (
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+# Sidebar widget keys persisted per session, with their value type.
+# Only the compact case inputs are stored, never rendered results.
+SESSION_FIELDS = {
+    'psa_option': str,
+    'has_psa_persistence': bool,
+    'psadt_option': str,
+    'psadt_input': float,
+    'psadt_calculated': float,
+    'gleason': GleasonScore,
+    'stage': TumorStage,
+    'n_stage': NodalStage,
+    'margin': MarginStatus,
+    'pet_findings': PetFindings,
+    'life_expectancy': LifeExpectancy,
+    'has_cardio': bool,
+    'has_metabolic': bool,
+    'has_bone': bool,
+    'has_libido_concern': bool,
+}
+
+# Key holding the PSADT editor rows as ((iso date, psa), ...)
+PSA_ROWS_KEY = 'psadt_rows'
+
+SCHEMA_VERSION = 1
+
+def dump_state(state) -> dict:
+    """
+    Compact JSON-able snapshot of a session: enum names, numbers, flags and PSA rows.
+    state: any mapping (e.g. st.session_state); missing keys are skipped.
+    """
+    fields = {}
+    for key, kind in SESSION_FIELDS.items():
+        if key not in state:
+            continue
+        val = state[key]
+        if isinstance(val, Enum):
+            val = val.name
+        elif val is not None and kind in (float, bool, str):
+            val = kind(val)
+        fields[key] = val
+    rows = state[PSA_ROWS_KEY] if PSA_ROWS_KEY in state else None
+    return {
+        'v': SCHEMA_VERSION,
+        'fields': fields,
+        'psa_rows': [list(r) for r in rows] if rows is not None else None,
+    }
+
+def load_state(data) -> dict:
+    """
+    Inverse of dump_state: returns {session key: value} ready to assign to st.session_state.
+    Unknown keys and enum names that no longer exist are dropped.
+    """
+    if not data or data.get('v') != SCHEMA_VERSION:
+        return {}
+    restored = {}
+    for key, val in data.get('fields', {}).items():
+        kind = SESSION_FIELDS.get(key)
+        if kind is None:
+            continue
+        if val is not None and issubclass(kind, Enum):
+            if val not in kind.__members__:
+                continue
+            val = kind[val]
+        restored[key] = val
+    if data.get('psa_rows') is not None:
+        restored[PSA_ROWS_KEY] = tuple(tuple(r) for r in data['psa_rows'])
+    return restored
+
+class SessionStore(ABC):
+    """Backend interface: JSON-able dicts keyed by session id."""
+    @abstractmethod
+    def load(self, session_id):
+        ...
+
+    @abstractmethod
+    def save(self, session_id, data):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id):
+        ...
+
+class FileSessionStore(SessionStore):
+    """One JSON file per session; writes are atomic (temp file + rename)."""
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id):
+        # Session ids are generated hex tokens; refuse anything that could escape the directory
+        if not session_id.isalnum():
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return os.path.join(self.directory, f"{session_id}.json")
+
+    def load(self, session_id):
+        try:
+            with open(self._path(session_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, session_id, data):
+        # Validate the id before creating anything on disk
+        path = self._path(session_id)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, session_id):
+        try:
+            os.unlink(self._path(session_id))
+        except OSError:
+            pass
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in one SQLite file (WAL mode), shared by every replica on the host."""
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, updated REAL NOT NULL, data TEXT NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id):
+        row = self._conn().execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id, data):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO sessions (id, updated, data) VALUES (?, ?, ?)",
+            (session_id, time.time(), json.dumps(data))
+        )
+
+    def delete(self, session_id):
+        self._conn().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def purge(self, max_age_seconds):
+        """Drops sessions not updated for max_age_seconds."""
+        self._conn().execute("DELETE FROM sessions WHERE updated < ?", (time.time() - max_age_seconds,))
+
+_shared = {'store': None, 'configured': False}
+_shared_lock = threading.Lock()
+
+def get_session_store():
+    """
+    Process-wide session store configured from ADT_SESSION_BACKEND, or None
+    (default: state stays in the Streamlit process).
+    Values: "sqlite:<path to .sqlite>" or "file:<directory>". An invalid value
+    or an unusable backend is reported once and leaves persistence off.
+    """
+    with _shared_lock:
+        if not _shared['configured']:
+            spec = os.environ.get("ADT_SESSION_BACKEND", "")
+            kind, _, target = spec.partition(":")
+            try:
+                if kind == "sqlite" and target:
+                    _shared['store'] = SQLiteSessionStore(target)
+                elif kind == "file" and target:
+                    _shared['store'] = FileSessionStore(target)
+                elif spec:
+                    raise ValueError(f"Invalid ADT_SESSION_BACKEND: {spec!r}")
+            except Exception as e:
+                # Without a store the state stays in the Streamlit process, as by default
+                print(f"Session persistence disabled: {e}")
+            _shared['configured'] = True
+        return _shared['store']
@@ -0,0 +1,79 @@
+"""
+Virtual-patient outcome simulator behind the 100-patient icon array.
+
+Each simulated patient gets one uniform draw u that fixes their outcome with
+and without ADT (common random numbers), under a constant-hazard model
+calibrated to the 5-year figures of config/benefit_tables.csv:
+    without ADT: P(event by 5 years) = baseline risk
+    with ADT:    P(event by 5 years) = baseline risk - ARR
+so at 5 years every patient falls in exactly one icon-array category:
+    recurrence    event even with ADT
+    prevented     event only without ADT (the ADT benefit)
+    no_recurrence no event either way
+
+Group counts (simulate_groups) and individual event times (simulate_event_times)
+use seeded numpy draws, so results are reproducible run to run.
+"""
+import numpy as np
+
+from . import benefit_tables
+from .constants import RiskLevel, ADTRecommendation
+
+HORIZON_YEARS = 5.0
+SEED = 2026
+CATEGORIES = ('recurrence', 'prevented', 'no_recurrence')
+
+def outcome_probabilities(risk: RiskLevel, adt: ADTRecommendation, horizon=HORIZON_YEARS) -> np.ndarray:
+    """Probabilities of CATEGORIES by `horizon` years for a risk tier and ADT choice."""
+    estimate = benefit_tables.load_tables().estimate(risk, adt, horizon)
+    baseline = estimate.baseline / 100
+    arr = min(estimate.arr / 100, baseline)
+    return np.array([baseline - arr, arr, 1 - baseline])
+
+def simulate_groups(risk, adt, patients=100, groups=10_000, seed=SEED, coverage=0.95, horizon=HORIZON_YEARS) -> dict:
+    """
+    Outcomes of `groups` independent groups of `patients` virtual patients.
+    Returns:
+        counts    -> array (groups, 3) of CATEGORIES counts per group
+        mean      -> {category: mean count per group}
+        interval  -> {category: (low, high)} central `coverage` interval of the counts
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(patients, outcome_probabilities(risk, adt, horizon), size=groups)
+    tail = (1 - coverage) / 2 * 100
+    low, high = np.percentile(counts, [tail, 100 - tail], axis=0)
+    return {
+        'counts': counts,
+        'mean': dict(zip(CATEGORIES, counts.mean(axis=0).tolist())),
+        'interval': {c: (int(lo), int(hi)) for c, lo, hi in zip(CATEGORIES, low, high)},
+    }
+
+def _hazard(p_event, horizon=HORIZON_YEARS):
+    """Constant yearly hazard with P(event by horizon) = p_event."""
+    return -np.log1p(-p_event) / horizon
+
+def simulate_event_times(risk, adt, patients=1_000_000, seed=SEED) -> dict:
+    """
+    Years to recurrence per virtual patient, without ADT ('control') and with
+    the chosen ADT ('treated'); np.inf when the patient never recurs.
+    """
+    probs = outcome_probabilities(risk, adt)
+    p_control = probs[0] + probs[1]
+    p_treated = probs[0]
+    # -log(1 - u) is a unit exponential; scaling by each arm's hazard keeps
+    # every patient's treated time at or after their control time
+    unit = -np.log1p(-np.random.default_rng(seed).random(patients))
+    with np.errstate(divide='ignore'):
+        return {
+            'control': unit / _hazard(p_control) if p_control > 0 else np.full(patients, np.inf),
+            'treated': unit / _hazard(p_treated) if p_treated > 0 else np.full(patients, np.inf),
+        }
+
+def event_free_curve(times, grid) -> np.ndarray:
+    """Share of patients still event-free at each time in grid (no censoring before the grid ends)."""
+    ordered = np.sort(times)
+    return 1 - np.searchsorted(ordered, grid, side='right') / len(ordered)
+
+def categorize(control, treated, horizon=HORIZON_YEARS) -> np.ndarray:
+    """Per-patient CATEGORIES index at the horizon from paired event times."""
+    return np.where(treated <= horizon, 0, np.where(control <= horizon, 1, 2)).astype(np.int8)
@@ -0,0 +1,357 @@
+"""
+Standalone static build: one self-contained HTML page (no server, no Python)
+that reproduces classify_risk, suggest_rt_field, suggest_adt, the benefit
+estimates and the risk / ARR gauges client-side.
+
+    python -m src.static_build                       # dist/calculadora_adt.html
+    python -m src.static_build --out page.html --rules my_rules.csv
+
+Nothing is re-implemented in JavaScript. The build compiles the current rule
+set and logic.py into a decision table:
+    risk      one risk code per (gleason, stage, n_stage, margin, pet, persistence,
+              PSA interval, PSADT interval). The PSA / PSADT axes are the intervals
+              between the cut-offs of the code and the CSV rules (rules_check.cutoffs):
+              for sorted cut-offs t1..tk, interval 2i is "between t_i and t_i+1" and
+              2i+1 is "exactly t_i+1"; PSADT adds a last "unknown" interval.
+              Every value of one interval classifies the same, so one representative
+              value per interval covers the whole input space.
+    rt_field  per (risk, PET), from logic.suggest_rt_field
+    adt       per (life expectancy, risk), from logic.suggest_adt
+    benefits  estimate per (risk, ADT, horizon knot), from benefit_tables
+The page only does lookups (LOGIC_JS); decide() below is the same lookup in
+Python, used by verify_static_build.py to check the table against decision.evaluate.
+"""
+import argparse
+import html
+import json
+import os
+import sys
+
+import numpy as np
+
+from . import benefit_tables, config_loader, logic, rules_check, vectorized, visuals
+from .constants import (
+    RiskLevel, RTField, ADTRecommendation,
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+DEFAULT_OUT = "dist/calculadora_adt.html"
+
+# Risk table axes before the PSA / PSADT intervals, outermost first
+RISK_DIMS = (
+    ('gleason', GleasonScore),
+    ('stage', TumorStage),
+    ('n_stage', NodalStage),
+    ('margin', MarginStatus),
+    ('pet_findings', PetFindings),
+    ('has_psa_persistence', (False, True)),
+)
+ENUMS = {
+    'gleason': GleasonScore,
+    'stage': TumorStage,
+    'n_stage': NodalStage,
+    'margin': MarginStatus,
+    'pet_findings': PetFindings,
+    'life_expectancy': LifeExpectancy,
+    'risk': RiskLevel,
+    'rt_field': RTField,
+    'adt': ADTRecommendation,
+}
+
+def interval_values(cuts):
+    """One representative value per interval of the sorted cut-offs (see module docstring)."""
+    values = rules_check.boundary_values(cuts)
+    if cuts and cuts[0] == 0:
+        # boundary_values skips negative values; keep interval 0 so the indexing holds
+        values = [-1.0] + values
+    return values
+
+def interval_index(cuts, value) -> int:
+    """Interval of value for sorted cut-offs; the lookup done by atomIndex in LOGIC_JS."""
+    i = 0
+    while i < len(cuts) and cuts[i] < value:
+        i += 1
+    return 2 * i + 1 if i < len(cuts) and cuts[i] == value else 2 * i
+
+def compile_risk(rules) -> dict:
+    """Risk codes over every enum combination x PSA interval x PSADT interval."""
+    psa_cuts, psadt_cuts = (sorted(set(c for c in cuts if c >= 0)) for cuts in rules_check.cutoffs(rules))
+    psa_values = interval_values(psa_cuts)
+    psadt_values = interval_values(psadt_cuts) + [np.nan]
+    axes = [np.arange(len(values)) for _, values in RISK_DIMS]
+    axes += [np.array(psa_values), np.array(psadt_values)]
+    grids = np.meshgrid(*axes, indexing='ij')
+    cols = {field: grid for (field, _), grid in zip(RISK_DIMS, grids)}
+    cols['has_psa_persistence'] = cols['has_psa_persistence'].astype(bool)
+    cols['psa_pre_srt'], cols['psadt_months'] = grids[-2], grids[-1]
+    codes = vectorized.classify_risk_codes(cols, rules)
+    return {
+        'dims': [[field, len(values)] for field, values in RISK_DIMS],
+        'psa_cuts': psa_cuts,
+        'psadt_cuts': psadt_cuts,
+        # One digit per case; a string is far smaller than a JSON array
+        'codes': "".join(str(int(c)) for c in codes.ravel()),
+    }
+
+def compile_benefits(tables) -> dict:
+    """[arr, arr label, NNT label, baseline] per risk x ADT x horizon knot."""
+    horizons = [float(h) for h in tables.knots]
+    estimates = [[[None] * len(horizons) for _ in ADTRecommendation] for _ in RiskLevel]
+    for k, horizon in enumerate(horizons):
+        for r, risk in enumerate(RiskLevel):
+            for a, est in enumerate(tables.estimates(risk, horizon).values()):
+                estimates[r][a][k] = [est.arr, est.arr_label, est.nnt_label, est.baseline]
+    return {
+        'horizons': horizons,
+        'default_horizon': benefit_tables.DEFAULT_HORIZON,
+        'baseline': [tables.baseline(risk) for risk in RiskLevel],
+        'estimates': estimates,
+    }
+
+def compile_table(rules_path=config_loader.DEFAULT_RULES_PATH,
+                  tables_path=benefit_tables.DEFAULT_TABLES_PATH) -> dict:
+    """The JSON-able decision table embedded in the page."""
+    tables = benefit_tables.load_tables(tables_path)
+    return {
+        'version': f"{config_loader.rules_version(rules_path)}.{tables.version}",
+        'enums': {field: [[m.name, m.value] for m in enum_cls] for field, enum_cls in ENUMS.items()},
+        'risk': compile_risk(config_loader.load_rules(rules_path)),
+        'rt_field': [[list(RTField).index(logic.suggest_rt_field(risk, pet)) for pet in PetFindings]
+                     for risk in RiskLevel],
+        'adt': [[list(ADTRecommendation).index(logic.suggest_adt(risk, le, False, False)) for risk in RiskLevel]
+                for le in LifeExpectancy],
+        'benefits': compile_benefits(tables),
+        'gauges': {
+            'risk': {'max': visuals.RISK_GAUGE_MAX, 'steps': [list(s) for s in visuals.RISK_GAUGE_STEPS]},
+            'arr': {'max': visuals.ARR_GAUGE_MAX, 'steps': [list(s) for s in visuals.ARR_GAUGE_STEPS]},
+        },
+    }
+
+def case_codes(case) -> dict:
+    """decision.Case -> the plain dict decide() and LOGIC_JS take (enum codes, PSADT None when unknown)."""
+    out = {field: list(ENUMS[field]).index(getattr(case, field))
+           for field in ('gleason', 'stage', 'n_stage', 'margin', 'pet_findings', 'life_expectancy')}
+    out['has_psa_persistence'] = bool(case.has_psa_persistence)
+    out['psa_pre_srt'] = case.psa_pre_srt
+    out['psadt_months'] = case.psadt_months
+    return out
+
+def decide(table, c, horizon=None) -> dict:
+    """Lookup of one case (case_codes format) in a compiled table; mirrors decide() in LOGIC_JS."""
+    risk_table = table['risk']
+    index = 0
+    for field, size in risk_table['dims']:
+        index = index * size + int(c[field])
+    psa_cuts, psadt_cuts = risk_table['psa_cuts'], risk_table['psadt_cuts']
+    index = index * (2 * len(psa_cuts) + 1) + interval_index(psa_cuts, c['psa_pre_srt'])
+    psadt = 2 * len(psadt_cuts) + 1 if c['psadt_months'] is None else interval_index(psadt_cuts, c['psadt_months'])
+    index = index * (2 * len(psadt_cuts) + 2) + psadt
+    risk = int(risk_table['codes'][index])
+
+    adt = table['adt'][c['life_expectancy']][risk]
+    benefits = table['benefits']
+    horizon = benefits['default_horizon'] if horizon is None else horizon
+    arr, arr_label, nnt_label, baseline = benefits['estimates'][risk][adt][benefits['horizons'].index(horizon)]
+    return {
+        'risk': risk, 'rt_field': table['rt_field'][risk][c['pet_findings']], 'adt': adt,
+        'baseline_risk': benefits['baseline'][risk], 'horizon': horizon, 'arr': arr,
+        'arr_label': arr_label, 'nnt_label': nnt_label, 'baseline': baseline,
+    }
+
+# Lookups only (no DOM); the node parity check in verify_static_build.py runs this as is
+LOGIC_JS = r"""
+function atomIndex(cuts, value) {
+  let i = 0;
+  while (i < cuts.length && cuts[i] < value) i++;
+  return i < cuts.length && cuts[i] === value ? 2 * i + 1 : 2 * i;
+}
+
+function classifyRisk(T, c) {
+  const R = T.risk;
+  let index = 0;
+  for (const [field, size] of R.dims) index = index * size + Number(c[field]);
+  index = index * (2 * R.psa_cuts.length + 1) + atomIndex(R.psa_cuts, c.psa_pre_srt);
+  const psadt = c.psadt_months === null ? 2 * R.psadt_cuts.length + 1 : atomIndex(R.psadt_cuts, c.psadt_months);
+  return Number(R.codes[index * (2 * R.psadt_cuts.length + 2) + psadt]);
+}
+
+function decide(T, c, horizon) {
+  const risk = classifyRisk(T, c);
+  const adt = T.adt[c.life_expectancy][risk];
+  const B = T.benefits;
+  const h = horizon === undefined ? B.default_horizon : horizon;
+  const [arr, arr_label, nnt_label, baseline] = B.estimates[risk][adt][B.horizons.indexOf(h)];
+  return {
+    risk, rt_field: T.rt_field[risk][c.pet_findings], adt, baseline_risk: B.baseline[risk],
+    horizon: h, arr, arr_label, nnt_label, baseline,
+  };
+}
+"""
+
+UI_JS = r"""
+const T = JSON.parse(document.getElementById("decision-table").textContent);
+const $ = (id) => document.getElementById(id);
+const fmt = (v) => String(Math.round(v * 10) / 10).replace(".", ",");
+
+for (const field of ["gleason", "stage", "n_stage", "margin", "pet_findings", "life_expectancy"]) {
+  const select = $(field);
+  T.enums[field].forEach(([name, label], code) => select.add(new Option(label, code)));
+}
+for (const h of T.benefits.horizons) $("horizon").add(new Option(h + " anos", h, false, h === T.benefits.default_horizon));
+
+function gauge(title, value, spec, color) {
+  const cx = 110, cy = 110, r = 85;
+  const angle = (v) => Math.PI * (1 - Math.min(Math.max(v, 0), spec.max) / spec.max);
+  const point = (a, radius) => [cx + radius * Math.cos(a), cy - radius * Math.sin(a)];
+  const arc = (from, to, radius, width, stroke) => {
+    const [x1, y1] = point(angle(from), radius), [x2, y2] = point(angle(to), radius);
+    return `<path d="M${x1} ${y1} A${radius} ${radius} 0 0 1 ${x2} ${y2}" stroke="${stroke}" stroke-width="${width}" fill="none"/>`;
+  };
+  const [tx1, ty1] = point(angle(value), r - 22), [tx2, ty2] = point(angle(value), r + 22);
+  return `<svg viewBox="0 0 220 150" role="img" aria-label="${title}: ${fmt(value)}%">
+    ${spec.steps.map(([from, to, fill]) => arc(from, to, r, 40, fill)).join("")}
+    ${value > 0 ? arc(0, value, r, 14, color) : ""}
+    <line x1="${tx1}" y1="${ty1}" x2="${tx2}" y2="${ty2}" stroke="black" stroke-width="4"/>
+    <text x="${cx}" y="${cy + 5}" text-anchor="middle" font-size="28">${fmt(Math.min(value, spec.max))}%</text>
+    <text x="${cx}" y="${cy + 35}" text-anchor="middle" font-size="13">${title}</text>
+  </svg>`;
+}
+
+function readCase() {
+  const psa = parseFloat($("psa_pre_srt").value);
+  const psadtText = $("psadt_months").value.trim();
+  const psadt = psadtText === "" ? null : parseFloat(psadtText);
+  if (!(psa >= 0) || (psadt !== null && !(psadt >= 0))) return null;
+  const c = { psa_pre_srt: psa, psadt_months: psadt, has_psa_persistence: $("has_psa_persistence").checked };
+  for (const field of ["gleason", "stage", "n_stage", "margin", "pet_findings", "life_expectancy"]) {
+    c[field] = Number($(field).value);
+  }
+  return c;
+}
+
+function render() {
+  const c = readCase();
+  $("error").hidden = c !== null;
+  $("result").hidden = c === null;
+  if (c === null) return;
+  const d = decide(T, c, Number($("horizon").value));
+  const riskName = T.enums.risk[d.risk][0];
+  $("risk").textContent = T.enums.risk[d.risk][1];
+  $("risk").className = "tier " + riskName.toLowerCase();
+  $("rt_field").textContent = T.enums.rt_field[d.rt_field][1];
+  $("adt").textContent = T.enums.adt[d.adt][1];
+  $("risk-gauge").innerHTML = gauge("Risco de Metástase (5 anos)", d.baseline_risk, T.gauges.risk, "darkred");
+  const hasBenefit = d.nnt_label !== "-";
+  $("benefit").hidden = !hasBenefit;
+  if (hasBenefit) {
+    $("benefit-title").textContent = `Benefício Absoluto Estimado (${d.horizon} anos)`;
+    $("arr-gauge").innerHTML = gauge("RRA (Redução de Risco)", d.arr, T.gauges.arr, "darkblue");
+    $("arr").textContent = d.arr_label.replace(".", ",") + "%";
+    $("nnt").textContent = d.nnt_label;
+  }
+}
+
+document.querySelectorAll("input, select").forEach((el) => el.addEventListener("input", render));
+render();
+"""
+
+PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="generator" content="src/static_build.py (tabela __VERSION__)">
+<title>Calculadora ADT - Câncer de Próstata</title>
+<style>
+body { font-family: Arial, sans-serif; max-width: 960px; margin: 0 auto; padding: 1rem; color: #222; }
+form { display: grid; grid-template-columns: repeat(auto-fit, minmax(260px, 1fr)); gap: 0.6rem 1.2rem; }
+label { display: flex; flex-direction: column; font-size: 0.9rem; gap: 0.2rem; }
+label.check { flex-direction: row; align-items: center; }
+select, input { padding: 0.3rem; font-size: 1rem; }
+.tier { padding: 0.6rem 1rem; border-radius: 0.4rem; font-weight: bold; font-size: 1.3rem; }
+.low { background: #d4edda; } .intermediate { background: #fff3cd; }
+.high, .very_high { background: #f8d7da; }
+.gauges { display: grid; grid-template-columns: repeat(auto-fit, minmax(260px, 1fr)); gap: 1rem; align-items: center; }
+.metric { font-size: 1.8rem; font-weight: bold; }
+small { color: #666; }
+</style>
+</head>
+<body>
+<h1>Quando associar hormonioterapia à radioterapia de salvamento no câncer de próstata</h1>
+<p><em>Atenção: Uso exclusivo para profissionais de saúde. Não substitui julgamento clínico.</em></p>
+<form onsubmit="return false">
+  <label>PSA pré-sRT (ng/mL)<input id="psa_pre_srt" type="number" min="0" step="0.01" value="0.5"></label>
+  <label>PSADT (meses; vazio = desconhecido)<input id="psadt_months" type="number" min="0" step="0.1"></label>
+  <label>Gleason / ISUP<select id="gleason"></select></label>
+  <label>Estadiamento patológico (pT)<select id="stage"></select></label>
+  <label>Estadiamento linfonodal (pN)<select id="n_stage"></select></label>
+  <label>Margens cirúrgicas<select id="margin"></select></label>
+  <label>PET-PSMA<select id="pet_findings"></select></label>
+  <label>Expectativa de vida<select id="life_expectancy"></select></label>
+  <label class="check"><input id="has_psa_persistence" type="checkbox"> PSA persistente pós-prostatectomia</label>
+</form>
+<p id="error" hidden>Informe valores válidos de PSA e PSADT (números ≥ 0).</p>
+<section id="result">
+  <h2>1. Perfil de Risco</h2>
+  <div id="risk" class="tier"></div>
+  <div class="gauges"><div id="risk-gauge"></div></div>
+  <h2>2. Conduta Sugerida</h2>
+  <p><strong>Campo de RT:</strong> <span id="rt_field"></span></p>
+  <p><strong>Hormonioterapia:</strong> <span id="adt"></span></p>
+  <div id="benefit">
+    <h2 id="benefit-title"></h2>
+    <label>Horizonte da estimativa<select id="horizon"></select></label>
+    <div class="gauges">
+      <div id="arr-gauge"></div>
+      <div><div>Redução Absoluta de Risco</div><div id="arr" class="metric"></div></div>
+      <div><div>Número Necessário para Tratar (NNT)</div><div id="nnt" class="metric"></div></div>
+    </div>
+  </div>
+</section>
+<p><small>Versão estática gerada a partir da tabela de decisão __VERSION__; valores ilustrativos.</small></p>
+<script id="decision-table" type="application/json">__TABLE__</script>
+<script>
+"use strict";
+__LOGIC__
+__UI__
+</script>
+</body>
+</html>
+"""
+
+def table_json(table) -> str:
+    # "</" would close the <script> element early
+    return json.dumps(table, separators=(',', ':')).replace("</", "<\\/")
+
+def render_page(table) -> str:
+    return (PAGE.replace("__VERSION__", html.escape(table['version']))
+            .replace("__TABLE__", table_json(table))
+            .replace("__LOGIC__", LOGIC_JS.strip())
+            .replace("__UI__", UI_JS.strip()))
+
+def build(out=DEFAULT_OUT, rules_path=config_loader.DEFAULT_RULES_PATH,
+          tables_path=benefit_tables.DEFAULT_TABLES_PATH) -> dict:
+    """Writes the page; returns the compiled table."""
+    table = compile_table(rules_path, tables_path)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        f.write(render_page(table))
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the standalone HTML calculator from the decision table.")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--rules", default=config_loader.DEFAULT_RULES_PATH)
+    parser.add_argument("--tables", default=benefit_tables.DEFAULT_TABLES_PATH)
+    args = parser.parse_args(argv)
+
+    for path in (args.rules, args.tables):
+        if not os.path.exists(path):
+            parser.error(f"no file at {path}")
+    table = build(args.out, args.rules, args.tables)
+    print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB, "
+          f"{len(table['risk']['codes']):,} risk cases, table {table['version']})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
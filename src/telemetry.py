@@ -0,0 +1,193 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import closing
+
+from .constants import RiskLevel, RTField, ADTRecommendation
+
+# Opt-in operational telemetry (off unless ADT_TELEMETRY is set).
+# Rows hold small integer codes and durations only: no free text, no dates,
+# no patient inputs, no session ids. Codes follow enum definition order.
+EVENTS = ('rerun', 'decision', 'export')
+OUTCOMES = ('ok', 'error', 'cached', 'rejected')
+COLUMNS = ('event', 'risk', 'rt_field', 'adt', 'outcome', 'duration_ms')
+
+CODEBOOK = {
+    'event': EVENTS,
+    'risk': tuple(m.name for m in RiskLevel),
+    'rt_field': tuple(m.name for m in RTField),
+    'adt': tuple(m.name for m in ADTRecommendation),
+    'outcome': OUTCOMES,
+}
+_ENUM_CODES = {
+    enum_cls: {m: i for i, m in enumerate(enum_cls)}
+    for enum_cls in (RiskLevel, RTField, ADTRecommendation)
+}
+
+def _code(value, enum_cls):
+    if value is None:
+        return None
+    if not isinstance(value, enum_cls):
+        raise TypeError(f"Expected {enum_cls.__name__}, got {type(value).__name__}")
+    return _ENUM_CODES[enum_cls][value]
+
+def make_row(event, risk=None, rt_field=None, adt=None, outcome=None, duration_ms=None) -> tuple:
+    """Validated row; anything outside the fixed vocabularies is rejected."""
+    if event not in EVENTS:
+        raise ValueError(f"Unknown telemetry event: {event!r}")
+    if outcome is not None and outcome not in OUTCOMES:
+        raise ValueError(f"Unknown telemetry outcome: {outcome!r}")
+    return (
+        EVENTS.index(event),
+        _code(risk, RiskLevel),
+        _code(rt_field, RTField),
+        _code(adt, ADTRecommendation),
+        None if outcome is None else OUTCOMES.index(outcome),
+        None if duration_ms is None else round(float(duration_ms), 3),
+    )
+
+class SQLiteSink:
+    """Appends batches to an events table; a codes table maps codes to names."""
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(sqlite3.connect(path, timeout=5.0)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events (event INTEGER NOT NULL, risk INTEGER, "
+                "rt_field INTEGER, adt INTEGER, outcome INTEGER, duration_ms REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS codes (field TEXT, code INTEGER, name TEXT, PRIMARY KEY (field, code))"
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO codes (field, code, name) VALUES (?, ?, ?)",
+                [(field, i, name) for field, names in CODEBOOK.items() for i, name in enumerate(names)]
+            )
+
+    def write(self, rows):
+        # One short-lived connection per batch: the writer thread is the only
+        # regular caller and batches are infrequent
+        with closing(sqlite3.connect(self.path, timeout=5.0)) as conn, conn:
+            conn.executemany(f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+class ParquetSink:
+    """Writes one Parquet file per batch into a directory."""
+    def __init__(self, directory):
+        import pyarrow  # noqa: F401 (fail at configuration time, not in the writer)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._seq = 0
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = [pa.int8()] * 5 + [pa.float64()]
+        table = pa.table({
+            name: pa.array([row[i] for row in rows], type=types[i]) for i, name in enumerate(COLUMNS)
+        })
+        self._seq += 1
+        name = f"events-{os.getpid()}-{time.monotonic_ns()}-{self._seq}.parquet"
+        pq.write_table(table, os.path.join(self.directory, name))
+
+class Telemetry:
+    """
+    Bounded ring buffer drained by a background writer thread.
+
+    record() is a deque append (O(1), no lock, no I/O). When the buffer is
+    full the oldest rows are overwritten and counted in `dropped`, so memory
+    stays bounded under bursts. The writer wakes every `interval` seconds,
+    or early once `batch_size` rows are waiting, and hands batches to the sink.
+    Sink failures drop the batch (counted in `failed_batches`); telemetry
+    never raises into the request path.
+    """
+    def __init__(self, sink, capacity=10_000, batch_size=500, interval=5.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0  # approximate under concurrent record() calls
+        self.written = 0
+        self.failed_batches = 0
+        self._buffer = deque(maxlen=capacity)
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def record(self, event, **fields):
+        row = make_row(event, **fields)
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def flush(self):
+        """Writes everything buffered so far (blocking)."""
+        with self._write_lock:
+            while self._buffer:
+                batch = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._buffer.popleft())
+                except IndexError:
+                    pass
+                try:
+                    self.sink.write(batch)
+                    self.written += len(batch)
+                except Exception:
+                    self.failed_batches += 1
+
+    def _loop(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+_shared = {'telemetry': None, 'configured': False}
+_shared_lock = threading.Lock()
+
+def get_telemetry():
+    """
+    Process-wide telemetry configured from ADT_TELEMETRY, or None (default: off).
+    Values: "sqlite:<path to .sqlite>" or "parquet:<directory>". An invalid value
+    or an unusable sink is reported once and leaves telemetry off.
+    """
+    with _shared_lock:
+        if not _shared['configured']:
+            spec = os.environ.get("ADT_TELEMETRY", "")
+            kind, _, target = spec.partition(":")
+            try:
+                if kind == "sqlite" and target:
+                    _shared['telemetry'] = Telemetry(SQLiteSink(target))
+                elif kind == "parquet" and target:
+                    _shared['telemetry'] = Telemetry(ParquetSink(target))
+                elif spec:
+                    raise ValueError(f"Invalid ADT_TELEMETRY: {spec!r}")
+            except Exception as e:
+                # A misconfiguration disables telemetry; it must not break the calculator or exports
+                print(f"Telemetry disabled: {e}")
+            if _shared['telemetry'] is not None:
+                # Writes whatever is still buffered on a clean shutdown
+                atexit.register(_shared['telemetry'].close)
+            _shared['configured'] = True
+        return _shared['telemetry']
+
+def record(event, **fields):
+    """Records one event when telemetry is enabled; a no-op otherwise."""
+    telemetry = get_telemetry()
+    if telemetry is not None:
+        telemetry.record(event, **fields)
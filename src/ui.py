@@ -3,19 +3,187 @@ from .constants import (
     GleasonScore, TumorStage, MarginStatus, PetFindings, LifeExpectancy,
     RiskLevel, RTField, ADTRecommendation, NodalStage
 )
-from .logic import calculate_psadt
+from .logic import (
+    calculate_psadt, PSA_INTERMEDIATE_CUTOFF, PSA_HIGH_CUTOFF, PSADT_VERY_HIGH_CUTOFF, PSADT_HIGH_CUTOFF
+)
+from . import benefit_tables, cache, codec, metrics, risk_score, session_store, telemetry, uncertainty
+from .decision import Case
 import pandas as pd
+import functools
+import uuid
 from datetime import date
 
 def reset_session():
     """Callback to clear session state"""
+    store = session_store.get_session_store()
+    if store is not None:
+        store.delete(_session_id())
     for key in list(st.session_state.keys()):
         del st.session_state[key]
 
+def _session_id():
+    """
+    Session id carried in the ?sid= query param (created on first visit),
+    so any replica can pick the case up from the external session store.
+    """
+    sid = st.query_params.get("sid")
+    if not sid or not sid.isalnum():
+        sid = uuid.uuid4().hex
+        st.query_params["sid"] = sid
+    return sid
+
+def _hydrate_session():
+    """Restores the case inputs from the external session store once per session."""
+    store = session_store.get_session_store()
+    if store is None or st.session_state.get('_hydrated'):
+        return
+    st.session_state._hydrated = True
+    
+    restored = session_store.load_state(store.load(_session_id()))
+    rows = restored.pop(session_store.PSA_ROWS_KEY, None)
+    for key, val in restored.items():
+        st.session_state[key] = val
+    if rows:
+        st.session_state[session_store.PSA_ROWS_KEY] = rows
+        st.session_state.psadt_data = pd.DataFrame(
+            [{"Data": date.fromisoformat(d) if d else None, "PSA (ng/mL)": v} for d, v in rows]
+        )
+
+def _persist_session():
+    """Writes the compact case inputs to the external session store when they changed."""
+    store = session_store.get_session_store()
+    if store is None:
+        return
+    data = session_store.dump_state(st.session_state)
+    if data != st.session_state.get('_persisted'):
+        store.save(_session_id(), data)
+        st.session_state._persisted = data
+
+def _psa_option_for(psa):
+    """PSA bucket option (sidebar selectbox) containing a PSA value."""
+    if psa <= 0.3:
+        return "<= 0,3 ng/mL"
+    if psa <= 0.7:
+        return "> 0,3 a <= 0,7 ng/mL"
+    return "> 0,7 ng/mL"
+
+# Plausible true PSA range behind each sidebar option (uncertainty mode);
+# the open upper band is capped at 2 ng/mL
+PSA_OPTION_RANGES = {
+    "<= 0,3 ng/mL": (0.1, 0.3),
+    "> 0,3 a <= 0,7 ng/mL": (0.3, 0.7),
+    "> 0,7 ng/mL": (0.7, 2.0),
+}
+
+def _apply_shared_case():
+    """Fills the sidebar from a shared ?case= link (see codec.py), once per token."""
+    token = st.query_params.get("case")
+    if not token or st.session_state.get('_shared_case') == token:
+        return
+    st.session_state._shared_case = token
+    try:
+        case = codec.from_token(token)
+    except ValueError:
+        st.sidebar.warning("Link de caso inválido.")
+        return
+    
+    st.session_state.psa_option = _psa_option_for(case.psa_pre_srt)
+    if case.psadt_months is None:
+        st.session_state.psadt_option = "Desconhecido / Não calculado"
+    else:
+        st.session_state.psadt_option = "Conhecido"
+        st.session_state.psadt_input = case.psadt_months
+    for key in ('gleason', 'stage', 'n_stage', 'margin', 'pet_findings', 'life_expectancy',
+                'has_psa_persistence', 'has_cardio', 'has_metabolic', 'has_bone', 'has_libido_concern'):
+        st.session_state[key] = getattr(case, key)
+
+def psadt_table_key(df) -> tuple:
+    """Hashable snapshot of the PSADT editor rows: ((iso date, psa), ...)."""
+    dates = pd.to_datetime(df["Data"]).dt.date.tolist()
+    values = df["PSA (ng/mL)"].tolist()
+    return tuple(
+        (None if pd.isna(d) else d.isoformat(), None if pd.isna(v) else float(v))
+        for d, v in zip(dates, values)
+    )
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def _psadt_from_table(table_key):
+    dates = [date.fromisoformat(d) if d else None for d, _ in table_key]
+    values = [v if v is not None else 0.0 for _, v in table_key]
+    return calculate_psadt(dates, values)
+
+@st.fragment
+def _render_psadt_calculator():
+    """
+    PSA rows editor. Editing a row only reruns this fragment; PSADT is
+    recomputed from the cached table hash and the full app reruns only when
+    the calculated value actually changes.
+    """
+    st.markdown("Insira datas e valores de PSA:")
+    
+    # Default empty data
+    if 'psadt_data' not in st.session_state:
+        st.session_state.psadt_data = pd.DataFrame(
+            [
+                {"Data": date.today(), "PSA (ng/mL)": 0.0},
+                {"Data": date.today(), "PSA (ng/mL)": 0.0},
+            ]
+        )
+
+    edited_df = st.data_editor(
+        st.session_state.psadt_data,
+        num_rows="dynamic",
+        column_config={
+            "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+            "PSA (ng/mL)": st.column_config.NumberColumn("PSA", min_value=0.0, format="%.2f"),
+        },
+        key="psadt_editor"
+    )
+    
+    table_key = psadt_table_key(edited_df)
+    result = _psadt_from_table(table_key)
+    
+    if table_key != st.session_state.get(session_store.PSA_ROWS_KEY):
+        st.session_state[session_store.PSA_ROWS_KEY] = table_key
+        _persist_session()
+    
+    if result:
+        st.success(f"PSADT Calculado: {result} meses")
+    elif sum(1 for d, v in table_key if d and v) < 2:
+        st.caption("Preencha ao menos duas medidas de PSA para calcular.")
+    else:
+        st.error("Dados insuficientes ou inválidos (PSA estável/caindo?).")
+
+    # Only push a newly calculated value, so a manual PSADT entry isn't overwritten
+    if result and result != st.session_state.get('psadt_calculated'):
+        st.session_state.psadt_calculated = result
+        st.session_state.psadt_input = result
+        st.rerun()
+
+def _psadt_slope_se(psadt_months):
+    """
+    Regression standard error of the PSA slope from the calculator rows, when
+    they produced the current PSADT (a manually typed PSADT has none).
+    """
+    rows = st.session_state.get(session_store.PSA_ROWS_KEY)
+    if not rows or psadt_months is None:
+        return None
+    table_key = tuple(tuple(row) for row in rows)
+    if _psadt_from_table(table_key) != psadt_months:
+        return None
+    fit = uncertainty.psadt_slope_fit(
+        [date.fromisoformat(d) if d else None for d, _ in table_key],
+        [v for _, v in table_key],
+    )
+    return fit[1] if fit else None
+
 def render_inputs():
     """
     Renders the sidebar inputs and returns a dictionary of values.
     """
+    _hydrate_session()
+    _apply_shared_case()
+    
     st.sidebar.header("Dados Clínicos")
     
     if st.sidebar.button("Limpar/Resetar Dados", type="primary"):
@@ -24,11 +192,8 @@ def render_inputs():
     
     psa_option = st.sidebar.selectbox(
         "PSA pré-sRT (ng/dL)", 
-        options=[
-            "<= 0,3 ng/mL",
-            "> 0,3 a <= 0,7 ng/mL",
-            "> 0,7 ng/mL"
-        ]
+        options=list(PSA_OPTION_RANGES),
+        key="psa_option"
     )
     
     # Map selection
@@ -43,49 +208,20 @@ def render_inputs():
 
     has_psa_persistence = st.sidebar.checkbox(
         "Persistência do PSA (Nunca indetectável pós-PR)",
-        help="Se o PSA nunca baixou para < 0.1 ng/mL após a cirurgia."
+        help="Se o PSA nunca baixou para < 0.1 ng/mL após a cirurgia.",
+        key="has_psa_persistence"
     )
     
     psadt_option = st.sidebar.radio(
         "Tempo de Duplicação do PSA (PSADT)",
-        options=["Conhecido", "Desconhecido / Não calculado"]
+        options=["Conhecido", "Desconhecido / Não calculado"],
+        key="psadt_option"
     )
     
     psadt_months = None
     if psadt_option == "Conhecido":
         with st.sidebar.expander("Calculadora de PSADT", expanded=False):
-            st.markdown("Insira datas e valores de PSA:")
-            
-            # Default empty data
-            if 'psadt_data' not in st.session_state:
-                st.session_state.psadt_data = pd.DataFrame(
-                    [
-                        {"Data": date.today(), "PSA (ng/mL)": 0.0},
-                        {"Data": date.today(), "PSA (ng/mL)": 0.0},
-                    ]
-                )
-
-            edited_df = st.data_editor(
-                st.session_state.psadt_data,
-                num_rows="dynamic",
-                column_config={
-                    "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
-                    "PSA (ng/mL)": st.column_config.NumberColumn("PSA", min_value=0.0, format="%.2f"),
-                },
-                key="psadt_editor"
-            )
-            
-            if st.button("Calcular PSADT"):
-                dates = pd.to_datetime(edited_df["Data"]).dt.date.tolist()
-                values = edited_df["PSA (ng/mL)"].tolist()
-                
-                result = calculate_psadt(dates, values)
-                
-                if result:
-                    st.success(f"PSADT Calculado: {result} meses")
-                    st.session_state.psadt_input = result
-                else:
-                    st.error("Dados insuficientes ou inválidos (PSA estável/caindo?).")
+            _render_psadt_calculator()
 
         psadt_months = st.sidebar.number_input(
             "PSADT (meses)", 
@@ -99,25 +235,29 @@ def render_inputs():
     gleason = st.sidebar.selectbox(
         "Histologia (ISUP Grade Group)",
         options=[e for e in GleasonScore],
-        format_func=lambda x: x.value
+        format_func=lambda x: x.value,
+        key="gleason"
     )
     
     stage = st.sidebar.selectbox(
         "Estadiamento Patológico (pT)",
         options=[e for e in TumorStage],
-        format_func=lambda x: x.value
+        format_func=lambda x: x.value,
+        key="stage"
     )
 
     n_stage = st.sidebar.selectbox(
         "Estadiamento Patológico (pN)",
         options=[e for e in NodalStage],
-        format_func=lambda x: x.value
+        format_func=lambda x: x.value,
+        key="n_stage"
     )
     
     margin = st.sidebar.selectbox(
         "Margem Cirúrgica",
         options=[e for e in MarginStatus],
-        format_func=lambda x: x.value
+        format_func=lambda x: x.value,
+        key="margin"
     )
     
     st.sidebar.markdown("---")
@@ -125,7 +265,8 @@ def render_inputs():
     pet_findings = st.sidebar.selectbox(
         "Achados PET-PSMA",
         options=[e for e in PetFindings],
-        format_func=lambda x: x.value
+        format_func=lambda x: x.value,
+        key="pet_findings"
     )
     
     st.sidebar.markdown("---")
@@ -133,14 +274,17 @@ def render_inputs():
     life_expectancy = st.sidebar.radio(
         "Expectativa de Vida",
         options=[e for e in LifeExpectancy],
-        format_func=lambda x: x.value
+        format_func=lambda x: x.value,
+        key="life_expectancy"
     )
     
     st.sidebar.markdown("**Fatores contra hormonioterapia**")
-    has_cardio = st.sidebar.checkbox("Alto Risco Cardiovascular (IAM, AVC prévio)")
-    has_metabolic = st.sidebar.checkbox("Sindrome Metabólica Grave / Diabetes descompensado")
-    has_bone = st.sidebar.checkbox("Osteoporose grave / Fratura prévia")
-    has_libido_concern = st.sidebar.checkbox("Paciente não aceita os efeitos da castração (libido)")
+    has_cardio = st.sidebar.checkbox("Alto Risco Cardiovascular (IAM, AVC prévio)", key="has_cardio")
+    has_metabolic = st.sidebar.checkbox("Sindrome Metabólica Grave / Diabetes descompensado", key="has_metabolic")
+    has_bone = st.sidebar.checkbox("Osteoporose grave / Fratura prévia", key="has_bone")
+    has_libido_concern = st.sidebar.checkbox("Paciente não aceita os efeitos da castração (libido)", key="has_libido_concern")
+    
+    _persist_session()
     
     return {
         "psa_pre_srt": psa_pre_srt,
@@ -162,14 +306,145 @@ def render_inputs():
 def render_results(risk, rt_field, adt, inputs):
     """
     Renders the decision support output blocks.
+
+    The risk, benefits and export blocks are fragments: each one only takes
+    the values it depends on, so an interaction inside one of them reruns
+    just that block instead of the whole script.
     """
     st.header("Análise de Decisão Compartilhada")
     
+    # Depends on: risk, gleason, stage, psadt, PET
+    _render_risk_block(risk, inputs)
+    
+    # Block 2: Pros vs Cons (Trade-offs)
+    st.markdown("---")
+    st.subheader("2. Balança da Decisão (Trade-offs)")
+    
+    c_favor, c_against = st.columns(2)
+    
+    with c_favor:
+        st.markdown("#### Favorece Intensificação")
+        if risk == RiskLevel.HIGH:
+            st.success("Alto Risco de Metástase a Distância: Benefício claro de ADT Longa + Tratamento de Pelve.")
+        elif risk == RiskLevel.INTERMEDIATE:
+            st.warning("Benefício potencial de ADT Curta para reduzir recorrência bioquímica.")
+        else:
+            st.info("Perfil favorável: Baixo benefício de intensificação.")
+            
+    with c_against:
+        st.markdown("#### Pesa Contra Intensificação")
+        contra_factors = []
+        if inputs['has_cardio']:
+            contra_factors.append("Risco Cardiovascular: Alerta para ADT.")
+        if inputs['has_metabolic']:
+            contra_factors.append("Risco Metabólico: Piora com ADT.")
+        if inputs['has_bone']:
+            contra_factors.append("Saúde Óssea: Risco de fratura com ADT.")
+        if inputs['life_expectancy'] == LifeExpectancy.SHORT:
+            contra_factors.append("Expectativa de Vida Limitada: Toxicidade pode superar benefício.")
+        if inputs['has_libido_concern']:
+            contra_factors.append("Preferência do Paciente: Forte aversão aos efeitos na libido.")
+            
+        if contra_factors:
+            for c in contra_factors:
+                st.error(c)
+        else:
+            st.write("Sem comorbidades maiores proibitivas selecionadas.")
+
+    # Adjust display text if comorbidities exist but clinical risk suggests ADT
+    is_contraindicated = (inputs['has_cardio'] or inputs['has_metabolic']) and adt != ADTRecommendation.NONE
+    
+    # Block 3: Final Recommendation
+    st.markdown("---")
+    st.subheader("3. Sugestão Terapêutica (Baseada em Diretrizes)")
+    
+    # Logic to frame the recommendation text nicely
+    # Note: The 'adt' input is the "ideal" clinical recommendation from logic.py
+    # We clarify it based on comorbidities.
+    
+    st.markdown(f"**Campo de Radioterapia:** **{rt_field.value}**")
+    
+    rec_text = adt.value
+    
+    st.markdown("### Estratégia Preferida")
+    if is_contraindicated:
+        st.warning(f"Indicação Clínica: **{rec_text}**")
+        st.markdown("*Nota: Devido às comorbidades, considerar redução de duração ou monitoramento estrito.*")
+    else:
+        st.success(f"**{rec_text}**")
+        
+    # Depends on: risk, ADT recommendation
+    _render_benefits_block(risk, adt)
+
+    st.markdown("#### Alternativa Razoável")
+    if risk == RiskLevel.HIGH:
+        if is_contraindicated:
+            st.write("sRT + ADT Curta (Descalonamento por toxicidade)")
+        else:
+            st.write("sRT + ADT Curta (Se preocupação com qualidade de vida)")
+    elif risk == RiskLevel.INTERMEDIATE:
+        st.write("sRT Isolada (Discussão sobre benefício marginal da ADT)")
+    else:
+        st.write("Observação vigilante (em casos selecionados) ou sRT precoce sem ADT.")
+
+    # Disclaimer (Footer)
+    st.markdown("---")
+    if session_store.get_session_store() is None:
+        st.caption("Ferramenta auxiliar. Dados não são armazenados (Compliance LGPD/HIPAA).")
+    else:
+        st.caption("Ferramenta auxiliar. Apenas os dados de entrada da sessão são armazenados, sem identificação do paciente (Compliance LGPD/HIPAA).")
+    if telemetry.get_telemetry() is not None:
+        st.caption("Telemetria de uso ativada: apenas categorias de risco/conduta e tempos de resposta, sem dados do paciente.")
+    
+    with st.expander("Aviso Legal (Disclaimer)", expanded=False):
+        st.markdown("""
+        **AVISO LEGAL**: Esta ferramenta é destinada exclusivamente ao uso por profissionais de saúde qualificados. 
+        As estimativas de risco e benefício são baseadas em dados da literatura médica agregada e podem não refletir o resultado individual de cada paciente.
+        Esta calculadora **NÃO** fornece aconselhamento médico direto, diagnóstico ou prescrição. 
+        A decisão final sobre o tratamento deve ser tomada pelo médico assistente, em conjunto com o paciente, considerando todas as variáveis clínicas.
+        O desenvolvedor não se responsabiliza por decisões tomadas com base nestas informações.
+        """)
+
+    # References
+    with st.expander("Referências Bibliográficas", expanded=False):
+        st.markdown("""
+        1. Zaurito P, Cosenza A, Quarta L, Scilipoti S, Longoni M, Santangelo A, et al. A Narrative Review of Treatment Options for Patients with Node-Positive Disease After Radical Prostatectomy: Current Evidence and Controversies. Cancers. 2025;17(17):2792.
+        2. Shimabukuro T, Tokunaga T, Shimizu K, Fujii N, Kobayashi K, Hiroyoshi T, et al. Time to Prostate-Specific Antigen Failure as a Unique Prognosticator of Overall Survival in Biochemically Recurrent Prostate Cancer Patients Undergoing Radical Prostatectomy. Adv Urol. 2025;2025:2961319.
+        3. Challis B, Kneebone A, Eade T, Guo L, Atyeo J, Brown C, et al. Avoiding prostate bed radiation for the PSMA-PET detected nodal recurrence patient post prostatectomy. Clin Transl Radiat Oncol. 2025;50:100896.
+        4. Cornford P, Tilki D, van den Bergh RCN, Eberli D, De Meerleer G, De Santis M, et al. EAU-EANM-ESTRO-ESUR-ISUP-SIOG Guidelines on Prostate Cancer. Arnhem (NL): EAU Guidelines Office; 2025.
+        5. Di Giorgio A, Siepe G, Serani F, Di Franco M, Malizia C, Castellucci P, et al. Long-term outcomes of PSMA PET/CT-guided radiotherapy in biochemical failure patients post-radical prostatectomy: a 5-year follow-up analysis. Eur J Nucl Med Mol Imaging. 2025;52(13):3720–3729.
+        6. Yang YJ, Min K, Tae JH, Lee CU, Choi J, Kim JH, et al. Oncologic outcomes of salvage radiotherapy and lymphadenectomy for positron emission tomography-positive lymph nodes in biochemical recurrence: A systematic review to inform treatment decisions. Prostate Int. 2025; (In Press).
+        7. Vorbach SM, Rittmayer H, Seppi T, Nilica B, Kafka M, Ganswindt U. PSMA-PET/CT-based salvage elective nodal radiotherapy for lymph node recurrence following radical prostatectomy. World J Urol. 2025;43(1):571.
+        8. Belliveau C, Saad F, Duplan D, Petit C, Delouya G, Taussky D, et al. Prostate-Specific Membrane Antigen PET-Guided Intensification of Salvage Radiotherapy After Radical Prostatectomy: A Phase 2 Randomized Clinical Trial (PSMAiSRT). JAMA Oncol. 2025. doi:10.1001/jamaoncol.2025.3746.
+        9. Le QC, Siech C, Hoeh B, Saad F, Preisser F, Tilki D, et al. Influence of Concomitant Androgen Deprivation Therapy and Its Duration for Salvage Radiation After Radical Prostatectomy: A Systematic Review and Network Meta-analysis According to Published Data. Eur Urol Oncol. 2025;8(2):1406–1415.
+        10. Gillessen S, Turco F, Davis ID, Efstathiou JA, Fizazi K, James ND, et al. Consensus Questions APCCC 2024. Advanced Prostate Cancer Consensus Conference; 2024 Apr 25-27; Lugano, Switzerland.
+        11. Advanced Prostate Cancer Consensus Conference (APCCC). Resumo das Perguntas, Alternativas e Status de Votação: Persistência de PSA e Recidiva Bioquímica pós-Prostatectomia Radical. Lugano: APCCC; 2024.
+        12. Morgan TM, Boorjian SA, Buyyounouski MK, Chapin BF, Chen DYT, Cheng HH, et al. Salvage Therapy for Prostate Cancer: AUA/ASTRO/SUO Guideline 2024. Linthicum (MD): American Urological Association; 2024.
+        13. Gillessen S, Turco F, Davis ID, Efstathiou JA, Fizazi K, James ND, et al. Management of Patients with Advanced Prostate Cancer. Report from the 2024 Advanced Prostate Cancer Consensus Conference (APCCC). Eur Urol. 2024. doi:10.1016/j.eururo.2024.09.017.
+        14. Instituto D’Or de Oncologia (IDO). Projeto de Pesquisa: Manejo do Paciente com Recidiva Bioquímica Pós-Prostatectomia Radical e Recorrência Nodal Regional Detectada por PSMA PET/CT. Rio de Janeiro: IDO; 2023.
+        15. Tamihardja J, Zehner L, Hartrampf P, Lisowski D, Kneitz S, Cirsi S, et al. Salvage Nodal Radiotherapy as Metastasis-Directed Therapy for Oligorecurrent Prostate Cancer Detected by Positron Emission Tomography Shows Favorable Outcome in Long-Term Follow-Up. Cancers. 2022;14(15):3766.
+        16. Attard G, Murphy L, Clarke NW, Cross W, Jones RJ, Parker CC, et al. Abiraterone acetate and prednisolone with or without enzalutamide for high-risk non-metastatic prostate cancer: a meta-analysis of primary results from two randomised controlled phase 3 trials of the STAMPEDE platform protocol. Lancet. 2022;399(10323):447–460
+        """)
+
+    # Depends on: full inputs + decision (report content)
+    _render_export_block(inputs, risk, rt_field, adt)
+
+def _br(value):
+    """Number with a decimal comma (pt-BR), e.g. 0.3 -> "0,3"."""
+    return f"{value:g}".replace('.', ',')
+
+def _pct(p):
+    """Probability as a pt-BR percentage, e.g. 0.125 -> "12,5%"."""
+    return f"{p * 100:.1f}%".replace('.', ',')
+
+@st.fragment
+def _render_risk_block(risk, inputs):
+    """Block 1: risk classification, baseline metastasis gauge and risk factors."""
+    baseline_risk = cache.baseline_risk(risk)
+    
     # Block 1: Patient Profile & Risk
     st.subheader("1. Perfil de Risco")
     
-    col1, col2, col3 = st.columns([1, 1, 1]) # Adjusted columns
-    
     # Dynamic styling for risk
     if risk == RiskLevel.VERY_HIGH or risk == RiskLevel.HIGH:
         risk_func = st.error # Red
@@ -212,16 +487,26 @@ def render_results(risk, rt_field, adt, inputs):
     col1, col2 = st.columns([1, 1]) # Two columns now (Gauge + Factors)
 
     with col1:
-        from . import visuals
-        # We need benefit data here. It was calculated later in the original code.
-        # Let's fetch it now.,
-        from . import logic
-        local_benefit = logic.get_absolute_benefits(risk, adt)
-        baseline_risk = logic.get_baseline_recurrence_risk(risk)
-        
-        # User Request: Change first gauge to Metastasis Risk Gauge
-        fig = visuals.create_risk_gauge(baseline_risk)
+        continuous = st.toggle(
+            "Escore contínuo (modelo logístico)",
+            key="continuous_score",
+            help="Probabilidade individual de metástase em 5 anos a partir de PSA e PSADT contínuos e dos demais fatores, em vez do valor fixo da categoria."
+        )
+        if continuous:
+            probability = risk_score.case_probability(Case.from_dict(inputs))
+            # One decimal keeps the number of cached gauges bounded
+            fig = cache.risk_gauge(round(probability * 100, 1))
+        else:
+            # User Request: Change first gauge to Metastasis Risk Gauge
+            fig = cache.risk_gauge(baseline_risk)
         st.plotly_chart(fig, use_container_width=True)
+        if continuous:
+            score_tier = risk_score.tier_from_probability(probability)
+            st.caption(
+                f"Escore individual: {_pct(probability)} (faixa de {score_tier.value}). "
+                "Modelo ilustrativo; a classificação em 4 categorias continua sendo a referência para a conduta."
+                + (f" O escore difere da classificação ({risk.value})." if score_tier != risk else "")
+            )
 
     with col2:
         st.markdown("**Fatores de Risco**")
@@ -240,79 +525,66 @@ def render_results(risk, rt_field, adt, inputs):
         else:
             for f in factors:
                 st.write(f)
-            
-    # Block 2: Pros vs Cons (Trade-offs)
-    st.markdown("---")
-    st.subheader("2. Balança da Decisão (Trade-offs)")
-    
-    c_favor, c_against = st.columns(2)
-    
-    with c_favor:
-        st.markdown("#### Favorece Intensificação")
-        if risk == RiskLevel.HIGH:
-            st.success("Alto Risco de Metástase a Distância: Benefício claro de ADT Longa + Tratamento de Pelve.")
-        elif risk == RiskLevel.INTERMEDIATE:
-            st.warning("Benefício potencial de ADT Curta para reduzir recorrência bioquímica.")
-        else:
-            st.info("Perfil favorável: Baixo benefício de intensificação.")
-            
-    with c_against:
-        st.markdown("#### Pesa Contra Intensificação")
-        contra_factors = []
-        if inputs['has_cardio']:
-            contra_factors.append("Risco Cardiovascular: Alerta para ADT.")
-        if inputs['has_metabolic']:
-            contra_factors.append("Risco Metabólico: Piora com ADT.")
-        if inputs['has_bone']:
-            contra_factors.append("Saúde Óssea: Risco de fratura com ADT.")
-        if inputs['life_expectancy'] == LifeExpectancy.SHORT:
-            contra_factors.append("Expectativa de Vida Limitada: Toxicidade pode superar benefício.")
-        if inputs['has_libido_concern']:
-            contra_factors.append("Preferência do Paciente: Forte aversão aos efeitos na libido.")
-            
-        if contra_factors:
-            for c in contra_factors:
-                st.error(c)
-        else:
-            st.write("Sem comorbidades maiores proibitivas selecionadas.")
 
-    # Block 3: Final Recommendation
-    st.markdown("---")
-    st.subheader("3. Sugestão Terapêutica (Baseada em Diretrizes)")
-    
-    # Logic to frame the recommendation text nicely
-    # Note: The 'adt' input is the "ideal" clinical recommendation from logic.py
-    # We clarify it based on comorbidities.
-    
-    import textwrap
-    
-    st.markdown(f"**Campo de Radioterapia:** **{rt_field.value}**")
-    
-    rec_text = adt.value
-    
-    # Adjust display text if comorbidities exist but clinical risk suggests ADT
-    is_contraindicated = (inputs['has_cardio'] or inputs['has_metabolic']) and adt != ADTRecommendation.NONE
+    with st.expander("Mapa de sensibilidade (PSA × PSADT)", expanded=False):
+        st.caption(
+            "Classificação de risco para outros valores de PSA e PSADT, mantendo os demais "
+            "dados do paciente. Os limiares atuais são "
+            f"PSA {_br(PSA_INTERMEDIATE_CUTOFF)}/{_br(PSA_HIGH_CUTOFF)} ng/mL e "
+            f"PSADT {_br(PSADT_VERY_HIGH_CUTOFF)}/{_br(PSADT_HIGH_CUTOFF)} meses."
+        )
+        st.plotly_chart(cache.risk_heatmap(inputs), use_container_width=True)
+        if inputs['psadt_months'] is None:
+            st.caption("PSADT desconhecido: o paciente não é marcado no mapa.")
+
+    if st.toggle("Modo incerteza (Monte Carlo)", key="uncertainty_mode",
+                 help="Simula valores plausíveis de PSA (faixa selecionada e CV do ensaio) e de PSADT (erro da regressão)."):
+        probs = cache.decision_probabilities(
+            inputs, PSA_OPTION_RANGES.get(inputs.get('psa_label')), _psadt_slope_se(inputs['psadt_months'])
+        )
+        u_col1, u_col2 = st.columns(2)
+        with u_col1:
+            st.markdown("**Probabilidade da classificação**")
+            for level, p in probs['risk'].items():
+                st.progress(p, text=f"{level.value}: {_pct(p)}")
+        with u_col2:
+            st.markdown("**Probabilidade da recomendação de ADT**")
+            for rec, p in probs['adt'].items():
+                st.progress(p, text=f"{rec.value}: {_pct(p)}")
+        st.caption(f"{probs['n']:,} simulações".replace(',', '.')
+                   + (f"; PSADT sem duplicação em {_pct(probs['psadt_unknown'])} delas." if inputs['psadt_months'] else "."))
+
+@st.fragment
+def _render_benefits_block(risk, adt):
+    """Absolute benefit gauge, ARR/NNT metrics and the 100-patient icon array."""
+    # Benefit and baseline lookups are cached per rule-set version (see cache.py)
+    benefit = cache.benefit_estimate(risk, adt)
+    horizon = benefit_tables.DEFAULT_HORIZON
     
-    st.markdown("### Estratégia Preferida")
-    if is_contraindicated:
-        st.warning(f"Indicação Clínica: **{rec_text}**")
-        st.markdown("*Nota: Devido às comorbidades, considerar redução de duração ou monitoramento estrito.*")
-    else:
-        st.success(f"**{rec_text}**")
-        
     # Absolute Benefits Section
-    benefit_data = settings_benefits(risk, adt)
-    if benefit_data['arr_5yr'] != 0.0:
+    if benefit.has_benefit:
         st.markdown("---")
-        st.subheader("Benefício Absoluto Estimado (5 anos)")
+        horizons = [int(h) for h in benefit_tables.load_tables().knots]
+        horizon = st.radio(
+            "Horizonte da estimativa",
+            options=horizons,
+            index=horizons.index(int(benefit_tables.DEFAULT_HORIZON)),
+            format_func=lambda h: f"{h} anos",
+            horizontal=True,
+            key="benefit_horizon"
+        )
+        benefit = cache.benefit_estimate(risk, adt, horizon)
+        baseline_risk = benefit.baseline
+        st.subheader(f"Benefício Absoluto Estimado ({horizon} anos)")
         st.markdown("*Comparado à radioterapia isolada (Estimativa baseada em ensaios clínicos)*")
+        if horizon != benefit_tables.DEFAULT_HORIZON:
+            st.caption("Horizontes diferentes de 5 anos são extrapolados dos dados de 5 anos (risco constante); valores ilustrativos.")
         
         # 3 Columns: Gauge ARR | Metric ARR | Metric NNT
         b_col0, b_col1, b_col2 = st.columns([1, 1, 1])
         
         with b_col0:
-             from . import visuals
-             fig_arr = visuals.create_arr_gauge(benefit_data['arr_5yr'])
+             fig_arr = cache.arr_gauge(benefit.arr)
              st.plotly_chart(fig_arr, use_container_width=True)
 
         with b_col1:
@@ -320,7 +592,7 @@ def render_results(risk, rt_field, adt, inputs):
              st.markdown("### ")
              st.metric(
                 label="Redução Absoluta de Risco", 
-                value=f"{benefit_data['arr_5yr']}%"
+                value=f"{benefit.arr_label}%"
             )
             
         with b_col2:
@@ -328,7 +600,7 @@ def render_results(risk, rt_field, adt, inputs):
              st.markdown("### ")
              st.metric(
                 label="Número Necessário para Tratar (NNT)", 
-                value=f"{benefit_data['nnt']}",
+                value=benefit.nnt_label,
                 help="Número de pacientes que precisam receber ADT para evitar 1 evento de recorrência/metástase."
             )
             
@@ -338,114 +610,132 @@ def render_results(risk, rt_field, adt, inputs):
         
         w_col1, w_col2 = st.columns([1, 1])
         
-        baseline_risk = logic.get_baseline_recurrence_risk(risk)
-        waffle_fig = visuals.create_waffle_chart(benefit_data['arr_5yr'], baseline_risk)
+        waffle_fig = cache.waffle_chart(benefit.arr, baseline_risk)
+        n_prevented = int(round(benefit.arr))
+        n_recurrence = int(round(max(baseline_risk - benefit.arr, 0)))
         
         with w_col1:
             st.plotly_chart(waffle_fig, use_container_width=True)
             
         with w_col2:
             st.markdown("#### Legenda")
-            st.markdown(f"🔴 **Recorrência ({int(max(baseline_risk - (benefit_data['arr_5yr'] if isinstance(benefit_data['arr_5yr'], (int, float)) else 0), 0))}):** Pacientes que recidivam mesmo com o tratamento.")
-            st.markdown(f"🟢 **Benefício ({int(benefit_data['arr_5yr'] if isinstance(benefit_data['arr_5yr'], (int, float)) else 0)}):** Pacientes salvos da recorrência pela ADT.")
-            st.markdown(f"🔵 **Sem Recorrência ({100 - int(baseline_risk)}):** Pacientes que ficariam bem mesmo sem ADT (sRT sozinha já curou ou doença lenta).")
+            st.markdown(f"🔴 **Recorrência ({n_recurrence}):** Pacientes que recidivam mesmo com o tratamento.")
+            st.markdown(f"🟢 **Benefício ({n_prevented}):** Pacientes salvos da recorrência pela ADT.")
+            st.markdown(f"🔵 **Sem Recorrência ({100 - n_prevented - n_recurrence}):** Pacientes que ficariam bem mesmo sem ADT (sRT sozinha já curou ou doença lenta).")
 
-    st.markdown("#### Alternativa Razoável")
-    if risk == RiskLevel.HIGH:
-        if is_contraindicated:
-            st.write("sRT + ADT Curta (Descalonamento por toxicidade)")
-        else:
-            st.write("sRT + ADT Curta (Se preocupação com qualidade de vida)")
-    elif risk == RiskLevel.INTERMEDIATE:
-        st.write("sRT Isolada (Discussão sobre benefício marginal da ADT)")
-    else:
-        st.write("Observação vigilante (em casos selecionados) ou sRT precoce sem ADT.")
+            spread = cache.outcome_variability(risk, adt, horizon)['interval']
+            st.caption(
+                "Em grupos reais de 100 pacientes os números variam por acaso. "
+                f"Faixa de 95% em 10.000 grupos simulados: recorrência {spread['recurrence'][0]}–{spread['recurrence'][1]}, "
+                f"benefício {spread['prevented'][0]}–{spread['prevented'][1]}, "
+                f"sem recorrência {spread['no_recurrence'][0]}–{spread['no_recurrence'][1]}."
+            )
 
-    # Disclaimer (Footer)
-    st.markdown("---")
-    st.caption("Ferramenta auxiliar. Dados não são armazenados (Compliance LGPD/HIPAA).")
-    
-    with st.expander("Aviso Legal (Disclaimer)", expanded=False):
-        st.markdown("""
-        **AVISO LEGAL**: Esta ferramenta é destinada exclusivamente ao uso por profissionais de saúde qualificados. 
-        As estimativas de risco e benefício são baseadas em dados da literatura médica agregada e podem não refletir o resultado individual de cada paciente.
-        Esta calculadora **NÃO** fornece aconselhamento médico direto, diagnóstico ou prescrição. 
-        A decisão final sobre o tratamento deve ser tomada pelo médico assistente, em conjunto com o paciente, considerando todas as variáveis clínicas.
-        O desenvolvedor não se responsabiliza por decisões tomadas com base nestas informações.
-        """)
+    with st.expander("Comparar condutas (sRT isolada, ADT curta, ADT longa)", expanded=False):
+        st.caption(
+            f"{risk.value}, {horizon:g} anos: todas as opções já estão calculadas; "
+            "os botões alternam o cenário direto no navegador."
+        )
+        st.plotly_chart(cache.scenario_chart(risk, adt, horizon), use_container_width=True)
 
-    # References
-    with st.expander("Referências Bibliográficas", expanded=False):
-        st.markdown("""
-        1. Zaurito P, Cosenza A, Quarta L, Scilipoti S, Longoni M, Santangelo A, et al. A Narrative Review of Treatment Options for Patients with Node-Positive Disease After Radical Prostatectomy: Current Evidence and Controversies. Cancers. 2025;17(17):2792.
-        2. Shimabukuro T, Tokunaga T, Shimizu K, Fujii N, Kobayashi K, Hiroyoshi T, et al. Time to Prostate-Specific Antigen Failure as a Unique Prognosticator of Overall Survival in Biochemically Recurrent Prostate Cancer Patients Undergoing Radical Prostatectomy. Adv Urol. 2025;2025:2961319.
-        3. Challis B, Kneebone A, Eade T, Guo L, Atyeo J, Brown C, et al. Avoiding prostate bed radiation for the PSMA-PET detected nodal recurrence patient post prostatectomy. Clin Transl Radiat Oncol. 2025;50:100896.
-        4. Cornford P, Tilki D, van den Bergh RCN, Eberli D, De Meerleer G, De Santis M, et al. EAU-EANM-ESTRO-ESUR-ISUP-SIOG Guidelines on Prostate Cancer. Arnhem (NL): EAU Guidelines Office; 2025.
-        5. Di Giorgio A, Siepe G, Serani F, Di Franco M, Malizia C, Castellucci P, et al. Long-term outcomes of PSMA PET/CT-guided radiotherapy in biochemical failure patients post-radical prostatectomy: a 5-year follow-up analysis. Eur J Nucl Med Mol Imaging. 2025;52(13):3720–3729.
-        6. Yang YJ, Min K, Tae JH, Lee CU, Choi J, Kim JH, et al. Oncologic outcomes of salvage radiotherapy and lymphadenectomy for positron emission tomography-positive lymph nodes in biochemical recurrence: A systematic review to inform treatment decisions. Prostate Int. 2025; (In Press).
-        7. Vorbach SM, Rittmayer H, Seppi T, Nilica B, Kafka M, Ganswindt U. PSMA-PET/CT-based salvage elective nodal radiotherapy for lymph node recurrence following radical prostatectomy. World J Urol. 2025;43(1):571.
-        8. Belliveau C, Saad F, Duplan D, Petit C, Delouya G, Taussky D, et al. Prostate-Specific Membrane Antigen PET-Guided Intensification of Salvage Radiotherapy After Radical Prostatectomy: A Phase 2 Randomized Clinical Trial (PSMAiSRT). JAMA Oncol. 2025. doi:10.1001/jamaoncol.2025.3746.
-        9. Le QC, Siech C, Hoeh B, Saad F, Preisser F, Tilki D, et al. Influence of Concomitant Androgen Deprivation Therapy and Its Duration for Salvage Radiation After Radical Prostatectomy: A Systematic Review and Network Meta-analysis According to Published Data. Eur Urol Oncol. 2025;8(2):1406–1415.
-        10. Gillessen S, Turco F, Davis ID, Efstathiou JA, Fizazi K, James ND, et al. Consensus Questions APCCC 2024. Advanced Prostate Cancer Consensus Conference; 2024 Apr 25-27; Lugano, Switzerland.
-        11. Advanced Prostate Cancer Consensus Conference (APCCC). Resumo das Perguntas, Alternativas e Status de Votação: Persistência de PSA e Recidiva Bioquímica pós-Prostatectomia Radical. Lugano: APCCC; 2024.
-        12. Morgan TM, Boorjian SA, Buyyounouski MK, Chapin BF, Chen DYT, Cheng HH, et al. Salvage Therapy for Prostate Cancer: AUA/ASTRO/SUO Guideline 2024. Linthicum (MD): American Urological Association; 2024.
-        13. Gillessen S, Turco F, Davis ID, Efstathiou JA, Fizazi K, James ND, et al. Management of Patients with Advanced Prostate Cancer. Report from the 2024 Advanced Prostate Cancer Consensus Conference (APCCC). Eur Urol. 2024. doi:10.1016/j.eururo.2024.09.017.
-        14. Instituto D’Or de Oncologia (IDO). Projeto de Pesquisa: Manejo do Paciente com Recidiva Bioquímica Pós-Prostatectomia Radical e Recorrência Nodal Regional Detectada por PSMA PET/CT. Rio de Janeiro: IDO; 2023.
-        15. Tamihardja J, Zehner L, Hartrampf P, Lisowski D, Kneitz S, Cirsi S, et al. Salvage Nodal Radiotherapy as Metastasis-Directed Therapy for Oligorecurrent Prostate Cancer Detected by Positron Emission Tomography Shows Favorable Outcome in Long-Term Follow-Up. Cancers. 2022;14(15):3766.
-        16. Attard G, Murphy L, Clarke NW, Cross W, Jones RJ, Parker CC, et al. Abiraterone acetate and prednisolone with or without enzalutamide for high-risk non-metastatic prostate cancer: a meta-analysis of primary results from two randomised controlled phase 3 trials of the STAMPEDE platform protocol. Lancet. 2022;399(10323):447–460
-        """)
+    with st.expander("Curvas projetadas de sobrevida livre de metástase", expanded=False):
+        st.caption(
+            f"{risk.value}: sRT isolada e com cada opção de ADT, com faixas ilustrativas. "
+            "Projeção a partir das tabelas de benefício (além de 5 anos, extrapolada); a linha mais grossa é a conduta sugerida."
+        )
+        st.plotly_chart(cache.mfs_chart(risk, adt), use_container_width=True)
 
+@st.fragment
+def _render_export_block(inputs, risk, rt_field, adt):
+    """
+    Text and PDF export; clicking export only reruns this block.
+    The PDF is rendered by a background job (see exporter.py) and download
+    payloads are only produced when the user clicks the download button.
+    """
+    from . import exporter, pipeline
+    
+    result = cache.run_pipeline(inputs)
+    fp = pipeline.fingerprint(inputs)
+    
     # Export Section
     st.markdown("---")
     st.markdown("### Exportar Relatório")
     
     col_pdf, col_txt = st.columns(2)
     
-    from . import utils, visuals
-    
-    # Text Export
-    summary_text = utils.generate_summary_text(inputs, risk, rt_field, adt, benefit_data)
+    # Text Export (built on click)
     col_txt.download_button(
         label="📄 Baixar Resumo (.txt)",
-        data=summary_text,
+        data=functools.partial(cache.summary_text, inputs, result),
         file_name="resumo_clinico_adt.txt",
-        mime="text/plain"
+        mime="text/plain",
+        on_click="ignore"
     )
+    col_txt.caption(f"Link do caso: `?case={codec.to_token(Case.from_dict(inputs))}`")
     
     # PDF Export
-    # We generate charts on the fly for the PDF
-    if col_pdf.button("🖨️ Gerar PDF com Gráficos"):
-        with st.spinner("Gerando gráficos e compilando PDF..."):
-            visuals_map = {}
-            if benefit_data['arr_5yr'] != 0.0:
-                 # Reconstruct specific figures for export (or reuse cached if stored)
-                 # We need to call functions from visuals
-                 # 1. ARR Gauge
-                 fig_arr = visuals.create_arr_gauge(benefit_data['arr_5yr'])
-                 visuals_map['arr_gauge'] = visuals.get_chart_image(fig_arr)
-                 
-                 # 2. Waffle
-                 local_baseline = logic.get_baseline_recurrence_risk(risk)
-                 fig_waffle = visuals.create_waffle_chart(benefit_data['arr_5yr'], local_baseline)
-                 visuals_map['waffle'] = visuals.get_chart_image(fig_waffle)
-            
-            pdf_bytes = utils.create_pdf(inputs, risk, rt_field, adt, benefit_data, visuals_map)
-            
-            st.download_button(
-                label="📥 Baixar PDF Pronto",
-                data=pdf_bytes,
-                file_name="relatorio_clinico_adt.pdf",
-                mime="application/pdf"
-            )
+    chart_mode_label = col_pdf.radio(
+        "Gráficos no PDF",
+        options=["Compacto (arquivo menor)", "Alta resolução"],
+        horizontal=True
+    )
+    chart_mode = "compact" if chart_mode_label.startswith("Compacto") else "hd"
+    rules_version = cache.sync_rules_version()
+    key = exporter.job_key(fp, rules_version, chart_mode)
+    # Reports rendered by any replica are picked up from the shared disk cache
+    load_shared = functools.partial(exporter.load_cached_report, fp, rules_version, chart_mode)
+    
+    with col_pdf:
+        job = exporter.MANAGER.job(key)
+        if exporter.MANAGER.result(key, load_shared) is None and (job is None or job.done()):
+            if job is not None and job.future.exception():
+                st.error(f"Falha ao gerar o PDF: {job.future.exception()}")
+            if st.button("🖨️ Gerar PDF com Gráficos"):
+                job = exporter.MANAGER.submit(
+                    key, exporter.build_pdf_report, inputs, result, chart_mode, fp, rules_version
+                )
+                if job is None and exporter.MANAGER.result(key) is None:
+                    metrics.EXPORTS.labels('rejected').inc()
+                    telemetry.record('export', outcome='rejected')
+                    st.warning("Muitas exportações em andamento. Tente novamente em instantes.")
+                elif job is not None:
+                    # Rendered on behalf of this session: counted as 'ok' / 'error' by the job
+                    st.session_state.setdefault('export_keys', set()).add(key)
+        
+        job = exporter.MANAGER.job(key)
+        if exporter.MANAGER.result(key) is not None:
+            # Served from the result LRU or the disk cache without a render: once per session and report
+            counted = st.session_state.setdefault('export_keys', set())
+            if key not in counted:
+                counted.add(key)
+                metrics.EXPORTS.labels('cached').inc()
+                telemetry.record('export', outcome='cached')
+            _render_pdf_download(key)
+        elif job is not None and not job.done():
+            _render_export_progress(key)
+
+def _render_pdf_download(key):
+    from . import exporter
+    
+    report = exporter.MANAGER.result(key)
+    st.download_button(
+        label="📥 Baixar PDF Pronto",
+        # Payload is only sent to the browser when actually downloaded
+        data=lambda: report['pdf'],
+        file_name="relatorio_clinico_adt.pdf",
+        mime="application/pdf",
+        on_click="ignore"
+    )
+    stats = report['stats']
+    charts_kb = ", ".join(f"{k}: {v / 1024:.1f} KB" for k, v in stats['charts'].items())
+    st.caption(f"Tamanho do relatório: {stats['pdf_bytes'] / 1024:.1f} KB" + (f" (gráficos: {charts_kb})" if charts_kb else ""))
 
-def settings_benefits(risk, adt):
-    # This helper isolates the logic call to avoid circular imports? 
-    # Actually logic is imported in main app. 
-    # But ui.py doesn't import logic by default in the plan structure (app.py does).
-    # Wait, ui.py handles rendering. It should assume the data is passed OR import logic.
-    # In app.py we pass risk, rt_field, adt, inputs.
-    # We should probably call logic.get_absolute_benefits inside ui.py or pass it from app.py
-    # For simplicity, I'll update render_results to accept benefit_stats or call logic.
-    # Let's import logic inside the function to avoid top-level circular dependency if any.
-    from . import logic
-    return logic.get_absolute_benefits(risk, adt)
+@st.fragment(run_every=0.5)
+def _render_export_progress(key):
+    """Polls the background export; reruns the app once the job finishes."""
+    from . import exporter
+    
+    job = exporter.MANAGER.job(key)
+    if job is None or job.done():
+        st.rerun()
+    st.progress(job.progress, text=job.message)
@@ -0,0 +1,88 @@
+"""
+Monte Carlo propagation of PSA / PSADT measurement uncertainty to the decision.
+
+PSA draws: a true value uniform over the selected PSA band (or the point value),
+times lognormal assay noise with coefficient of variation PSA_ASSAY_CV.
+PSADT draws: the log-linear PSA slope (ln 2 / PSADT) is normal around its
+estimate, with the regression standard error when the PSA series gives one
+and PSADT_SLOPE_CV of the slope otherwise. Draws with a flat or falling slope
+have no PSADT, as in logic.calculate_psadt.
+
+All draws go through vectorized.classify_risk_codes / suggest_adt_codes at once.
+"""
+import math
+
+import numpy as np
+
+from . import config_loader, vectorized
+from .constants import RiskLevel, ADTRecommendation
+from .decision import Case, ENUM_FIELDS, BOOL_FIELDS
+
+N_DRAWS = 100_000
+SEED = 2026
+
+PSA_ASSAY_CV = 0.10     # Typical inter-assay CV of ultrasensitive PSA
+PSADT_SLOPE_CV = 0.25   # Slope error when it can't be estimated from the PSA series
+MIN_SLOPE = 0.0001      # Same cut as calculate_psadt: flatter means no doubling
+
+def psadt_slope_fit(dates, values):
+    """
+    (slope per month, standard error) of the log-linear fit behind calculate_psadt,
+    or None with fewer than 2 valid points. The error is None with only 2 points.
+    """
+    points = sorted((d, v) for d, v in zip(dates, values) if d is not None and v is not None and v > 0)
+    if len(points) < 2:
+        return None
+    x = np.array([(d - points[0][0]).days / 30.4375 for d, _ in points])
+    y = np.log([v for _, v in points])
+    sxx = np.sum((x - x.mean()) ** 2)
+    if sxx < 1e-9:
+        return None
+    slope = float(np.sum((x - x.mean()) * (y - y.mean())) / sxx)
+    if len(points) < 3:
+        return slope, None
+    residuals = y - (y.mean() + slope * (x - x.mean()))
+    se = math.sqrt(float(np.sum(residuals ** 2)) / (len(points) - 2) / sxx)
+    return slope, se
+
+def sample_psa(rng, n, psa, psa_range=None, cv=PSA_ASSAY_CV) -> np.ndarray:
+    true = rng.uniform(psa_range[0], psa_range[1], n) if psa_range else np.full(n, float(psa))
+    sigma = math.sqrt(math.log1p(cv * cv))
+    return true * rng.lognormal(-sigma * sigma / 2, sigma, n)
+
+def sample_psadt(rng, n, psadt, slope_se=None, cv=PSADT_SLOPE_CV) -> np.ndarray:
+    """PSADT draws in months; NaN where the drawn slope has no doubling (or PSADT is unknown)."""
+    if psadt is None or psadt <= 0:
+        return np.full(n, np.nan)
+    slope = math.log(2) / psadt
+    slopes = rng.normal(slope, slope_se if slope_se is not None else cv * slope, n)
+    with np.errstate(divide='ignore'):
+        return np.where(slopes > MIN_SLOPE, math.log(2) / slopes, np.nan)
+
+def simulate(case: Case, n=N_DRAWS, psa_range=None, slope_se=None, seed=SEED, rules=None) -> dict:
+    """
+    Decision probabilities under measurement uncertainty:
+        risk  -> {RiskLevel: probability}
+        adt   -> {ADTRecommendation: probability}
+        psadt_unknown -> share of draws without a PSADT
+        n     -> number of draws
+    """
+    if rules is None:
+        rules = config_loader.load_rules()
+    rng = np.random.default_rng(seed)
+    cols = {name: np.asarray(vectorized.codes(enum_cls)[getattr(case, name)], dtype=np.int8)
+            for name, enum_cls in ENUM_FIELDS.items()}
+    cols.update({name: np.asarray(getattr(case, name)) for name in BOOL_FIELDS})
+    cols['psa_pre_srt'] = sample_psa(rng, n, case.psa_pre_srt, psa_range)
+    cols['psadt_months'] = sample_psadt(rng, n, case.psadt_months, slope_se)
+
+    risk = np.broadcast_to(vectorized.classify_risk_codes(cols, rules), (n,))
+    adt = vectorized.suggest_adt_codes(risk, cols['life_expectancy'])
+    risk_counts = np.bincount(risk, minlength=len(RiskLevel))
+    adt_counts = np.bincount(adt, minlength=len(ADTRecommendation))
+    return {
+        'risk': {level: float(risk_counts[i]) / n for i, level in enumerate(RiskLevel)},
+        'adt': {rec: float(adt_counts[i]) / n for i, rec in enumerate(ADTRecommendation)},
+        'psadt_unknown': float(np.isnan(cols['psadt_months']).mean()),
+        'n': n,
+    }
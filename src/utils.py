@@ -1,3 +1,4 @@
+from . import metrics
 from .constants import RiskLevel, RTField, ADTRecommendation, GleasonScore, TumorStage, PetFindings
 
 def generate_summary_text(inputs, risk, rt_field, adt, benefits) -> str:
@@ -50,127 +51,204 @@ from fpdf import FPDF
 import tempfile
 import os
 
+# Non-latin1 chars that the core PDF fonts can't encode
+_PDF_CHAR_MAP = str.maketrans({
+    "≤": "<=",
+    "≥": ">=",
+    "–": "-",
+    "’": "'",
+    "“": '"',
+    "”": '"'
+})
+
+def safe_text(s) -> str:
+    """Replace non-latin1 chars so the text can be written with the core fonts."""
+    return str(s).translate(_PDF_CHAR_MAP)
+
 class PDFReport(FPDF):
+    footer_text = safe_text('Calculadora ADT - Ferramenta de Apoio à Decisão - Uso Exclusivo para Profissionais de Saúde')
+
     def footer(self):
         self.set_y(-15)
         self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, 'Calculadora ADT - Ferramenta de Apoio à Decisão - Uso Exclusivo para Profissionais de Saúde', 0, 0, 'C')
+        self.cell(0, 10, self.footer_text, 0, 0, 'C')
 
-def create_pdf(inputs, risk, rt_field, adt, benefits, visuals_map):
+class ReportTemplate:
     """
-    Generates a PDF report with charts.
-    visuals_map: dict of {'key': bytes} for chart images.
+    Static layout of the clinical PDF report.
+
+    Title, disclaimer, section headings, field labels and chart slots are
+    compiled once (text already sanitized for the core fonts). render() only
+    stamps the patient-specific fields and chart images, so the single-report
+    and batch paths share exactly the same layout.
     """
-    pdf = PDFReport()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    # Title
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, "Relatório de Decisão Clínica: sRT + ADT", ln=True, align='C')
-    pdf.ln(5)
-    
-    # Disclaimer Header
-    pdf.set_font("Arial", 'B', 10)
-    pdf.set_text_color(200, 0, 0)
-    pdf.multi_cell(0, 5, "AVISO LEGAL: Este relatório é gerado por um software de apoio à decisão e NÃO substitui o julgamento clínico. As estimativas baseiam-se em literatura agregada e podem não refletir o risco individual com precisão. O médico assistente é o único responsável pela conduta.")
-    pdf.set_text_color(0, 0, 0)
-    pdf.ln(5)
-    
-    # Clinical Data
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, "1. Dados Clínicos", ln=True)
-    pdf.set_font("Arial", size=11)
-    
-    def safe_text(s):
-        # Replace non-latin1 chars
-        replacements = {
-            "≤": "<=",
-            "≥": ">=",
-            "–": "-",
-            "’": "'",
-            "“": '"',
-            "”": '"'
-        }
-        for k, v in replacements.items():
-            s = s.replace(k, v)
-        return s
-    
-    def add_line(label, val):
-        pdf.set_font("Arial", 'B', 11)
-        pdf.cell(50, 7, safe_text(label), 0)
+    TITLE = "Relatório de Decisão Clínica: sRT + ADT"
+    DISCLAIMER = "AVISO LEGAL: Este relatório é gerado por um software de apoio à decisão e NÃO substitui o julgamento clínico. As estimativas baseiam-se em literatura agregada e podem não refletir o risco individual com precisão. O médico assistente é o único responsável pela conduta."
+
+    # (section heading, [(label, field key), ...], space after)
+    SECTIONS = [
+        ("1. Dados Clínicos", [
+            ("PSA Pré-sRT:", 'psa'),
+            ("Persistência PSA:", 'persistence'),
+            ("Gleason:", 'gleason'),
+            ("Estadiamento:", 'stage'),
+            ("PSADT:", 'psadt'),
+            ("PET-PSMA:", 'pet_findings'),
+            None, # ln(3)
+            ("Comorbidades:", 'comorbidities'),
+            ("Exp. Vida:", 'life_expectancy'),
+        ], 5),
+        ("2. Análise de Decisão", [
+            ("Risco:", 'risk'),
+            ("Campo RT:", 'rt_field'),
+            ("Recomendação ADT:", 'adt'),
+        ], 5),
+    ]
+    BENEFIT_HEADING = "3. Estimativa de Benefício (5 Anos)"
+    NO_BENEFIT_TEXT = "Benefício estimado da ADT é negligenciável para este perfil."
+
+    # Chart slots: key -> (x, w) in mm, placed side by side below the benefit line
+    CHART_SLOTS = {
+        'arr_gauge': (10, 60),
+        'waffle': (80, 100),
+    }
+
+    def __init__(self):
+        self.title = safe_text(self.TITLE)
+        self.disclaimer = safe_text(self.DISCLAIMER)
+        self.sections = [
+            (
+                safe_text(heading),
+                [None if f is None else (safe_text(f[0]), f[1]) for f in fields],
+                space_after
+            )
+            for heading, fields, space_after in self.SECTIONS
+        ]
+        self.benefit_heading = safe_text(self.BENEFIT_HEADING)
+        self.no_benefit_text = safe_text(self.NO_BENEFIT_TEXT)
+
+    def render(self, fields, visuals_map=None) -> bytes:
+        """
+        Stamps the variable fields (see report_fields) and chart images into
+        the compiled layout and returns the PDF bytes.
+        """
+        visuals_map = visuals_map or {}
+
+        pdf = PDFReport()
+        pdf.add_page()
+
+        # Title
+        pdf.set_font("Arial", 'B', 16)
+        pdf.cell(0, 10, self.title, ln=True, align='C')
+        pdf.ln(5)
+
+        # Disclaimer Header
+        pdf.set_font("Arial", 'B', 10)
+        pdf.set_text_color(200, 0, 0)
+        pdf.multi_cell(0, 5, self.disclaimer)
+        pdf.set_text_color(0, 0, 0)
+        pdf.ln(5)
+
+        for heading, section_fields, space_after in self.sections:
+            pdf.set_font("Arial", 'B', 14)
+            pdf.cell(0, 10, heading, ln=True)
+            for field in section_fields:
+                if field is None:
+                    pdf.ln(3)
+                    continue
+                label, key = field
+                pdf.set_font("Arial", 'B', 11)
+                pdf.cell(50, 7, label, 0)
+                pdf.set_font("Arial", size=11)
+                pdf.cell(0, 7, fields[key], 0, 1)
+            pdf.ln(space_after)
+
+        # Benefits & Charts
+        pdf.set_font("Arial", 'B', 14)
+        pdf.cell(0, 10, self.benefit_heading, ln=True)
+
+        if fields['benefit_line'] is None:
+            pdf.cell(0, 10, self.no_benefit_text, ln=True)
+            return pdf.output(dest='S').encode('latin-1', errors='replace')
+
         pdf.set_font("Arial", size=11)
-        pdf.cell(0, 7, safe_text(str(val)), 0, 1)
+        pdf.cell(0, 10, fields['benefit_line'], ln=True)
+
+        # FPDF image() needs a file path, so charts go through temp files
+        y_start = pdf.get_y()
+        for key, (x, w) in self.CHART_SLOTS.items():
+            if key not in visuals_map:
+                continue
+            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+                tmp.write(visuals_map[key])
+                tmp_path = tmp.name
+            try:
+                pdf.image(tmp_path, x=x, y=y_start, w=w)
+            finally:
+                os.unlink(tmp_path)
+
+        pdf.ln(80) # Move cursor down past images
+
+        return pdf.output(dest='S').encode('latin-1', errors='replace') # Return bytes
 
+REPORT_TEMPLATE = ReportTemplate()
+
+def report_fields(inputs, risk, rt_field, adt, benefits) -> dict:
+    """
+    Patient-specific values stamped into the report template (already sanitized).
+    benefit_line is None when the ADT benefit is negligible (no charts section).
+    """
     psa_display = inputs.get('psa_label', f"{inputs['psa_pre_srt']} ng/dL")
-    add_line("PSA Pré-sRT:", psa_display)
-    add_line("Persistência PSA:", "Sim" if inputs.get('has_psa_persistence') else "Não")
-    add_line("Gleason:", inputs['gleason'].value)
-    add_line("Estadiamento:", inputs['stage'].value)
-    add_line("PSADT:", f"{inputs['psadt_months']} meses" if inputs['psadt_months'] else "Desc.")
-    add_line("PET-PSMA:", inputs['pet_findings'].value)
-    pdf.ln(3)
-    
-    # Comorbidities
+
     comorbs = []
     if inputs['has_cardio']: comorbs.append("Risco Cardiovascular")
     if inputs['has_metabolic']: comorbs.append("Risco Metabólico")
     if inputs['has_bone']: comorbs.append("Saúde Óssea")
     if inputs['has_libido_concern']: comorbs.append("Não aceita efeitos na libido (Preferência)")
     if not comorbs: comorbs.append("Nenhuma maior relatada")
-    
-    add_line("Comorbidades:", ", ".join(comorbs))
-    add_line("Exp. Vida:", inputs['life_expectancy'].value)
-    pdf.ln(5)
-    
-    # Decision Analysis
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, "2. Análise de Decisão", ln=True)
-    
-    add_line("Risco:", risk.value)
-    add_line("Campo RT:", rt_field.value)
-    add_line("Recomendação ADT:", adt.value)
-    pdf.ln(5)
-    
-    # Benefits & Charts
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, "3. Estimativa de Benefício (5 Anos)", ln=True)
-    
+
     if benefits['arr_5yr'] != 0.0:
-        pdf.set_font("Arial", size=11)
-        pdf.cell(0, 10, f"Redução Absoluta de Risco: {benefits['arr_5yr']}% | NNT: {benefits['nnt']}", ln=True)
-        
-        # Embed Images
-        # Save bytes to temp files because FPDF image() needs a path or specific handling
-        # FPDF2 supports bytes stream? Standard FPDF often needs file.
-        # Let's write to temp.
-        
-        y_start = pdf.get_y()
-        
-        # 1. ARR Gauge
-        if 'arr_gauge' in visuals_map:
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                tmp.write(visuals_map['arr_gauge'])
-                tmp_path = tmp.name
-            
-            # Place Gauge on left
-            pdf.image(tmp_path, x=10, y=y_start, w=60)
-            os.unlink(tmp_path)
-            
-        # 2. Waffle Chart
-        if 'waffle' in visuals_map:
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                tmp.write(visuals_map['waffle'])
-                tmp_path_w = tmp.name
-                
-            # Place Waffle below or right?
-            # Gauge is ~60 wide. A4 is ~210 wide.
-            pdf.image(tmp_path_w, x=80, y=y_start, w=100)
-            os.unlink(tmp_path_w)
-            
-        pdf.ln(80) # Move cursor down past images
+        benefit_line = f"Redução Absoluta de Risco: {benefits['arr_5yr']}% | NNT: {benefits['nnt']}"
     else:
-        pdf.cell(0, 10, "Benefício estimado da ADT é negligenciável para este perfil.", ln=True)
-        
-    return pdf.output(dest='S').encode('latin-1', errors='replace') # Return bytes
+        benefit_line = None
+
+    fields = {
+        'psa': psa_display,
+        'persistence': "Sim" if inputs.get('has_psa_persistence') else "Não",
+        'gleason': inputs['gleason'].value,
+        'stage': inputs['stage'].value,
+        'psadt': f"{inputs['psadt_months']} meses" if inputs['psadt_months'] else "Desc.",
+        'pet_findings': inputs['pet_findings'].value,
+        'comorbidities': ", ".join(comorbs),
+        'life_expectancy': inputs['life_expectancy'].value,
+        'risk': risk.value,
+        'rt_field': rt_field.value,
+        'adt': adt.value,
+        'benefit_line': benefit_line,
+    }
+    return {k: (None if v is None else safe_text(v)) for k, v in fields.items()}
+
+@metrics.timed(metrics.PDF_SECONDS)
+def create_pdf(inputs, risk, rt_field, adt, benefits, visuals_map):
+    """
+    Generates a PDF report with charts.
+    visuals_map: dict of {'key': bytes} for chart images.
+    """
+    fields = report_fields(inputs, risk, rt_field, adt, benefits)
+    return REPORT_TEMPLATE.render(fields, visuals_map)
 
+def create_pdf_batch(cases) -> list:
+    """
+    Generates one PDF per case through the same compiled template.
+    cases: iterable of (inputs, risk, rt_field, adt, benefits, visuals_map) tuples.
+    """
+    return [create_pdf(*case) for case in cases]
+
+def report_size_stats(pdf_bytes, visuals_map) -> dict:
+    """
+    Byte sizes of a generated report and of each embedded chart, for tracking archive size.
+    """
+    return {
+        'pdf_bytes': len(pdf_bytes),
+        'charts': {key: len(img) for key, img in (visuals_map or {}).items()},
+    }
@@ -0,0 +1,228 @@
+"""
+Vectorized decision pipeline over columns of enum codes (numpy).
+
+Columns are numpy arrays keyed by Case field name (any shapes that broadcast
+together, e.g. a PSA row against a PSADT column for a risk surface):
+    enum fields   -> integer codes in enum definition order (same codes as codec.py / cohort.py)
+    psa_pre_srt   -> float64
+    psadt_months  -> float64, NaN when unknown
+    flags         -> bool
+
+Results match logic.classify_risk / suggest_rt_field / suggest_adt /
+get_absolute_benefits / get_baseline_recurrence_risk case by case, including
+the CSV rules, which are evaluated with the same semantics as
+config_loader.check_rule.
+"""
+import numpy as np
+
+from . import benefit_tables, config_loader, logic
+from .constants import (
+    RiskLevel, RTField, ADTRecommendation,
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+def codes(enum_cls) -> dict:
+    """Member -> code (definition order)."""
+    return {m: i for i, m in enumerate(enum_cls)}
+
+RISK = codes(RiskLevel)
+RT_FIELD = codes(RTField)
+ADT = codes(ADTRecommendation)
+_GLEASON = codes(GleasonScore)
+_STAGE = codes(TumorStage)
+_NODAL = codes(NodalStage)
+_MARGIN = codes(MarginStatus)
+_PET = codes(PetFindings)
+
+# RiskLevel is defined from LOW to VERY_HIGH, so a larger code is a higher risk
+assert [RISK[r] for r in (RiskLevel.LOW, RiskLevel.INTERMEDIATE, RiskLevel.HIGH, RiskLevel.VERY_HIGH)] == [0, 1, 2, 3]
+
+# Inputs visible to the CSV rules (same keys classify_risk passes to evaluate_risk_from_rules)
+_RULE_ENUMS = {
+    'gleason': GleasonScore,
+    'stage': TumorStage,
+    'pet_findings': PetFindings,
+    'margin': MarginStatus,
+    'n_stage': NodalStage,
+}
+_RULE_NUMBERS = ('psa_pre_srt', 'psadt_months', 'has_psa_persistence')
+
+# Cut-offs of classify_risk (see logic.py); sensitivity.py sweeps them
+DEFAULT_THRESHOLDS = {
+    'psa_intermediate': logic.PSA_INTERMEDIATE_CUTOFF,
+    'psa_high': logic.PSA_HIGH_CUTOFF,
+    'psadt_very_high': logic.PSADT_VERY_HIGH_CUTOFF,
+    'psadt_high': logic.PSADT_HIGH_CUTOFF,
+}
+THRESHOLD_VARIABLES = {
+    'psa_intermediate': 'psa_pre_srt',
+    'psa_high': 'psa_pre_srt',
+    'psadt_very_high': 'psadt_months',
+    'psadt_high': 'psadt_months',
+}
+
+def rule_mask(cols, rule, shape, overrides=None) -> np.ndarray:
+    """
+    Rows matching one CSV rule (mirrors config_loader.check_rule, including its failure cases).
+    overrides: {variable: {rule value: replacement}} applied to numeric rule values.
+    """
+    var = rule.get('variable')
+    op = rule.get('operator')
+    val_raw = rule.get('value')
+    none = np.zeros(shape, dtype=bool)
+    if var not in _RULE_ENUMS and var not in _RULE_NUMBERS:
+        return none
+
+    try:
+        if op in ('EQ', 'IN', 'LT', 'GT', 'LE', 'GE'):
+            target = config_loader.parse_rule_value(var, val_raw)
+        elif op == 'BETWEEN':
+            parts = val_raw.split(';')
+            min_v, max_v = float(parts[0]), float(parts[1])
+        else:
+            # Operators check_rule doesn't implement never match
+            return none
+    except Exception:
+        return none
+
+    enum_cls = _RULE_ENUMS.get(var)
+    if enum_cls is not None:
+        # Enums only support equality; ordering comparisons raise in check_rule
+        if op == 'EQ':
+            targets = [target]
+        elif op == 'IN':
+            targets = target if isinstance(target, list) else [target]
+        else:
+            return none
+        # An enum never equals a raw string (e.g. an unparsed value)
+        target_codes = [i for m, i in codes(enum_cls).items() if m in targets]
+        return np.isin(cols[var], target_codes)
+
+    if overrides and isinstance(target, float):
+        target = overrides.get(var, {}).get(target, target)
+    x = np.asarray(cols[var])
+    known = ~np.isnan(x) if x.dtype.kind == 'f' else np.ones(x.shape, dtype=bool)
+    if op == 'EQ':
+        return known & (x == target)
+    if op == 'IN':
+        targets = target if isinstance(target, list) else [target]
+        return known & np.isin(x, targets)
+    if op == 'LT':
+        return known & (x < target)
+    if op == 'GT':
+        return known & (x > target)
+    if op == 'LE':
+        return known & (x <= target)
+    if op == 'GE':
+        return known & (x >= target)
+    return known & (min_v <= x) & (x < max_v)
+
+def classify_risk_codes(cols, rules=None, thresholds=None) -> np.ndarray:
+    """
+    Risk codes (RISK) per row; vectorized logic.classify_risk.
+    thresholds: optional overrides of DEFAULT_THRESHOLDS, as scalars or arrays
+    broadcasting against the columns (e.g. shape (k, 1, 1) to sweep k values at once).
+    CSV rules on PSA/PSADT whose value equals a default cut-off follow the override.
+    """
+    if rules is None:
+        rules = config_loader.load_rules()
+    cut = dict(DEFAULT_THRESHOLDS)
+    overrides = None
+    if thresholds:
+        cut.update(thresholds)
+        overrides = {}
+        for name, value in thresholds.items():
+            overrides.setdefault(THRESHOLD_VARIABLES[name], {})[DEFAULT_THRESHOLDS[name]] = value
+
+    gleason = cols['gleason']
+    psadt = cols['psadt_months']
+    psa = cols['psa_pre_srt']
+
+    is_gg4_5 = np.isin(gleason, [_GLEASON[GleasonScore.ISUP4], _GLEASON[GleasonScore.ISUP5]])
+    is_gg2_3 = np.isin(gleason, [_GLEASON[GleasonScore.ISUP2], _GLEASON[GleasonScore.ISUP3]])
+    is_pt3b = cols['stage'] == _STAGE[TumorStage.PT3B]
+    is_pt3a = cols['stage'] == _STAGE[TumorStage.PT3A]
+    is_r1 = cols['margin'] == _MARGIN[MarginStatus.R1]
+    is_n1 = np.isin(cols['pet_findings'], [_PET[PetFindings.PELVIC_LN], _PET[PetFindings.EXTRA_PELVIC]]) | (cols['n_stage'] == _NODAL[NodalStage.N1])
+    # NaN (unknown PSADT) compares False, like the None checks in classify_risk
+    is_psadt_le_6 = psadt <= cut['psadt_very_high']
+    is_psadt_le_12 = psadt <= cut['psadt_high']
+    is_psa_high = psa > cut['psa_high']
+    is_psa_int = psa > cut['psa_intermediate']
+
+    very_high = is_n1 | is_psadt_le_6 | (cols['has_psa_persistence'] & is_gg4_5)
+    high = is_gg4_5 | is_pt3b | is_psadt_le_12 | is_psa_high
+    intermediate = is_gg2_3 | is_pt3a | is_r1 | is_psa_int
+    risk = np.where(very_high, RISK[RiskLevel.VERY_HIGH],
+           np.where(high, RISK[RiskLevel.HIGH],
+           np.where(intermediate, RISK[RiskLevel.INTERMEDIATE], RISK[RiskLevel.LOW]))).astype(np.int8)
+
+    # CSV rules can only raise the risk (classify_risk keeps the higher of the two)
+    from_rules = np.full(risk.shape, -1, dtype=np.int8)
+    for level in (RiskLevel.INTERMEDIATE, RiskLevel.HIGH, RiskLevel.VERY_HIGH):
+        for rule in rules:
+            if rule.get('risk_level') == level.name:
+                from_rules = np.where(rule_mask(cols, rule, risk.shape, overrides), np.int8(RISK[level]), from_rules)
+    return np.maximum(risk, from_rules)
+
+def suggest_rt_field_codes(risk, pet_findings) -> np.ndarray:
+    """RT field codes per row; vectorized logic.suggest_rt_field."""
+    pelvis = (
+        np.isin(pet_findings, [_PET[PetFindings.PELVIC_LN], _PET[PetFindings.EXTRA_PELVIC]])
+        | (risk >= RISK[RiskLevel.HIGH])
+    )
+    return np.where(pelvis, RT_FIELD[RTField.BED_PELVIS], RT_FIELD[RTField.BED_ONLY]).astype(np.int8)
+
+# (life expectancy code, risk code) -> ADT code, built from logic.suggest_adt itself
+_ADT_TABLE = np.array([
+    [ADT[logic.suggest_adt(risk, le, False, False)] for risk in RiskLevel]
+    for le in LifeExpectancy
+], dtype=np.int8)
+
+def suggest_adt_codes(risk, life_expectancy) -> np.ndarray:
+    """ADT codes per row; vectorized logic.suggest_adt (comorbidity flags don't change it)."""
+    return _ADT_TABLE[life_expectancy, risk]
+
+# tables version -> (arr, nnt, baseline) lookup arrays
+_BENEFIT_CACHE = {}
+
+def benefit_arrays():
+    """
+    (arr_5yr, nnt, baseline) lookup arrays indexed by [risk, adt] / [risk], from the
+    current benefit tables; rebuilt when the CSV changes, like logic.get_absolute_benefits.
+    """
+    tables = benefit_tables.load_knots()
+    cached = _BENEFIT_CACHE.get(tables.version)
+    if cached is not None:
+        return cached
+    arr = np.full((len(RiskLevel), len(ADTRecommendation)), np.nan)
+    nnt = np.full(arr.shape, -1, dtype=np.int16)
+    for risk in RiskLevel:
+        for adt in ADTRecommendation:
+            b = tables.estimate(risk, adt).legacy()
+            # Textual bounds ("< 3.0", "> 33", "-") have no numeric value
+            if isinstance(b['arr_5yr'], (int, float)):
+                arr[RISK[risk], ADT[adt]] = b['arr_5yr']
+            if isinstance(b['nnt'], int):
+                nnt[RISK[risk], ADT[adt]] = b['nnt']
+    baseline = np.array([tables.baseline(r) for r in RiskLevel])
+    _BENEFIT_CACHE.clear()
+    _BENEFIT_CACHE[tables.version] = (arr, nnt, baseline)
+    return arr, nnt, baseline
+
+def evaluate_columns(cols, rules=None) -> dict:
+    """
+    Full pipeline over columns. Returns numpy arrays:
+    risk, rt_field, adt (codes), arr_5yr (NaN when textual), nnt (-1 when textual), baseline_risk.
+    """
+    risk = classify_risk_codes(cols, rules)
+    adt = suggest_adt_codes(risk, cols['life_expectancy'])
+    arr_table, nnt_table, baseline_table = benefit_arrays()
+    return {
+        'risk': risk,
+        'rt_field': suggest_rt_field_codes(risk, cols['pet_findings']),
+        'adt': adt,
+        'arr_5yr': arr_table[risk, adt],
+        'nnt': nnt_table[risk, adt],
+        'baseline_risk': baseline_table[risk],
+    }
@@ -1,4 +1,25 @@
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from . import metrics
+from .constants import RiskLevel, ADTRecommendation
+
+# Gauge bands (from, to, color); static_build.py draws the same gauges in SVG
+RISK_GAUGE_MAX = 100
+RISK_GAUGE_STEPS = (
+    (0, 20, 'rgba(0, 255, 0, 0.3)'),    # Green: Low
+    (20, 40, 'rgba(255, 165, 0, 0.3)'), # Orange: Med
+    (40, 100, 'rgba(255, 0, 0, 0.3)'),  # Red: High
+)
+ARR_GAUGE_MAX = 20  # Cap at 20% for visualization scale
+ARR_GAUGE_STEPS = (
+    (0, 3.3, 'rgba(255, 0, 0, 0.3)'),     # Red: Low
+    (3.3, 6.7, 'rgba(255, 165, 0, 0.3)'), # Yellow
+    (6.7, 20, 'rgba(0, 255, 0, 0.3)'),    # Green: High
+)
+
+def _steps(bands):
+    return [{'range': [low, high], 'color': color} for low, high, color in bands]
 
 def create_nnt_gauge(nnt_value) -> go.Figure:
     """
@@ -91,16 +112,12 @@ def create_risk_gauge(risk_value: float) -> go.Figure:
         number = {'suffix': "%", 'font': {'size': 40}}, # Also making number noticeable? User just said increase title font 400%.
         domain = {'x': [0, 1], 'y': [0, 1]},
         gauge = {
-            'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "white"},
+            'axis': {'range': [0, RISK_GAUGE_MAX], 'tickwidth': 1, 'tickcolor': "white"},
             'bar': {'color': "darkred"}, 
             'bgcolor': "white",
             'borderwidth': 2,
             'bordercolor': "gray",
-            'steps': [
-                {'range': [0, 20], 'color': 'rgba(0, 255, 0, 0.3)'},   # Green: Low
-                {'range': [20, 40], 'color': 'rgba(255, 165, 0, 0.3)'}, # Orange: Med
-                {'range': [40, 100], 'color': 'rgba(255, 0, 0, 0.3)'}   # Red: High
-            ],
+            'steps': _steps(RISK_GAUGE_STEPS),
             'threshold': {
                 'line': {'color': "black", 'width': 4},
                 'thickness': 0.75,
@@ -152,7 +169,7 @@ def create_arr_gauge(arr_value) -> go.Figure:
     except:
         value = 0
 
-    viz_value = min(value, 20) # Cap at 20% for visualization scale
+    viz_value = min(value, ARR_GAUGE_MAX)
 
     fig = go.Figure(go.Indicator(
         mode = "gauge+number",
@@ -161,16 +178,12 @@ def create_arr_gauge(arr_value) -> go.Figure:
         number = {'suffix': "%", 'font': {'size': 20}},
         domain = {'x': [0, 1], 'y': [0, 1]},
         gauge = {
-            'axis': {'range': [None, 20], 'tickwidth': 1, 'tickcolor': "white"},
+            'axis': {'range': [None, ARR_GAUGE_MAX], 'tickwidth': 1, 'tickcolor': "white"},
             'bar': {'color': "darkblue"}, 
             'bgcolor': "white",
             'borderwidth': 2,
             'bordercolor': "gray",
-            'steps': [
-                {'range': [0, 3.3], 'color': 'rgba(255, 0, 0, 0.3)'},   # Red: Low
-                {'range': [3.3, 6.7], 'color': 'rgba(255, 165, 0, 0.3)'}, # Yellow
-                {'range': [6.7, 20], 'color': 'rgba(0, 255, 0, 0.3)'}   # Green: High
-            ],
+            'steps': _steps(ARR_GAUGE_STEPS),
             'threshold': {
                 'line': {'color': "black", 'width': 4},
                 'thickness': 0.75,
@@ -187,13 +200,68 @@ def create_arr_gauge(arr_value) -> go.Figure:
     
     return fig
 
-def get_chart_image(fig: go.Figure) -> bytes:
+# Chart embedding modes for the PDF report
+# - "hd": 2x raster of the on-screen figure (original behaviour)
+# - "compact": raster sized to its placement in the PDF layout, palette-quantized
+CHART_EMBED_MODES = ("hd", "compact")
+
+# Plotly defaults when the layout doesn't fix a size
+_PLOTLY_DEFAULT_WIDTH = 700
+_PLOTLY_DEFAULT_HEIGHT = 500
+
+def placement_scale(fig: go.Figure, width_mm: float, dpi: int = 150) -> float:
+    """
+    Returns the kaleido scale that renders the figure exactly width_mm wide at dpi.
+    """
+    base_width = fig.layout.width or _PLOTLY_DEFAULT_WIDTH
+    target_px = width_mm / 25.4 * dpi
+    return target_px / base_width
+
+def optimize_png(png_bytes: bytes, colors: int = 64) -> bytes:
+    """
+    Palette-quantizes a PNG and re-encodes it with maximum deflate effort.
+    Charts are flat-colored, so 64 colors keeps them visually identical.
+    Returns the input unchanged if Pillow is unavailable or the result isn't smaller.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return png_bytes
+
+    import io
+    img = Image.open(io.BytesIO(png_bytes))
+    if img.mode in ("RGBA", "LA", "P"):
+        # FPDF ignores alpha; flatten onto the white page background
+        rgba = img.convert("RGBA")
+        img = Image.new("RGB", rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.split()[3])
+    else:
+        img = img.convert("RGB")
+
+    quantized = img.quantize(colors=colors, method=Image.Quantize.MEDIANCUT)
+    out = io.BytesIO()
+    quantized.save(out, format="PNG", optimize=True, compress_level=9)
+    result = out.getvalue()
+    return result if len(result) < len(png_bytes) else png_bytes
+
+@metrics.timed(metrics.CHART_RENDER_SECONDS)
+def get_chart_image(fig: go.Figure, mode: str = "hd", width_mm: float = None, dpi: int = 150) -> bytes:
     """
     Converts a Plotly figure to a PNG image in bytes.
     Requires kaleido.
+
+    mode="compact" renders at the PDF placement width (width_mm at dpi) and
+    palette-quantizes the result; mode="hd" keeps the 2x render.
     """
-    # Use 2x scale for better resolution in PDF
-    return fig.to_image(format="png", scale=2)
+    if mode not in CHART_EMBED_MODES:
+        raise ValueError(f"Unknown chart embedding mode: {mode}")
+
+    if mode == "hd":
+        # Use 2x scale for better resolution in PDF
+        return fig.to_image(format="png", scale=2)
+
+    scale = placement_scale(fig, width_mm, dpi) if width_mm else 1
+    return optimize_png(fig.to_image(format="png", scale=scale))
 
 def create_waffle_chart(arr_val, baseline_risk) -> go.Figure:
     """
@@ -205,6 +273,36 @@ def create_waffle_chart(arr_val, baseline_risk) -> go.Figure:
     3. Recurrence/Metastasis (Red) = baseline_risk - ARR
     """
     
+    x_vals, y_vals, colors, hover_texts = _waffle_points(arr_val, baseline_risk)
+
+    fig = go.Figure(data=go.Scatter(
+        x=x_vals,
+        y=y_vals,
+        mode='markers',
+        marker=dict(
+            symbol='circle',
+            size=20,
+            color=colors,
+            line=dict(width=1, color='DarkSlateGrey')
+        ),
+        text=hover_texts,
+        hoverinfo='text'
+    ))
+
+    fig.update_layout(
+        title="O que acontece com 100 pacientes?",
+        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False, range=[-0.5, 9.5]),
+        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False, range=[-0.5, 9.5]),
+        height=400,
+        width=400,
+        margin=dict(l=20, r=20, t=40, b=20),
+        plot_bgcolor="white"
+    )
+    
+    return fig
+
+def _waffle_points(arr_val, baseline_risk):
+    """Icon positions, colors and hover texts of the 100-patient array."""
     # Parse ARR
     try:
         if isinstance(arr_val, (int, float)):
@@ -257,28 +355,169 @@ def create_waffle_chart(arr_val, baseline_risk) -> go.Figure:
         colors.append(statuses[i]['color'])
         hover_texts.append(statuses[i]['desc'])
 
-    fig = go.Figure(data=go.Scatter(
-        x=x_vals,
-        y=y_vals,
-        mode='markers',
-        marker=dict(
-            symbol='circle',
-            size=20,
-            color=colors,
-            line=dict(width=1, color='DarkSlateGrey')
+    return x_vals, y_vals, colors, hover_texts
+
+# Risk tier colors (RiskLevel definition order: LOW -> VERY_HIGH)
+RISK_TIER_COLORS = ("#2ca02c", "#ffbf00", "#ff7f0e", "#d62728")
+
+def create_risk_heatmap(psa_grid, psadt_grid, surface, patient_psa=None, patient_psadt=None) -> go.Figure:
+    """
+    PSA x PSADT map of the risk tier (codes in RiskLevel order, shape psadt x psa,
+    see sensitivity.risk_surface), with the current patient marked when PSADT is known.
+    """
+    levels = list(RiskLevel)
+    n = len(levels)
+    # Stepwise colorscale: one flat band per tier code
+    colorscale = []
+    for i, color in enumerate(RISK_TIER_COLORS[:n]):
+        colorscale += [[i / n, color], [(i + 1) / n, color]]
+
+    labels = [[levels[code].value for code in row] for row in surface]
+    fig = go.Figure(go.Heatmap(
+        x=list(psa_grid),
+        y=list(psadt_grid),
+        z=surface,
+        zmin=-0.5,
+        zmax=n - 0.5,
+        colorscale=colorscale,
+        customdata=labels,
+        hovertemplate="PSA %{x:.2f} ng/mL<br>PSADT %{y:.1f} meses<br>%{customdata}<extra></extra>",
+        colorbar=dict(
+            tickvals=list(range(n)),
+            ticktext=[level.value for level in levels],
+            title=dict(text="Risco"),
         ),
-        text=hover_texts,
-        hoverinfo='text'
     ))
 
+    if patient_psa is not None and patient_psadt is not None:
+        fig.add_trace(go.Scatter(
+            x=[patient_psa],
+            y=[patient_psadt],
+            mode='markers',
+            marker=dict(symbol='x', size=14, color='black', line=dict(width=2, color='white')),
+            hovertemplate="Paciente<br>PSA %{x:.2f} ng/mL<br>PSADT %{y:.1f} meses<extra></extra>",
+            showlegend=False,
+        ))
+
     fig.update_layout(
-        title="O que acontece com 100 pacientes?",
-        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False, range=[-0.5, 9.5]),
-        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False, range=[-0.5, 9.5]),
+        xaxis=dict(title="PSA pré-sRT (ng/mL)"),
+        yaxis=dict(title="PSADT (meses)"),
         height=400,
-        width=400,
-        margin=dict(l=20, r=20, t=40, b=20),
-        plot_bgcolor="white"
+        margin=dict(l=20, r=20, t=20, b=20),
+        font=dict(family="Arial"),
+    )
+    return fig
+
+# MFS curve colors and short labels per ADT option
+ADT_COLORS = {
+    ADTRecommendation.NONE: "#7f7f7f",
+    ADTRecommendation.SHORT: "#1f77b4",
+    ADTRecommendation.LONG: "#2ca02c",
+    ADTRecommendation.LONG_ARPI: "#9467bd",
+}
+ADT_SHORT_LABELS = {
+    ADTRecommendation.NONE: "sRT isolada",
+    ADTRecommendation.SHORT: "ADT curta",
+    ADTRecommendation.LONG: "ADT longa",
+    ADTRecommendation.LONG_ARPI: "ADT longa + ARPI",
+}
+
+def _rgba(hex_color, alpha):
+    r, g, b = (int(hex_color[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({r}, {g}, {b}, {alpha})"
+
+def create_mfs_chart(years, curves, highlight=None, marker_year=5.0) -> go.Figure:
+    """
+    Projected metastasis-free survival curves with bands (see mfs.curve_table).
+    WebGL traces (Scattergl) keep several curves and bands light in the browser.
+    The curve containing `highlight` (an ADTRecommendation) is drawn thicker.
+    """
+    years = list(years)
+    fig = go.Figure()
+    for curve in curves:
+        color = ADT_COLORS[curve['options'][0]]
+        name = " / ".join(ADT_SHORT_LABELS[o] for o in curve['options'])
+        group = curve['options'][0].name
+        # Band: upper edge, then the lower edge filled up to it
+        fig.add_trace(go.Scattergl(
+            x=years, y=list(curve['high']), mode='lines', line=dict(width=0, color=color),
+            legendgroup=group, showlegend=False, hoverinfo='skip',
+        ))
+        fig.add_trace(go.Scattergl(
+            x=years, y=list(curve['low']), mode='lines', line=dict(width=0, color=color),
+            fill='tonexty', fillcolor=_rgba(color, 0.15),
+            legendgroup=group, showlegend=False, hoverinfo='skip',
+        ))
+        fig.add_trace(go.Scattergl(
+            x=years, y=list(curve['mfs']), mode='lines', name=name, legendgroup=group,
+            line=dict(color=color, width=4 if highlight in curve['options'] else 2),
+            hovertemplate=f"{name}<br>%{{x:.1f}} anos: %{{y:.1f}}%<extra></extra>",
+        ))
+
+    if marker_year is not None:
+        fig.add_vline(x=marker_year, line=dict(color="gray", dash="dot", width=1))
+    fig.update_layout(
+        xaxis=dict(title="Anos após a sRT", range=[0, years[-1]]),
+        yaxis=dict(title="Sobrevida livre de metástase (%)", range=[0, 100]),
+        legend=dict(orientation="h", y=-0.25),
+        height=400,
+        margin=dict(l=20, r=20, t=20, b=20),
+        font=dict(family="Arial"),
+    )
+    return fig
+
+def create_scenario_chart(estimates, active=None) -> go.Figure:
+    """
+    ARR gauge and 100-patient icon array for every ADT option in one figure.
+    estimates: {ADTRecommendation: benefit_tables.Estimate}. Buttons switch
+    the visible scenario in the browser (trace visibility + title), so
+    comparing options needs no server rerun.
+    """
+    options = list(estimates)
+    active = active if active in estimates else options[0]
+    fig = make_subplots(
+        rows=1, cols=2, column_widths=[0.45, 0.55],
+        specs=[[{'type': 'domain'}, {'type': 'xy'}]],
+    )
+    titles = []
+    for option in options:
+        estimate = estimates[option]
+        shown = option == active
+        gauge = create_arr_gauge(estimate.arr).data[0]
+        gauge.update(visible=shown, title=dict(text="RRA (Redução de Risco)"))
+        fig.add_trace(gauge, row=1, col=1)
+        x_vals, y_vals, colors, hover_texts = _waffle_points(estimate.arr, estimate.baseline)
+        fig.add_trace(go.Scatter(
+            x=x_vals, y=y_vals, mode='markers', visible=shown, showlegend=False,
+            marker=dict(symbol='circle', size=16, color=colors, line=dict(width=1, color='DarkSlateGrey')),
+            text=hover_texts, hoverinfo='text',
+        ), row=1, col=2)
+        titles.append(
+            f"{option.value}: RRA {estimate.arr_label}% · NNT {estimate.nnt_label} "
+            f"({estimate.horizon:g} anos)"
+        )
+
+    buttons = []
+    for i, option in enumerate(options):
+        # Two traces (gauge, icon array) per scenario
+        visible = [j // 2 == i for j in range(2 * len(options))]
+        buttons.append(dict(
+            label=ADT_SHORT_LABELS[option],
+            method="update",
+            args=[{'visible': visible}, {'title.text': titles[i]}],
+        ))
+
+    fig.update_xaxes(showgrid=False, zeroline=False, showticklabels=False, range=[-0.5, 9.5])
+    fig.update_yaxes(showgrid=False, zeroline=False, showticklabels=False, range=[-0.5, 9.5])
+    fig.update_layout(
+        title=dict(text=titles[options.index(active)], font=dict(size=14)),
+        updatemenus=[dict(
+            type="buttons", direction="right", active=options.index(active), buttons=buttons,
+            x=0.5, xanchor="center", y=-0.05, yanchor="top", showactive=True,
+        )],
+        height=380,
+        margin=dict(l=20, r=20, t=50, b=60),
+        plot_bgcolor="white",
+        font=dict(family="Arial"),
     )
-    
     return fig
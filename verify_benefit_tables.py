@@ -0,0 +1,149 @@
+import sys
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import benefit_tables, logic, simulation, vectorized
+from src.constants import RiskLevel, ADTRecommendation
+
+LEGACY_ARR = {
+    RiskLevel.VERY_HIGH: {'arr_5yr': 12.5, 'nnt': 8},
+    RiskLevel.HIGH: {'arr_5yr': 10.0, 'nnt': 10},
+    RiskLevel.INTERMEDIATE: {'arr_5yr': 5.9, 'nnt': 17},
+    RiskLevel.LOW: {'arr_5yr': "< 3.0", 'nnt': "> 33"},
+}
+LEGACY_BASELINE = {RiskLevel.VERY_HIGH: 60.0, RiskLevel.HIGH: 40.0, RiskLevel.INTERMEDIATE: 20.0, RiskLevel.LOW: 10.0}
+
+def test_legacy_outputs():
+    print("Testing Legacy 5-Year Outputs...")
+    for risk in RiskLevel:
+        assert logic.get_baseline_recurrence_risk(risk) == LEGACY_BASELINE[risk]
+        assert logic.get_absolute_benefits(risk, ADTRecommendation.NONE) == {'arr_5yr': 0.0, 'nnt': "-"}
+        for adt in (ADTRecommendation.SHORT, ADTRecommendation.LONG, ADTRecommendation.LONG_ARPI):
+            assert logic.get_absolute_benefits(risk, adt) == LEGACY_ARR[risk], (risk, adt)
+    print("✓ Tables reproduce the historical 5-year numbers")
+
+def test_typed_estimates():
+    print("Testing Typed Estimates...")
+    tables = benefit_tables.load_tables()
+    low = tables.estimate(RiskLevel.LOW, ADTRecommendation.LONG)
+    assert (low.arr, low.arr_upper, low.nnt, low.nnt_is_lower_bound) == (1.0, 3.0, 33, True)
+    assert low.arr_label == "< 3.0" and low.nnt_label == "> 33"
+    none = tables.estimate(RiskLevel.HIGH, ADTRecommendation.NONE, 10)
+    assert not none.has_benefit and none.arr == 0.0 and none.nnt_label == "-"
+    # Knots are exact lookups; between knots the curves interpolate monotonically
+    for horizon in (3, 5, 10, 15):
+        for risk in RiskLevel:
+            e = tables.estimate(risk, ADTRecommendation.LONG, horizon)
+            assert 0 < e.arr <= e.baseline <= 100
+    assert tables.estimate(RiskLevel.HIGH, ADTRecommendation.LONG, 10).baseline == 64.0
+    mid = tables.estimate(RiskLevel.HIGH, ADTRecommendation.LONG, 7.3).baseline
+    assert 40.0 < mid < 64.0
+    assert np.all(np.diff(tables.baseline_grid, axis=1) >= 0)
+    for bad in (-1, 15.5):
+        try:
+            tables.at(bad)
+            assert False, bad
+        except ValueError:
+            pass
+    # Vectorized lookup: every tier and option at once
+    baseline, arr, upper = tables.at(5)
+    assert baseline.tolist() == [10.0, 20.0, 40.0, 60.0]
+    assert (arr[:, 0] == 0).all() and np.isnan(upper[1:]).all()
+    print("✓ Numeric outputs with explicit bounds at any horizon")
+
+def test_stdlib_lookups():
+    print("Testing Stdlib Knot Lookups...")
+    knots, tables = benefit_tables.load_knots(), benefit_tables.load_tables()
+    # Grid horizons, knots and points between grid steps give identical estimates
+    for horizon in list(tables.grid) + [0.2, 4.3, 7.3, 14.99]:
+        for risk in RiskLevel:
+            assert knots.estimates(risk, horizon) == tables.estimates(risk, horizon), (risk, horizon)
+            assert knots.baseline(risk, horizon) == tables.baseline(risk, horizon)
+    try:
+        knots.estimate(RiskLevel.HIGH, ADTRecommendation.LONG, 15.5)
+        assert False
+    except ValueError:
+        pass
+    print("✓ Stdlib and numpy tables agree at every horizon")
+
+def test_vectorized_follows_edits():
+    print("Testing Vectorized Lookups After a CSV Edit...")
+    original = benefit_tables.load_knots
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "tables.csv")
+        with open(benefit_tables.DEFAULT_TABLES_PATH) as f:
+            text = f.read()
+        with open(path, "w") as f:
+            f.write(text.replace("arr,HIGH,SHORT,5,10.0,", "arr,HIGH,SHORT,5,8.0,"))
+        benefit_tables.load_knots = lambda csv_path=path: original(csv_path)
+        try:
+            arr, nnt, _ = vectorized.benefit_arrays()
+            r, a = vectorized.RISK[RiskLevel.HIGH], vectorized.ADT[ADTRecommendation.SHORT]
+            assert logic.get_absolute_benefits(RiskLevel.HIGH, ADTRecommendation.SHORT) == {'arr_5yr': 8.0, 'nnt': 13}
+            assert (arr[r, a], nnt[r, a]) == (8.0, 13)
+        finally:
+            benefit_tables.load_knots = original
+    arr, nnt, _ = vectorized.benefit_arrays()
+    assert (arr[r, a], nnt[r, a]) == (10.0, 10)
+    print("✓ Scalar and vectorized lookups follow the edited tables")
+
+def test_invalid_tables():
+    print("Testing Invalid Tables...")
+    header = ",".join(benefit_tables.COLUMNS) + "\n"
+    cases = {
+        "arr,HIGH,NONE,5,1.0,\n": "reference arm",
+        "baseline,HUGE,,5,10,\n": "Line 2",
+        "baseline,LOW,,5,120,\n": "out of bounds",
+        "baseline,LOW,,5,10,\nbaseline,LOW,,5,11,\n": "duplicate",
+        "baseline,LOW,,5,10,\n": "Missing baseline entry for INTERMEDIATE",
+    }
+    for body, message in cases.items():
+        try:
+            benefit_tables.BenefitTables(benefit_tables.parse_rows(header + body))
+            assert False, body
+        except ValueError as e:
+            assert message in str(e), (message, str(e))
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "tables.csv")
+        with open(path, "w") as f:
+            f.write(open(benefit_tables.DEFAULT_TABLES_PATH).read())
+        v1 = benefit_tables.tables_version(path)
+        with open(path, "a") as f:
+            f.write("# edited\n")
+        assert benefit_tables.tables_version(path) != v1
+    print("✓ Bad rows are rejected with their line; edits change the version")
+
+def test_simulation_horizon():
+    print("Testing Simulation Horizon...")
+    probs = simulation.outcome_probabilities(RiskLevel.HIGH, ADTRecommendation.LONG, horizon=10)
+    e = benefit_tables.load_tables().estimate(RiskLevel.HIGH, ADTRecommendation.LONG, 10)
+    assert np.allclose(probs, [(e.baseline - e.arr) / 100, e.arr / 100, 1 - e.baseline / 100])
+    print("✓ Icon-array simulation follows the selected horizon")
+
+def test_other_working_directory():
+    print("Testing Config Paths From Another Directory...")
+    code = (
+        "from src.decision import Case, evaluate\n"
+        "case = Case.from_dict({'psa_pre_srt': 0.5, 'gleason': 'ISUP4', 'stage': 'PT3A', 'margin': 'R1',"
+        " 'pet_findings': 'NEGATIVE', 'life_expectancy': 'LONG'})\n"
+        "print(evaluate(case).nnt)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    with tempfile.TemporaryDirectory() as d:
+        out = subprocess.run([sys.executable, "-c", code], cwd=d, env=env, capture_output=True, text=True)
+    assert out.returncode == 0 and out.stdout.strip() == "10", out.stderr
+    print("✓ Rules and benefit tables found outside the repo root")
+
+if __name__ == "__main__":
+    test_legacy_outputs()
+    test_typed_estimates()
+    test_stdlib_lookups()
+    test_vectorized_follows_edits()
+    test_invalid_tables()
+    test_simulation_horizon()
+    test_other_working_directory()
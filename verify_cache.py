@@ -0,0 +1,76 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.getcwd())
+from src import config_loader, pipeline
+from src.constants import RiskLevel, RTField, ADTRecommendation, GleasonScore, TumorStage, MarginStatus, PetFindings, LifeExpectancy, NodalStage
+
+def _inputs():
+    return {
+        'psa_pre_srt': 0.8,
+        'psa_label': "> 0,7 ng/mL",
+        'psadt_months': 10.0,
+        'gleason': GleasonScore.ISUP2,
+        'stage': TumorStage.PT3A,
+        'n_stage': NodalStage.N0,
+        'margin': MarginStatus.R1,
+        'pet_findings': PetFindings.NEGATIVE,
+        'life_expectancy': LifeExpectancy.LONG,
+        'has_cardio': False,
+        'has_metabolic': False,
+        'has_bone': False,
+        'has_libido_concern': False,
+        'has_psa_persistence': False
+    }
+
+def test_fingerprint():
+    print("Testing Inputs Fingerprint...")
+    a = _inputs()
+    b = dict(reversed(list(a.items())))
+    assert pipeline.fingerprint(a) == pipeline.fingerprint(b), "Fingerprint must not depend on key order"
+
+    c = _inputs()
+    c['gleason'] = GleasonScore.ISUP3
+    assert pipeline.fingerprint(a) != pipeline.fingerprint(c), "Changing an enum must change the fingerprint"
+
+    d = _inputs()
+    d['has_bone'] = True
+    assert pipeline.fingerprint(a) != pipeline.fingerprint(d), "Changing a flag must change the fingerprint"
+    print("✓ Fingerprint is canonical")
+
+def test_run_pipeline():
+    print("Testing Pipeline...")
+    result = pipeline.run_pipeline(_inputs())
+    assert result['risk'] == RiskLevel.HIGH, f"PSA 0.8 should be HIGH, got {result['risk']}"
+    assert result['rt_field'] == RTField.BED_PELVIS
+    assert result['adt'] == ADTRecommendation.LONG
+    assert result['benefits'] == {'arr_5yr': 10.0, 'nnt': 10}
+    assert result['baseline_risk'] == 40.0
+    print("✓ Pipeline matches the logic functions")
+
+def test_rules_version():
+    print("Testing Rule-Set Version...")
+    header = "risk_level,variable,operator,value\n"
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+        f.write(header + "HIGH,stage,EQ,PT3B\n")
+        path = f.name
+    try:
+        v1 = config_loader.rules_version(path)
+        assert len(config_loader.load_rules(path)) == 1
+        assert config_loader.rules_version(path) == v1, "Version must be stable while the file is unchanged"
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(header + "HIGH,stage,EQ,PT3B\nINTERMEDIATE,stage,EQ,PT3A\n")
+        assert config_loader.rules_version(path) != v1, "Editing the rules must change the version"
+        assert len(config_loader.load_rules(path)) == 2, "Edited rules must be reloaded"
+    finally:
+        os.unlink(path)
+
+    assert config_loader.load_rules(path) == [], "Missing file should yield no rules"
+    print("✓ Rules reloaded only when the file changes")
+
+if __name__ == "__main__":
+    test_fingerprint()
+    test_run_pipeline()
+    test_rules_version()
@@ -0,0 +1,67 @@
+import sys
+import os
+import io
+
+sys.path.append(os.getcwd())
+from src import visuals, utils
+from src.constants import RiskLevel, RTField, ADTRecommendation, GleasonScore, TumorStage, MarginStatus, PetFindings, LifeExpectancy
+
+def _sample_png():
+    # Flat-colored RGBA image similar to a kaleido chart render
+    from PIL import Image, ImageDraw
+    img = Image.new("RGBA", (800, 400), (255, 255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for i in range(10):
+        draw.ellipse([i * 80, 150, i * 80 + 60, 210], fill=(31, 119, 180, 255), outline=(47, 79, 79, 255))
+    draw.rectangle([0, 300, 800, 320], fill=(44, 160, 44, 255))
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+def test_placement_scale():
+    print("Testing Placement Scale...")
+    # Waffle is laid out at 400px and placed 100 mm wide: 100mm @150dpi = 590.6px
+    fig = visuals.create_waffle_chart(10.0, 40.0)
+    scale = visuals.placement_scale(fig, 100, dpi=150)
+    assert abs(400 * scale - 590.55) < 0.1, f"Unexpected scale {scale}"
+    print("✓ Compact render sized to its PDF placement")
+
+def test_optimize_png():
+    print("Testing PNG Optimization...")
+    raw = _sample_png()
+    small = visuals.optimize_png(raw)
+    assert len(small) <= len(raw), "Optimized PNG should never be larger"
+
+    from PIL import Image
+    assert Image.open(io.BytesIO(small)).mode == "P", "Expected a palette PNG"
+    print(f"✓ PNG reduced {len(raw)} -> {len(small)} bytes")
+
+def test_pdf_embeds_palette_png():
+    print("Testing PDF with palette PNG...")
+    inputs = {
+        'psa_pre_srt': 0.8,
+        'gleason': GleasonScore.ISUP4,
+        'stage': TumorStage.PT3A,
+        'margin': MarginStatus.R1,
+        'psadt_months': 10.0,
+        'pet_findings': PetFindings.NEGATIVE,
+        'has_cardio': False,
+        'has_metabolic': False,
+        'has_bone': False,
+        'has_libido_concern': False,
+        'life_expectancy': LifeExpectancy.LONG
+    }
+    benefits = {'arr_5yr': 10.0, 'nnt': 10}
+    visuals_map = {'waffle': visuals.optimize_png(_sample_png())}
+
+    pdf_bytes = utils.create_pdf(inputs, RiskLevel.HIGH, RTField.BED_PELVIS, ADTRecommendation.LONG, benefits, visuals_map)
+    stats = utils.report_size_stats(pdf_bytes, visuals_map)
+
+    assert stats['pdf_bytes'] == len(pdf_bytes)
+    assert stats['charts']['waffle'] == len(visuals_map['waffle'])
+    print(f"✓ PDF with palette chart: {stats['pdf_bytes']} bytes")
+
+if __name__ == "__main__":
+    test_placement_scale()
+    test_optimize_png()
+    test_pdf_embeds_palette_png()
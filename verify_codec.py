@@ -0,0 +1,76 @@
+import sys
+import os
+import itertools
+
+sys.path.append(os.getcwd())
+from src import codec
+from src.decision import Case
+from src.constants import (
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+def _cases():
+    for gleason, stage, n_stage, margin, pet, le, flags, psa, psadt in itertools.product(
+        GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy,
+        ((False,) * 5, (True, False, True, False, True), (True,) * 5),
+        (0.0, 0.2, 0.5, 0.8, 40.95), (None, 0.0, 6.0, 12.0, 409.5)
+    ):
+        yield Case(psa, gleason, stage, margin, pet, le, n_stage, psadt, *flags)
+
+def test_round_trip():
+    print("Testing Compact Round Trip...")
+    codes = set()
+    for case in _cases():
+        code = codec.encode(case)
+        assert codec.is_compact(code) and code < (1 << codec.COMPACT_BITS)
+        assert codec.decode(code) == case
+        assert codec.from_bytes(codec.to_bytes(case)) == case
+        assert codec.from_token(codec.to_token(case)) == case
+        codes.add(code)
+    assert len(codes) == len(list(_cases())), "Codes must be unique per case"
+    assert len(codec.to_token(case)) == 8
+    print(f"✓ {len(codes)} cases round-trip in {codec.COMPACT_BYTES} bytes")
+
+def test_exact_values():
+    print("Testing Off-Grid Values...")
+    base = Case(0.5, GleasonScore.ISUP2, TumorStage.PT2, MarginStatus.R0, PetFindings.NEGATIVE, LifeExpectancy.LONG)
+    for psa, psadt in [(0.45, 6.04), (0.123, None), (55.0, 3.0), (0.5, 1000.0), (0.29, 6.1)]:
+        case = Case(psa, base.gleason, base.stage, base.margin, base.pet_findings, base.life_expectancy, psadt_months=psadt)
+        code = codec.encode(case)
+        decoded = codec.decode(code)
+        # Exact equality: no rounding across the PSADT <= 6 threshold
+        assert decoded == case, (case, decoded)
+        assert codec.from_token(codec.to_token(case)) == case
+    assert codec.is_compact(codec.encode(Case(0.29, base.gleason, base.stage, base.margin, base.pet_findings, base.life_expectancy, psadt_months=6.1)))
+    assert not codec.is_compact(codec.encode(Case(0.5, base.gleason, base.stage, base.margin, base.pet_findings, base.life_expectancy, psadt_months=6.04)))
+    print("✓ Off-grid values kept exactly")
+
+def test_invalid():
+    print("Testing Invalid Codes...")
+    for bad in ["", "AAAA", "!!!!!!!!", "_" * 8]:
+        try:
+            codec.from_token(bad)
+            assert False, f"Expected error for {bad!r}"
+        except ValueError:
+            pass
+    try:
+        codec.decode(7)  # gleason index 7 doesn't exist
+        assert False
+    except ValueError:
+        pass
+    # Exact codes carrying values no Case accepts
+    header = codec.encode(next(_cases())) | (1 << codec.EXACT_SHIFT)
+    for psa, psadt in [(float('nan'), 6.0), (0.5, float('inf')), (-0.5, 6.0), (0.5, -6.0)]:
+        code = (header | (codec._float_bits(psa) << codec._EXACT_PSA_SHIFT)
+                | (codec._float_bits(psadt) << codec._EXACT_PSADT_SHIFT))
+        try:
+            codec.decode(code)
+            assert False, f"Expected error for {psa}, {psadt}"
+        except ValueError:
+            pass
+    print("✓ Malformed tokens rejected")
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_exact_values()
+    test_invalid()
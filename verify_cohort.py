@@ -0,0 +1,111 @@
+import sys
+import os
+import contextlib
+import io
+import itertools
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.getcwd())
+from src import benefit_tables, cohort, config_loader, vectorized
+from src.decision import Case, evaluate
+from src.constants import (
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+def _grid():
+    for psa, psadt, gleason, stage, n_stage, margin, pet, le, persist in itertools.product(
+        (0.2, 0.3, 0.5, 0.7, 0.8, 1.2), (None, 4.0, 6.0, 9.0, 12.0, 15.0), GleasonScore, TumorStage,
+        NodalStage, MarginStatus, PetFindings, LifeExpectancy, (False, True)
+    ):
+        yield Case(psa, gleason, stage, margin, pet, le, n_stage, psadt, persist, has_cardio=persist)
+
+# Exercises check_rule's edge cases: unimplemented operators, unparsed values,
+# enum ordering comparisons, parse failures and comment rows
+EDGE_RULES = [
+    {'risk_level': '# comment', 'variable': None, 'operator': None, 'value': None},
+    {'risk_level': 'VERY_HIGH', 'variable': 'psadt_months', 'operator': 'LE', 'value': '6.0'},
+    {'risk_level': 'HIGH', 'variable': 'psa_pre_srt', 'operator': 'BETWEEN', 'value': '0.5;0.8'},
+    {'risk_level': 'HIGH', 'variable': 'has_psa_persistence', 'operator': 'EQ', 'value': 'true'},
+    {'risk_level': 'HIGH', 'variable': 'stage', 'operator': 'IN', 'value': 'PT3A;PT3B'},
+    {'risk_level': 'INTERMEDIATE', 'variable': 'margin', 'operator': 'EQ', 'value': 'R1'},
+    {'risk_level': 'INTERMEDIATE', 'variable': 'gleason', 'operator': 'GT', 'value': 'ISUP2'},
+    {'risk_level': 'INTERMEDIATE', 'variable': 'psadt_months', 'operator': 'LT', 'value': '10'},
+    {'risk_level': 'VERY_HIGH', 'variable': 'pet_findings', 'operator': 'EQ', 'value': 'BED'},
+]
+
+def _assert_parity(cases, table):
+    scored = cohort.score(table)
+    expected = [evaluate(c) for c in cases]
+    for name in cohort.OUTPUT_ENUMS:
+        assert scored.column(name).to_pylist() == [getattr(d, name).name for d in expected], name
+    arr = [d.arr_5yr if isinstance(d.arr_5yr, float) else None for d in expected]
+    nnt = [d.nnt if isinstance(d.nnt, int) else None for d in expected]
+    assert scored.column('arr_5yr').to_pylist() == arr
+    assert scored.column('nnt').to_pylist() == nnt
+    assert scored.column('baseline_risk').to_pylist() == [d.baseline_risk for d in expected]
+
+def test_vectorized_parity():
+    print("Testing Vectorized Scoring Parity...")
+    cases = list(_grid())
+    table = cohort.cases_to_table(cases)
+    _assert_parity(cases, table)
+
+    original = config_loader.load_rules
+    config_loader.load_rules = lambda csv_path=None: list(EDGE_RULES)
+    try:
+        # check_rule prints each failed comparison
+        with contextlib.redirect_stdout(io.StringIO()):
+            _assert_parity(cases, table)
+    finally:
+        config_loader.load_rules = original
+    print(f"✓ {len(cases)} cases match the scalar pipeline (file and edge-case rules)")
+
+def test_memory_mapped_round_trip():
+    print("Testing Memory-Mapped Cohort Files...")
+    cases = list(itertools.islice(_grid(), 5000))
+    scored = cohort.score(cohort.cases_to_table(cases))
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "cohort.arrow")
+        cohort.write_cohort(scored, path)
+
+        allocated = pa.total_allocated_bytes()
+        table = cohort.read_cohort(path)
+        batch = table.to_batches()[0]
+        codes = [cohort.enum_codes(batch.column(name), enum_cls) for name, enum_cls in cohort.ENUM_FIELDS.items()]
+        psa = batch.column('psa_pre_srt').to_numpy(zero_copy_only=True)
+        assert all(c.dtype == np.int8 for c in codes) and len(psa) == len(cases)
+        assert pa.total_allocated_bytes() == allocated, "Mapped enum codes and PSA should not be copied"
+
+        assert table.schema.field('risk').type == pa.dictionary(pa.int8(), pa.string())
+        assert table.schema.metadata[b'rules_version'] == config_loader.rules_version().encode()
+        assert table.schema.metadata[b'tables_version'] == benefit_tables.tables_version().encode()
+        # Custom rules aren't labelled with the shipped rules' version
+        custom = cohort.score(cohort.cases_to_table(cases[:10]), rules=list(EDGE_RULES))
+        assert b'rules_version' not in custom.schema.metadata
+        custom = cohort.score(cohort.cases_to_table(cases[:10]), rules=list(EDGE_RULES), rules_version="edge")
+        assert custom.schema.metadata[b'rules_version'] == b"edge"
+        assert list(cohort.table_to_cases(table)) == cases
+        assert table.equals(scored)
+
+        pq_path = os.path.join(d, "cohort.parquet")
+        cohort.write_cohort(scored, pq_path)
+        from_parquet = cohort.read_cohort(pq_path)
+        assert list(cohort.table_to_cases(from_parquet)) == cases
+        assert from_parquet.column('adt').to_pylist() == scored.column('adt').to_pylist()
+    print("✓ Arrow IPC and Parquet round trip")
+
+def test_foreign_dictionary():
+    print("Testing Remapped Dictionaries...")
+    # Same values written with a different dictionary order (e.g. by another tool)
+    foreign = pa.DictionaryArray.from_arrays(pa.array([0, 1, 0], pa.int8()), pa.array(["ISUP5", "ISUP1"]))
+    codes = cohort.enum_codes(foreign, GleasonScore)
+    assert [list(GleasonScore)[c] for c in codes] == [GleasonScore.ISUP5, GleasonScore.ISUP1, GleasonScore.ISUP5]
+    print("✓ Foreign dictionaries remapped to stable codes")
+
+if __name__ == "__main__":
+    test_vectorized_parity()
+    test_memory_mapped_round_trip()
+    test_foreign_dictionary()
@@ -0,0 +1,86 @@
+import sys
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.getcwd())
+from src import cohort
+from src.cohort_index import CohortIndex, Bitmap
+from src.decision import ENUM_FIELDS, BOOL_FIELDS
+
+def _random_cohort(n, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {
+        'psa_pre_srt': np.round(rng.uniform(0.05, 2.5, n), 2),
+        'psadt_months': pa.array(np.where(rng.random(n) < 0.3, np.nan, np.round(rng.uniform(1, 30, n), 1)), from_pandas=True),
+    }
+    for name, enum_cls in ENUM_FIELDS.items():
+        columns[name] = cohort.enum_array(rng.integers(0, len(enum_cls), n), enum_cls)
+    for name in BOOL_FIELDS:
+        columns[name] = rng.random(n) < 0.2
+    return cohort.score(pa.table(columns).cast(cohort.INPUT_SCHEMA))
+
+def test_bitmap_ops():
+    print("Testing Bitmap Operations...")
+    a = np.array([True, False, True, True, False] * 27)
+    b = np.array([False, False, True, False, True] * 27)
+    ba, bb = Bitmap.from_mask(a), Bitmap.from_mask(b)
+    assert (ba & bb).count() == (a & b).sum()
+    assert (ba | bb).count() == (a | b).sum()
+    assert (~ba).count() == (~a).sum(), "Padding bits must not be counted"
+    assert list((ba & bb).rows()) == list(np.flatnonzero(a & b))
+    print("✓ AND/OR/NOT and popcount")
+
+def test_queries_match_scan():
+    print("Testing Index Queries vs Full Scan...")
+    table = _random_cohort(20000)
+    index = CohortIndex(table)
+    df = table.to_pandas()
+    psadt = df['psadt_months']
+
+    def scan(mask):
+        return int(mask.sum())
+
+    assert index.count(risk="VERY_HIGH", psadt_months=("<=", 6), pet_findings="NOT_PERFORMED") == scan(
+        (df['risk'] == "VERY_HIGH") & (psadt <= 6) & (df['pet_findings'] == "NOT_PERFORMED"))
+    assert index.count(risk="HIGH", has_cardio=True) == scan((df['risk'] == "HIGH") & df['has_cardio'])
+    # Thresholds inside a band and range combinations
+    assert index.count(psadt_months=[(">", 4.2), ("<", 10.05)]) == scan((psadt > 4.2) & (psadt < 10.05))
+    assert index.count(psa_pre_srt=(">=", 0.45)) == scan(df['psa_pre_srt'] >= 0.45)
+    assert index.count(psa_pre_srt=("==", 0.7)) == scan(df['psa_pre_srt'] == 0.7)
+    assert index.count(psadt_months=None) == scan(psadt.isna())
+    assert index.count(gleason=["ISUP4", "ISUP5"], has_bone=False) == scan(
+        df['gleason'].isin(["ISUP4", "ISUP5"]) & ~df['has_bone'])
+
+    counts = index.group_count("adt", risk="HIGH")
+    expected = df[df['risk'] == "HIGH"]['adt'].value_counts()
+    assert {k: v for k, v in counts.items() if v} == {k: int(v) for k, v in expected.items() if v}
+    bands = index.group_count("psadt_months")
+    assert sum(bands.values()) == len(df) and bands['unknown'] == scan(psadt.isna())
+    assert list(index.rows(stage="PT3B", margin="R1")) == list(np.flatnonzero((df['stage'] == "PT3B") & (df['margin'] == "R1")))
+    print("✓ Counts, group-bys and rows match a full scan")
+
+def test_invalid_filters():
+    print("Testing Invalid Filters...")
+    index = CohortIndex(_random_cohort(100))
+    for filters in ({'risk': "EXTREME"}, {'has_cardio': "yes"}, {'psadt_months': ("~", 6)}, {'age': 70}):
+        try:
+            index.count(**filters)
+            assert False, f"Expected error for {filters}"
+        except ValueError:
+            pass
+    print("✓ Invalid filters rejected")
+
+if __name__ == "__main__":
+    test_bitmap_ops()
+    test_queries_match_scan()
+    test_invalid_filters()
+    table = _random_cohort(2_000_000)
+    t0 = time.perf_counter()
+    index = CohortIndex(table)
+    print(f"Index build (2M): {time.perf_counter() - t0:.2f} s")
+    t0 = time.perf_counter()
+    n = index.count(risk="VERY_HIGH", psadt_months=("<=", 6), pet_findings="NOT_PERFORMED")
+    print(f"Query (2M): {(time.perf_counter() - t0) * 1000:.1f} ms -> {n}")
@@ -0,0 +1,71 @@
+import sys
+import os
+import dataclasses
+import itertools
+import subprocess
+
+sys.path.append(os.getcwd())
+from src import logic
+from src.decision import Case, Decision, evaluate, parse_enum
+from src.constants import (
+    GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy, ADTRecommendation
+)
+
+def test_import_light():
+    print("Testing Import Footprint...")
+    code = (
+        "import sys; import src.decision as d; d.evaluate(d.Case.from_dict({'psa_pre_srt': 0.5, 'gleason': 'ISUP4',"
+        " 'stage': 'PT3A', 'margin': 'R1', 'pet_findings': 'NEGATIVE', 'life_expectancy': 'LONG'}));"
+        " print(sorted(m for m in ('streamlit', 'plotly', 'fpdf', 'pandas', 'numpy') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+    assert out == "[]", f"Heavy modules imported: {out}"
+    print("✓ Only stdlib dependencies")
+
+def test_model():
+    print("Testing Case/Decision Model...")
+    case = Case.from_dict({
+        "psa_pre_srt": 0.5, "gleason": "isup4", "stage": "pT3a (Extensão extra-prostática)",
+        "margin": MarginStatus.R1, "pet_findings": "NEGATIVE", "life_expectancy": "LONG",
+    })
+    assert case.gleason == GleasonScore.ISUP4 and case.stage == TumorStage.PT3A
+    assert not hasattr(case, '__dict__'), "Case should be slotted"
+    try:
+        case.psa_pre_srt = 1.0
+        assert False, "Case should be frozen"
+    except dataclasses.FrozenInstanceError:
+        pass
+    assert hash(case) == hash(dataclasses.replace(case))
+
+    decision = evaluate(case)
+    assert isinstance(decision, Decision) and not hasattr(decision, '__dict__')
+    assert decision.adt == ADTRecommendation.LONG
+    assert decision.to_dict()['benefits'] == {'arr_5yr': 10.0, 'nnt': 10}
+
+    try:
+        parse_enum(GleasonScore, "GG4")
+        assert False
+    except ValueError:
+        pass
+    print("✓ Frozen slotted model, names/labels parsed")
+
+def test_parity_with_logic():
+    print("Testing Parity with logic.py...")
+    count = 0
+    for psa, psadt, gleason, stage, n_stage, margin, pet, le, persist, cardio in itertools.product(
+        (0.2, 0.5, 0.8), (None, 4.0, 9.0, 15.0), GleasonScore, TumorStage, NodalStage,
+        MarginStatus, PetFindings, LifeExpectancy, (False, True), (False, True)
+    ):
+        case = Case(psa, gleason, stage, margin, pet, le, n_stage, psadt, persist, cardio)
+        risk = logic.classify_risk(psa, gleason, stage, psadt, pet, margin, n_stage, persist)
+        adt = logic.suggest_adt(risk, le, cardio, False)
+        expected = (risk, logic.suggest_rt_field(risk, pet), adt, logic.get_absolute_benefits(risk, adt))
+        d = evaluate(case)
+        assert (d.risk, d.rt_field, d.adt, d.benefits) == expected, case
+        count += 1
+    print(f"✓ {count} cases match")
+
+if __name__ == "__main__":
+    test_import_light()
+    test_model()
+    test_parity_with_logic()
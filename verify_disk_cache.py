@@ -0,0 +1,82 @@
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+from src import disk_cache
+
+def test_shared_between_replicas():
+    print("Testing Shared Disk Cache...")
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "artifacts.sqlite")
+        replica_a = disk_cache.DiskCache(path)
+        replica_b = disk_cache.DiskCache(path)
+
+        replica_a.put('pdf', "abc123:compact", "v1", b"%PDF-1.3 ...", meta='{"pdf_bytes": 12}')
+        assert replica_b.get_entry('pdf', "abc123:compact", "v1") == (b"%PDF-1.3 ...", '{"pdf_bytes": 12}')
+        assert replica_b.get('pdf', "abc123:compact", "v2") is None, "Other rule-set versions must miss"
+        assert replica_b.get('summary', "abc123:compact", "v1") is None, "Other artifact types must miss"
+
+        replica_b.put('summary', "abc123", "v1", "RESUMO CLÍNICO")
+        assert replica_a.get('summary', "abc123", "v1").decode('utf-8') == "RESUMO CLÍNICO"
+    print("✓ Artifacts shared across cache instances")
+
+def test_lru_eviction():
+    print("Testing LRU Size Bound...")
+    with tempfile.TemporaryDirectory() as d:
+        cache = disk_cache.DiskCache(os.path.join(d, "artifacts.sqlite"), max_bytes=250)
+        for i in range(3):
+            cache.put('chart_png', f"chart{i}", "", bytes(100))
+            time.sleep(0.01)
+
+        assert cache.get('chart_png', "chart0", "") is None, "Oldest entry should be evicted"
+        assert cache.get('chart_png', "chart2", "") is not None
+        assert cache.stats()['chart_png']['bytes'] <= 250
+
+        cache.put('chart_png', "huge", "", bytes(1000))
+        assert cache.get('chart_png', "huge", "") is None, "Artifacts above the bound are not stored"
+    print("✓ Total size bounded with LRU eviction")
+
+def test_unknown_kind():
+    with tempfile.TemporaryDirectory() as d:
+        cache = disk_cache.DiskCache(os.path.join(d, "artifacts.sqlite"))
+        try:
+            cache.put('pickle', "x", "", b"")
+            assert False, "Unknown artifact kinds should be rejected"
+        except ValueError:
+            pass
+
+def test_misconfiguration():
+    print("Testing Disk Cache Misconfiguration...")
+    saved = (dict(disk_cache._shared), os.environ.get("ADT_CACHE_DIR"), os.environ.get("ADT_CACHE_MAX_MB"))
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            blocker = os.path.join(d, "file")
+            open(blocker, "w").close()
+            # Non-numeric size, and a cache directory that can't be created
+            for cache_dir, max_mb in ((d, "lots"), (d, "-1"), (os.path.join(blocker, "cache"), "256")):
+                os.environ.update(ADT_CACHE_DIR=cache_dir, ADT_CACHE_MAX_MB=max_mb)
+                disk_cache._shared.update(cache=None, configured=False)
+                assert disk_cache.get_shared_cache() is None
+                assert disk_cache._shared['configured']
+
+            cache = disk_cache.DiskCache(os.path.join(d, "artifacts.sqlite"))
+            cache.put('summary', "abc", "v1", "RESUMO")
+            cache._conn().execute("DROP TABLE artifacts")
+            assert cache.stats() == {}
+            assert cache.get('summary', "abc", "v1") is None
+    finally:
+        disk_cache._shared.update(saved[0])
+        for name, value in zip(("ADT_CACHE_DIR", "ADT_CACHE_MAX_MB"), saved[1:]):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    print("✓ Invalid settings and unreadable files fall back to the in-memory caches")
+
+if __name__ == "__main__":
+    test_shared_between_replicas()
+    test_lru_eviction()
+    test_unknown_kind()
+    test_misconfiguration()
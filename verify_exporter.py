@@ -0,0 +1,99 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.append(os.getcwd())
+from src import exporter, pipeline
+from src.constants import GleasonScore, TumorStage, MarginStatus, PetFindings, LifeExpectancy, NodalStage
+
+def test_coalescing_and_cache():
+    print("Testing Export Coalescing...")
+    manager = exporter.ExportManager(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def render(job, value):
+        calls.append(value)
+        release.wait(5)
+        return {'pdf': value}
+
+    job1 = manager.submit("k", render, b"pdf-bytes")
+    job2 = manager.submit("k", render, b"pdf-bytes")
+    assert job1 is job2, "Identical in-flight requests should share one job"
+    assert manager.active() == 1
+
+    release.set()
+    job1.future.result(5)
+    assert calls == [b"pdf-bytes"], f"Render should run once, ran {len(calls)} times"
+    assert manager.result("k") == {'pdf': b"pdf-bytes"}
+    assert manager.submit("k", render, b"pdf-bytes") is None, "Cached result should not be re-rendered"
+    print("✓ Concurrent requests coalesced and result cached")
+
+def test_bounded_queue_and_retry():
+    print("Testing Export Queue Bound...")
+    manager = exporter.ExportManager(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    def slow(job):
+        release.wait(5)
+        return {'pdf': b""}
+
+    def broken(job):
+        raise RuntimeError("renderer down")
+
+    job = manager.submit("a", slow)
+    assert manager.submit("b", slow) is None, "Queue beyond max_pending should be refused"
+    release.set()
+    job.future.result(5)
+
+    failed = manager.submit("c", broken)
+    try:
+        failed.future.result(5)
+    except RuntimeError:
+        pass
+    assert manager.job("c") is failed, "Failed job should stay visible for the UI"
+    assert manager.submit("c", slow) is not failed, "Resubmitting a failed job should start a new one"
+
+    # Failed jobs nobody resubmits expire instead of piling up in _jobs
+    manager = exporter.ExportManager(max_workers=1, error_ttl=0.05)
+    failed = manager.submit("d", broken)
+    try:
+        failed.future.result(5)
+    except RuntimeError:
+        pass
+    assert manager.job("d") is failed
+    time.sleep(0.1)
+    assert manager.active() == 0 and manager.job("d") is None and not manager._jobs
+    print("✓ Queue bounded; failed jobs retried or expired")
+
+def test_build_report_without_charts():
+    print("Testing Background PDF Build...")
+    inputs = {
+        'psa_pre_srt': 0.2,
+        'psadt_months': None,
+        'gleason': GleasonScore.ISUP1,
+        'stage': TumorStage.PT2,
+        'n_stage': NodalStage.N0,
+        'margin': MarginStatus.R0,
+        'pet_findings': PetFindings.NEGATIVE,
+        'life_expectancy': LifeExpectancy.LONG,
+        'has_cardio': False,
+        'has_metabolic': False,
+        'has_bone': False,
+        'has_libido_concern': False,
+        'has_psa_persistence': False
+    }
+    result = pipeline.run_pipeline(inputs)
+    job = exporter.ExportJob("test")
+
+    report = exporter.build_pdf_report(job, inputs, result, "compact")
+    assert report['pdf'][:4] == b"%PDF"
+    assert report['stats']['pdf_bytes'] == len(report['pdf'])
+    assert job.progress == 1.0
+    print("✓ Report built with progress updates")
+
+if __name__ == "__main__":
+    test_coalescing_and_cache()
+    test_bounded_queue_and_retry()
+    test_build_report_without_charts()
@@ -0,0 +1,48 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+import loadtest
+
+def _session(latencies, export_state="ready", export_s=1.0, kaleido=0.5, fpdf=0.1, wall=4.0, rss=150.0):
+    return {
+        'seed': 0,
+        'latencies': latencies,
+        'errors': [],
+        'export': {'state': export_state, 'seconds': export_s},
+        'components': {'kaleido': kaleido, 'fpdf': fpdf},
+        'wall': wall,
+        'peak_rss_mb': rss,
+        'pid': 1,
+    }
+
+def test_percentiles():
+    print("Testing Nearest-Rank Percentiles...")
+    values = list(range(1, 101))
+    assert loadtest.percentile(values, 50) == 50
+    assert loadtest.percentile(values, 95) == 95
+    assert loadtest.percentile(values, 99) == 99
+    assert loadtest.percentile([7], 99) == 7
+    print("✓ Percentiles")
+
+def test_summary():
+    print("Testing Load Test Summary...")
+    results = [
+        _session([("load", 0.2), ("psa_bucket", 0.05)]),
+        _session([("load", 0.4), ("psa_bucket", 0.07)], export_state="failed", kaleido=0.0, fpdf=0.0, rss=180.0),
+    ]
+    report = loadtest.summarize(results, elapsed=2.0, concurrency=2)
+
+    assert report['reruns'] == 4
+    assert report['reruns_per_s'] == 2.0
+    assert report['by_step_ms']['load']['n'] == 2
+    assert abs(report['latency_ms']['max'] - 400) < 1e-6
+    assert report['export']['ready'] == 1 and report['export']['failed'] == 1
+    assert abs(report['components']['kaleido']['share'] - 0.5 / 8.0) < 1e-9
+    assert report['peak_rss_mb'] == 180.0
+    assert "Latência de rerun" in loadtest.format_report(report)
+    print("✓ Summary aggregates sessions")
+
+if __name__ == "__main__":
+    test_percentiles()
+    test_summary()
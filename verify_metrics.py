@@ -0,0 +1,131 @@
+import sys
+import os
+import threading
+import time
+import urllib.request
+
+sys.path.append(os.getcwd())
+from src import metrics, logic
+from src.constants import GleasonScore, TumorStage, PetFindings, MarginStatus
+
+def _sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.split()[-1])
+    return None
+
+def test_exposition():
+    print("Testing Exposition Format...")
+    registry = metrics.Registry()
+    hist = metrics.Histogram("t_seconds", "Test.", ("kind",), buckets=(0.1, 1.0), registry=registry)
+    counter = metrics.Counter("t_total", "Test.", registry=registry)
+    metrics.Gauge("t_active", "Test.", lambda: 3, registry=registry)
+    for value in (0.05, 0.1, 0.5, 2.0):
+        hist.labels("a").observe(value)
+    counter.inc()
+    counter.inc(2)
+    text = registry.render()
+    assert "# TYPE t_seconds histogram" in text and "# TYPE t_total counter" in text
+    assert _sample(text, 't_seconds_bucket{kind="a",le="0.1"}') == 2
+    assert _sample(text, 't_seconds_bucket{kind="a",le="1"}') == 3
+    assert _sample(text, 't_seconds_bucket{kind="a",le="+Inf"}') == 4
+    assert _sample(text, 't_seconds_count{kind="a"}') == 4
+    assert abs(_sample(text, 't_seconds_sum{kind="a"}') - 2.65) < 1e-9
+    assert _sample(text, "t_total") == 3 and _sample(text, "t_active") == 3
+    print("✓ Histogram, counter and gauge samples")
+
+def test_threads():
+    print("Testing Concurrent Writers...")
+    registry = metrics.Registry()
+    counter = metrics.Counter("c_total", "Test.", registry=registry)
+    hist = metrics.Histogram("h_seconds", "Test.", registry=registry)
+
+    def work():
+        for _ in range(20_000):
+            counter.inc()
+            hist.observe(0.01)
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    text = registry.render()
+    # No lost updates, and finished threads' shards are folded away
+    assert _sample(text, "c_total") == 160_000
+    assert _sample(text, "h_seconds_count") == 160_000
+    assert counter._default._shards._live == []
+    print("✓ 8 threads x 20,000 updates counted exactly")
+
+def test_thread_churn():
+    print("Testing Thread Churn Without Scrapes...")
+    registry = metrics.Registry()
+    counter = metrics.Counter("churn_total", "Test.", registry=registry)
+    for _ in range(50):
+        # Short-lived threads, as Streamlit runs each rerun on a new one
+        threads = [threading.Thread(target=counter.inc) for _ in range(100)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    live = len(counter._default._shards._live)
+    assert live <= metrics.PRUNE_EVERY, live
+    assert _sample(registry.render(), "churn_total") == 5000
+    print(f"✓ 5000 threads, {live} live shards kept, no counts lost")
+
+def test_app_metrics():
+    print("Testing Application Metrics...")
+    before = sum(metrics.CLASSIFY_SECONDS._default._shards.total()[:-1])
+    n = 2000
+    start = time.perf_counter()
+    for _ in range(n):
+        logic.classify_risk(psa_pre_srt=0.5, gleason=GleasonScore.ISUP4, stage=TumorStage.PT3A,
+                            psadt_months=8.0, pet_findings=PetFindings.NEGATIVE, margin=MarginStatus.R1)
+    elapsed = time.perf_counter() - start
+    assert sum(metrics.CLASSIFY_SECONDS._default._shards.total()[:-1]) - before == n
+    # Overhead of one observation stays far below a classify_risk call
+    probe = metrics.Histogram("probe_seconds", "Test.", registry=metrics.Registry())
+    start = time.perf_counter()
+    for _ in range(100_000):
+        probe.observe(0.001)
+    per_observe = (time.perf_counter() - start) / 100_000
+    assert per_observe < 5e-6, per_observe
+
+    calls = []
+    def body(x):
+        calls.append(x)
+        metrics.mark_miss("probe")
+        return x
+    def cached(x):
+        return x if calls else body(x)
+    metrics.cached_call("probe", cached, 1)
+    metrics.cached_call("probe", cached, 1)
+    text = metrics.render()
+    assert _sample(text, 'adt_cache_misses_total{cache="probe"}') == 1
+    assert _sample(text, 'adt_cache_hits_total{cache="probe"}') == 1
+    print(f"✓ classify_risk timed ({elapsed / n * 1e6:.0f} µs/call); observe costs {per_observe * 1e9:.0f} ns")
+
+def test_endpoint():
+    print("Testing /metrics Endpoint...")
+    server = metrics.start_server(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(url + "/metrics") as resp:
+            assert resp.headers['Content-Type'].startswith("text/plain; version=0.0.4")
+            text = resp.read().decode('utf-8')
+        assert "# TYPE adt_rerun_seconds histogram" in text
+        try:
+            urllib.request.urlopen(url + "/other")
+            assert False
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✓ Prometheus text served over HTTP")
+
+if __name__ == "__main__":
+    test_exposition()
+    test_threads()
+    test_thread_churn()
+    test_app_metrics()
+    test_endpoint()
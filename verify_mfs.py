@@ -0,0 +1,42 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import benefit_tables, logic, mfs, visuals
+from src.constants import RiskLevel, ADTRecommendation
+
+def test_curves():
+    print("Testing MFS Curves...")
+    for risk in RiskLevel:
+        table = mfs.curve_table(risk)
+        years = table['years']
+        five = int(np.flatnonzero(years == 5.0)[0])
+        options = [o for c in table['curves'] for o in c['options']]
+        assert sorted(options, key=list(ADTRecommendation).index) == list(ADTRecommendation)
+        for curve in table['curves']:
+            assert curve['mfs'][0] == 100.0
+            assert np.all(np.diff(curve['mfs']) <= 1e-9), "MFS never rises"
+            assert np.all(curve['low'] <= curve['mfs'] + 1e-9) and np.all(curve['mfs'] <= curve['high'] + 1e-9)
+            adt = curve['options'][0]
+            benefit = benefit_tables.load_tables().estimate(risk, adt)
+            assert abs(curve['mfs'][five] - (100 - logic.get_baseline_recurrence_risk(risk) + benefit.arr)) < 1e-9
+        # Today every ADT duration shares one curve per tier
+        assert len(table['curves']) == 2
+    print("✓ Curves start at 100%, decrease, sit inside their bands and match the 5-year tables")
+
+def test_chart():
+    print("Testing MFS Chart...")
+    table = mfs.curve_table(RiskLevel.HIGH)
+    fig = visuals.create_mfs_chart(table['years'], table['curves'], highlight=ADTRecommendation.LONG)
+    assert all(trace.type == 'scattergl' for trace in fig.data)
+    assert len(fig.data) == 3 * len(table['curves'])
+    lines = [trace for trace in fig.data if trace.showlegend is not False]
+    widths = {trace.name: trace.line.width for trace in lines}
+    assert widths["sRT isolada"] == 2 and widths["ADT curta / ADT longa / ADT longa + ARPI"] == 4
+    print("✓ WebGL traces, one band per curve, recommended option highlighted")
+
+if __name__ == "__main__":
+    test_curves()
+    test_chart()
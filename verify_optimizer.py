@@ -0,0 +1,93 @@
+import sys
+import os
+import json
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import optimizer, vectorized
+
+SMALL = dict(psa_grid=[0.3, 0.5, 0.7, 1.0], psadt_grid=[6.0, 9.0, 12.0])
+
+def _cohort(n=4000, seed=3):
+    rng = np.random.default_rng(seed)
+    cols = {
+        'gleason': rng.integers(0, 5, n).astype(np.int8),
+        'stage': rng.integers(0, 3, n).astype(np.int8),
+        'n_stage': rng.integers(0, 3, n).astype(np.int8),
+        'margin': rng.integers(0, 2, n).astype(np.int8),
+        'pet_findings': rng.integers(0, 5, n).astype(np.int8),
+        'life_expectancy': rng.integers(0, 2, n).astype(np.int8),
+        'psa_pre_srt': np.round(rng.uniform(0.05, 2.0, n), 2),
+        'psadt_months': np.where(rng.random(n) < 0.3, np.nan, np.round(rng.uniform(1, 30, n), 1)),
+        'has_psa_persistence': rng.random(n) < 0.1,
+    }
+    # Outcome driven by PSA and grade, so the fit has something to find
+    outcome = rng.random(n) < 0.05 + 0.25 * (cols['psa_pre_srt'] > 1.0) + 0.1 * (cols['gleason'] >= 3)
+    return cols, outcome
+
+def _auc(risk, outcome):
+    pos = np.bincount(risk[outcome], minlength=4)
+    neg = np.bincount(risk[~outcome], minlength=4)
+    below = np.cumsum(neg) - neg
+    return (pos * (2 * below + neg)).sum() / (2 * pos.sum() * neg.sum())
+
+def test_current_rules():
+    print("Testing Current Rule Set...")
+    cols, outcome = _cohort()
+    space = optimizer.SearchSpace()
+    current = space.decode(space.current())
+    assert (optimizer.candidate_risk(cols, current) == vectorized.classify_risk_codes(cols)).all()
+    cells = optimizer.reduce_cohort(cols, outcome, space)
+    assert cells['pos'].sum() + cells['neg'].sum() == len(outcome)
+    rng = np.random.default_rng(0)
+    for index in [space.current()] + list(rng.integers(0, space.size, 20)):
+        direct = _auc(optimizer.candidate_risk(cols, space.decode(index)), outcome)
+        assert abs(optimizer.auc_of(cells, space, index) - direct) < 1e-12, index
+    print("✓ Current candidate reproduces classify_risk; table AUC matches direct scoring")
+
+def test_exhaustive_search():
+    print("Testing Exhaustive Search...")
+    cols, outcome = _cohort()
+    space = optimizer.SearchSpace(**SMALL)
+    result = optimizer.optimize(cols, outcome, space=space, workers=1)
+    # Brute force over every candidate
+    scores = np.array([_auc(optimizer.candidate_risk(cols, space.decode(i)), outcome) for i in range(space.size)])
+    assert result['index'] == int(np.argmax(scores))
+    assert abs(result['auc'] - scores.max()) < 1e-12
+    assert result['auc'] >= result['current_auc']
+    # Monotonicity: tiers never fall with grade / stage, cut-offs stay ordered
+    c = result['candidate']
+    assert all(vectorized.RISK[a] <= vectorized.RISK[b] for a, b in zip(list(c['gleason'].values()), list(c['gleason'].values())[1:]))
+    assert c['psa_intermediate'] < c['psa_high'] and c['psadt_very_high'] < c['psadt_high']
+    print(f"✓ Best of {space.size:,} candidates matches brute force (AUC {result['auc']:.3f})")
+
+def test_resume():
+    print("Testing Checkpoint Resume...")
+    cols, outcome = _cohort()
+    space = optimizer.SearchSpace(**SMALL)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "fit.json")
+        full = optimizer.optimize(cols, outcome, space=space, workers=1, checkpoint=path)
+        # Simulate an interrupted run: keep half the finished combinations
+        with open(path) as f:
+            state = json.load(f)
+        state['done'] = state['done'][: space.combos // 2]
+        optimizer._init_worker(optimizer.reduce_cohort(cols, outcome, space), space)
+        best = max((optimizer.score_combo(c) for c in state['done']), key=lambda r: (r[1], -r[2]))
+        state['best'] = {'num': best[1], 'index': best[2]}
+        with open(path, 'w') as f:
+            json.dump(state, f)
+        resumed = optimizer.optimize(cols, outcome, space=space, workers=1, checkpoint=path)
+        assert resumed['resumed'] == space.combos // 2
+        assert resumed['index'] == full['index']
+        # A different cohort doesn't reuse the checkpoint
+        other = optimizer.optimize(*_cohort(seed=4), space=space, workers=1, checkpoint=path)
+        assert other['resumed'] == 0
+    print("✓ Finished combinations are skipped on resume")
+
+if __name__ == "__main__":
+    test_current_rules()
+    test_exhaustive_search()
+    test_resume()
@@ -0,0 +1,54 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+from src import utils
+from src.constants import RiskLevel, RTField, ADTRecommendation, GleasonScore, TumorStage, MarginStatus, PetFindings, LifeExpectancy
+
+def _inputs():
+    return {
+        'psa_pre_srt': 0.5,
+        'psa_label': "> 0,3 a <= 0,7 ng/mL",
+        'gleason': GleasonScore.ISUP3,
+        'stage': TumorStage.PT2,
+        'margin': MarginStatus.R0,
+        'psadt_months': 10.0,
+        'pet_findings': PetFindings.NEGATIVE,
+        'has_cardio': True,
+        'has_metabolic': False,
+        'has_bone': False,
+        'has_libido_concern': False,
+        'life_expectancy': LifeExpectancy.SHORT # "≤ 10 anos" must be sanitized
+    }
+
+def test_template_fields():
+    print("Testing Report Template Fields...")
+    benefits = {'arr_5yr': 5.9, 'nnt': 17}
+    fields = utils.report_fields(_inputs(), RiskLevel.INTERMEDIATE, RTField.BED_ONLY, ADTRecommendation.SHORT, benefits)
+
+    assert fields['life_expectancy'] == "<= 10 anos", f"Expected sanitized text, got {fields['life_expectancy']}"
+    assert fields['comorbidities'] == "Risco Cardiovascular"
+    assert fields['benefit_line'] == "Redução Absoluta de Risco: 5.9% | NNT: 17"
+
+    no_benefit = utils.report_fields(_inputs(), RiskLevel.LOW, RTField.BED_ONLY, ADTRecommendation.NONE, {'arr_5yr': 0.0, 'nnt': "-"})
+    assert no_benefit['benefit_line'] is None, "No ADT benefit should skip the charts section"
+    print("✓ Variable fields stamped and sanitized")
+
+def test_batch_matches_single():
+    print("Testing Batch PDF Path...")
+    benefits = {'arr_5yr': 5.9, 'nnt': 17}
+    case = (_inputs(), RiskLevel.INTERMEDIATE, RTField.BED_ONLY, ADTRecommendation.SHORT, benefits, {})
+
+    single = utils.create_pdf(*case)
+    batch = utils.create_pdf_batch([case, case])
+
+    assert len(batch) == 2
+    for pdf_bytes in batch:
+        assert pdf_bytes[:4] == b"%PDF", "Header should indicate PDF"
+        # Only the creation timestamp may differ between runs
+        assert len(pdf_bytes) == len(single), "Batch and single paths should share the same layout"
+    print("✓ Batch reports share the single-report layout")
+
+if __name__ == "__main__":
+    test_template_fields()
+    test_batch_matches_single()
@@ -0,0 +1,32 @@
+import sys
+import os
+from datetime import date
+
+sys.path.append(os.getcwd())
+import pandas as pd
+from src import ui
+
+def test_table_key():
+    print("Testing PSADT Table Key...")
+    df = pd.DataFrame([
+        {"Data": date(2024, 1, 1), "PSA (ng/mL)": 1.0},
+        {"Data": date(2024, 4, 1), "PSA (ng/mL)": 2.0},
+        {"Data": None, "PSA (ng/mL)": None}, # Row just added in the editor
+    ])
+    key = ui.psadt_table_key(df)
+    assert key == (("2024-01-01", 1.0), ("2024-04-01", 2.0), (None, None)), f"Unexpected key {key}"
+    hash(key) # Must be hashable for caching
+    print("✓ Table snapshot is hashable and handles empty rows")
+
+def test_psadt_from_table():
+    print("Testing PSADT from Table...")
+    key = (("2024-01-01", 1.0), ("2024-04-01", 2.0), (None, None))
+    result = ui._psadt_from_table(key)
+    assert result is not None and 2.9 <= result <= 3.1, f"Expected ~3.0 months, got {result}"
+
+    assert ui._psadt_from_table((("2024-01-01", 0.0), ("2024-01-01", 0.0))) is None, "Empty table should not yield a PSADT"
+    print("✓ PSADT recomputed from table snapshot")
+
+if __name__ == "__main__":
+    test_table_key()
+    test_psadt_from_table()
@@ -0,0 +1,86 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import risk_score, vectorized
+from src.constants import RiskLevel, GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+from src.decision import Case
+
+def _case(**overrides):
+    fields = dict(
+        psa_pre_srt=0.4, gleason=GleasonScore.ISUP2, stage=TumorStage.PT3A, n_stage=NodalStage.N0,
+        margin=MarginStatus.R1, pet_findings=PetFindings.NEGATIVE, psadt_months=10.0,
+        life_expectancy=LifeExpectancy.LONG, has_psa_persistence=False,
+    )
+    fields.update(overrides)
+    return Case(**fields)
+
+def _cohort(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return {
+        'gleason': rng.integers(0, 5, n), 'stage': rng.integers(0, 3, n),
+        'n_stage': rng.choice(3, n, p=[0.5, 0.4, 0.1]), 'margin': rng.integers(0, 2, n),
+        'pet_findings': rng.choice(5, n, p=[0.3, 0.4, 0.15, 0.1, 0.05]), 'life_expectancy': rng.integers(0, 2, n),
+        'psa_pre_srt': np.exp(rng.uniform(np.log(0.05), np.log(3), n)),
+        'psadt_months': np.where(rng.random(n) < 0.3, np.nan, np.exp(rng.uniform(np.log(2), np.log(40), n))),
+        'has_psa_persistence': rng.random(n) < 0.1,
+    }
+
+def test_monotone():
+    print("Testing Score Direction...")
+    p = risk_score.case_probability
+    assert p(_case(psa_pre_srt=0.71)) < p(_case(psa_pre_srt=5.0)), "Higher PSA must raise the score"
+    assert p(_case(psadt_months=3.0)) > p(_case(psadt_months=12.0)) > p(_case(psadt_months=30.0))
+    grades = [p(_case(gleason=g)) for g in GleasonScore]
+    assert grades == sorted(grades)
+    assert p(_case(pet_findings=PetFindings.EXTRA_PELVIC)) > p(_case(pet_findings=PetFindings.PELVIC_LN)) > p(_case())
+    assert p(_case(has_psa_persistence=True)) > p(_case())
+    assert 0 < p(_case(psa_pre_srt=0.0)) < p(_case(psa_pre_srt=1e6)) < 1
+    print("✓ Score rises with PSA, PSADT speed, grade, PET extent and persistence")
+
+def test_vectorized_matches_cases():
+    print("Testing Vectorized Scores...")
+    cols = _cohort(500)
+    scores = risk_score.probability(cols)
+    for i in range(0, 500, 25):
+        case = _case(
+            psa_pre_srt=float(cols['psa_pre_srt'][i]),
+            psadt_months=None if np.isnan(cols['psadt_months'][i]) else float(cols['psadt_months'][i]),
+            gleason=list(GleasonScore)[cols['gleason'][i]], stage=list(TumorStage)[cols['stage'][i]],
+            n_stage=list(NodalStage)[cols['n_stage'][i]], margin=list(MarginStatus)[cols['margin'][i]],
+            pet_findings=list(PetFindings)[cols['pet_findings'][i]],
+            has_psa_persistence=bool(cols['has_psa_persistence'][i]),
+        )
+        assert abs(risk_score.case_probability(case) - scores[i]) < 1e-12, i
+    n = 1_000_000
+    big = _cohort(n)
+    start = time.perf_counter()
+    risk_score.probability(big)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 2.0, elapsed
+    print(f"✓ Cohort scores match case by case; {n:,} patients in {elapsed * 1000:.0f} ms")
+
+def test_tiers():
+    print("Testing Tier Mapping...")
+    assert np.allclose(risk_score.tier_cutoffs(), [0.15, 0.30, 0.50])
+    assert risk_score.tier_from_probability(0.05) == RiskLevel.LOW
+    assert risk_score.tier_from_probability(0.15) == RiskLevel.INTERMEDIATE
+    assert risk_score.tier_from_probability(0.45) == RiskLevel.HIGH
+    assert risk_score.tier_from_probability(0.9) == RiskLevel.VERY_HIGH
+    # Scores follow the four-tier classification on average
+    cols = _cohort(100_000)
+    tiers = vectorized.classify_risk_codes(cols)
+    scores = risk_score.probability(cols)
+    medians = [np.median(scores[tiers == k]) for k in range(4)]
+    assert medians == sorted(medians), medians
+    agreement = np.abs(risk_score.tier_codes(scores) - tiers) <= 1
+    assert agreement.mean() > 0.85, agreement.mean()
+    print(f"✓ Tier medians {', '.join(f'{m:.0%}' for m in medians)}; {agreement.mean():.0%} within one tier")
+
+if __name__ == "__main__":
+    test_monotone()
+    test_vectorized_matches_cases()
+    test_tiers()
@@ -0,0 +1,87 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.getcwd())
+from src import config_loader, rules_check
+from src.constants import MarginStatus
+
+BROKEN_RULES = """risk_level,variable,operator,value
+# comment rows are skipped
+VERY_HIGH,pet_findings,IN,PELVIC_LN;EXTRA_PELVIC
+VERY_HIGH,n_stage,EQ,N1
+VERY_HIGH,psadt_months,LE,6.0
+HIGH,gleason,IN,ISUP4;ISUP6
+HIGH,stage,EQ,PT3B
+HIGH,psadt_months,LE,12.0
+HIGH,psa_pre_srt,GT,0.5
+HIGH,psa_pre_srt,NE,0.9
+INTERMEDIATE,gleason,GT,ISUP1
+INTERMEDIATE,gleason,IN,ISUP2;ISUP3
+INTERMEDIATE,stage,EQ,PT3A
+INTERMEDIATE,margin,EQ,R1
+INTERMEDIATE,psa_pre_srt,GT,0.3
+INTERMEDIATE,psadt_months,LT,0
+"""
+
+def _write(d, text):
+    path = os.path.join(d, "rules.csv")
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+def test_shipped_rules():
+    print("Testing Shipped Rules...")
+    report = rules_check.check(workers=1)
+    assert not rules_check.failed(report), rules_check.format_report(report)
+    assert report['vectorized_mismatches'] == 0
+    assert all(entry['cases'] > 0 for entry in report['rule_fires'])
+    # Only the compound persistence rule lives in the code alone
+    assert report['explained'] and all(d['code'] == 'VERY_HIGH' for d in report['explained'])
+    print(f"✓ {report['cases']:,} cases: CSV and code agree")
+
+def test_comments_and_le():
+    print("Testing Comment Rows and LE...")
+    rules = config_loader.load_rules()
+    assert not any(r['risk_level'].startswith('#') for r in rules)
+    le_rule = {'risk_level': 'VERY_HIGH', 'variable': 'psadt_months', 'operator': 'LE', 'value': '6.0'}
+    assert config_loader.check_rule({'psadt_months': 6.0}, le_rule, config_loader.parse_rule_value)
+    assert not config_loader.check_rule({'psadt_months': 6.1}, le_rule, config_loader.parse_rule_value)
+    r1_rule = {'risk_level': 'INTERMEDIATE', 'variable': 'margin', 'operator': 'EQ', 'value': 'R1'}
+    assert config_loader.check_rule({'margin': MarginStatus.R1}, r1_rule, config_loader.parse_rule_value)
+    print("✓ Comment rows skipped; LE and margin rules evaluated")
+
+def test_broken_rules():
+    print("Testing Broken Rules...")
+    with tempfile.TemporaryDirectory() as d:
+        report = rules_check.check(_write(d, BROKEN_RULES), workers=1)
+    assert rules_check.failed(report)
+    problems = {entry['line']: entry['problem'] for entry in report['parse_failures']}
+    assert set(problems) == {6, 10, 11}, problems
+    assert "ISUP6" in problems[6] and "NE" in problems[10] and "GT" in problems[11]
+    assert [entry['line'] for entry in report['dead_rules']] == [16]
+    # PSA 0.5 < x <= 0.7 is High in the CSV but Intermediate in the code;
+    # ISUP 4-5 alone is High in the code but not in the CSV (typo)
+    diffs = {(d['code'], d['csv']) for d in report['disagreements']}
+    assert ('INTERMEDIATE', 'HIGH') in diffs
+    assert ('HIGH', 'INTERMEDIATE') in diffs or ('HIGH', None) in diffs
+    assert any(0.5 < d['case']['psa_pre_srt'] <= 0.7 for d in report['disagreements'] if d['csv'] == 'HIGH')
+    assert report['vectorized_mismatches'] == 0
+    text = rules_check.format_report(report)
+    assert "PARSE  line 6" in text and "DEAD   line 16" in text and text.endswith("FAILED")
+    print("✓ Parse failures, dead rules and disagreements reported")
+
+def test_parallel_matches_serial():
+    print("Testing Parallel Run...")
+    with tempfile.TemporaryDirectory() as d:
+        path = _write(d, BROKEN_RULES)
+        serial = rules_check.check(path, workers=1)
+        parallel = rules_check.check(path, workers=2)
+    assert serial == parallel
+    print("✓ Worker pool gives the same report")
+
+if __name__ == "__main__":
+    test_shipped_rules()
+    test_comments_and_le()
+    test_broken_rules()
+    test_parallel_matches_serial()
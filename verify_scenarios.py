@@ -0,0 +1,43 @@
+import sys
+import os
+
+sys.path.append(os.getcwd())
+from src import benefit_tables, visuals
+from src.constants import RiskLevel, ADTRecommendation
+
+def test_estimates():
+    print("Testing All-Option Estimates...")
+    tables = benefit_tables.load_tables()
+    for horizon in (5, 10):
+        for risk in RiskLevel:
+            estimates = tables.estimates(risk, horizon)
+            assert list(estimates) == list(ADTRecommendation)
+            for adt, estimate in estimates.items():
+                assert estimate == tables.estimate(risk, adt, horizon)
+    print("✓ One lookup gives the same estimates as option-by-option calls")
+
+def test_scenario_chart():
+    print("Testing Scenario Chart...")
+    estimates = benefit_tables.load_tables().estimates(RiskLevel.VERY_HIGH)
+    fig = visuals.create_scenario_chart(estimates, active=ADTRecommendation.LONG_ARPI)
+    n = len(ADTRecommendation)
+    assert len(fig.data) == 2 * n
+    # Only the active scenario is visible; each button shows exactly its own pair
+    assert [t.visible for t in fig.data] == [j // 2 == 3 for j in range(2 * n)]
+    menu = fig.layout.updatemenus[0]
+    assert menu.active == 3 and len(menu.buttons) == n
+    for i, button in enumerate(menu.buttons):
+        assert button.method == "update"
+        visible = button.args[0]['visible']
+        assert sum(visible) == 2 and visible[2 * i] and visible[2 * i + 1]
+    # Icon arrays carry each option's own counts
+    none_colors = fig.data[1].marker.color
+    arpi_colors = fig.data[7].marker.color
+    assert none_colors.count("#2ca02c") == 0 and arpi_colors.count("#2ca02c") == round(estimates[ADTRecommendation.LONG_ARPI].arr)
+    assert fig.data[6].value == estimates[ADTRecommendation.LONG_ARPI].arr
+    assert "NNT 8" in fig.layout.title.text
+    print("✓ Every option precomputed; buttons switch scenarios client-side")
+
+if __name__ == "__main__":
+    test_estimates()
+    test_scenario_chart()
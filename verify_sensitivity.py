@@ -0,0 +1,110 @@
+import sys
+import os
+import contextlib
+import io
+import itertools
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import config_loader, logic, sensitivity, visuals, vectorized
+from src.decision import Case
+from src.constants import (
+    RiskLevel, GleasonScore, TumorStage, NodalStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+CONTEXTS = [
+    Case(0.0, gleason, stage, margin, pet, LifeExpectancy.LONG, n_stage, None, persist)
+    for gleason, stage, margin, pet, n_stage, persist in itertools.product(
+        (GleasonScore.ISUP1, GleasonScore.ISUP2, GleasonScore.ISUP4), (TumorStage.PT2, TumorStage.PT3B),
+        MarginStatus, (PetFindings.NEGATIVE, PetFindings.PELVIC_LN), (NodalStage.N0,), (False, True)
+    )
+]
+
+PSA_POINTS = np.array([0.1, 0.3, 0.35, 0.7, 0.75, 1.5])
+PSADT_POINTS = np.array([3.0, 6.0, 6.5, 12.0, 12.5, 20.0])
+
+def _scalar(case, psa, psadt):
+    return vectorized.RISK[logic.classify_risk(
+        psa, case.gleason, case.stage, psadt, case.pet_findings, case.margin,
+        n_stage=case.n_stage, has_psa_persistence=case.has_psa_persistence
+    )]
+
+def test_surface_parity():
+    print("Testing Risk Surface Parity...")
+    rules = config_loader.load_rules()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for case in CONTEXTS:
+            surface = sensitivity.risk_surface(case, PSA_POINTS, PSADT_POINTS, rules, include_unknown=True)
+            assert surface.shape == (len(PSADT_POINTS) + 1, len(PSA_POINTS))
+            for i, psadt in enumerate(list(PSADT_POINTS) + [None]):
+                for j, psa in enumerate(PSA_POINTS):
+                    assert surface[i, j] == _scalar(case, float(psa), psadt), (case, psa, psadt)
+    print("✓ Surface matches classify_risk at every grid point (including unknown PSADT)")
+
+def test_threshold_sweep():
+    print("Testing Threshold Sweep...")
+    rules = config_loader.load_rules()
+    case = CONTEXTS[0]
+    for name, default in vectorized.DEFAULT_THRESHOLDS.items():
+        values = [default - 0.05, default, default + 0.25]
+        sweep = sensitivity.threshold_sweep(case, name, values, PSA_POINTS, PSADT_POINTS, rules)
+        assert sweep.shape == (3, len(PSADT_POINTS), len(PSA_POINTS))
+        # At the current cut-off the sweep is the plain surface
+        assert (sweep[1] == sensitivity.risk_surface(case, PSA_POINTS, PSADT_POINTS, rules)).all(), name
+
+    # Scalar reference for a moved PSA cut-off: the code constant and the CSV rule both move
+    original = (logic.PSA_HIGH_CUTOFF, config_loader.load_rules)
+    moved_rules = [dict(r, value='0.5') if r.get('operator') == 'GT' and r.get('value') == '0.7' else r for r in rules]
+    logic.PSA_HIGH_CUTOFF = 0.5
+    config_loader.load_rules = lambda csv_path=None: moved_rules
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = [[_scalar(case, float(psa), float(psadt)) for psa in PSA_POINTS] for psadt in PSADT_POINTS]
+    finally:
+        logic.PSA_HIGH_CUTOFF, config_loader.load_rules = original
+    sweep = sensitivity.threshold_sweep(case, 'psa_high', [0.5], PSA_POINTS, PSADT_POINTS, rules)
+    assert (sweep[0] == np.array(expected)).all()
+    assert sweep[0][-1, 3] == vectorized.RISK[RiskLevel.HIGH]  # PSA 0.7 > 0.5
+
+    try:
+        sensitivity.threshold_sweep(case, 'gleason_high')
+        assert False, "unknown threshold accepted"
+    except ValueError:
+        pass
+    print("✓ Sweeps match the surface at the default and the scalar logic at a moved cut-off")
+
+def test_cohort_sweep():
+    print("Testing Cohort Sweep...")
+    rng = np.random.default_rng(7)
+    n = 5000
+    cols = {name: np.zeros(n, dtype=np.int8) for name in ('gleason', 'stage', 'n_stage', 'margin', 'pet_findings', 'life_expectancy')}
+    cols.update(
+        psa_pre_srt=rng.uniform(0, 2, n),
+        psadt_months=np.where(rng.random(n) < 0.2, np.nan, rng.uniform(1, 30, n)),
+        has_psa_persistence=np.zeros(n, dtype=bool),
+    )
+    counts = sensitivity.cohort_sweep(cols, 'psadt_very_high', [3.0, 6.0, 9.0])
+    assert (counts.sum(axis=1) == n).all()
+    very_high = counts[:, vectorized.RISK[RiskLevel.VERY_HIGH]]
+    # A higher PSADT cut-off puts more patients in Very High
+    assert very_high[0] <= very_high[1] <= very_high[2]
+    assert very_high[1] == int(np.sum(cols['psadt_months'] <= 6.0))
+    print("✓ Cohort counts per tier across cut-off values")
+
+def test_heatmap():
+    print("Testing Risk Heatmap...")
+    surface = sensitivity.risk_surface(CONTEXTS[0])
+    fig = visuals.create_risk_heatmap(sensitivity.PSA_GRID, sensitivity.PSADT_GRID, surface, 0.5, 8.0)
+    assert len(fig.data) == 2
+    assert fig.data[0].type == 'heatmap'
+    assert list(fig.data[1].x) == [0.5]
+    fig = visuals.create_risk_heatmap(sensitivity.PSA_GRID, sensitivity.PSADT_GRID, surface, 0.5, None)
+    assert len(fig.data) == 1
+    print("✓ Heatmap with patient marker")
+
+if __name__ == "__main__":
+    test_surface_parity()
+    test_threshold_sweep()
+    test_cohort_sweep()
+    test_heatmap()
@@ -0,0 +1,136 @@
+import sys
+import os
+import contextlib
+import io
+import http.client
+import json
+from concurrent.futures import Future
+
+sys.path.append(os.getcwd())
+from src import server
+from src.decision import Case
+
+CASE = {
+    "psa_pre_srt": 0.5, "gleason": "ISUP4", "stage": "PT3A", "margin": "R1",
+    "pet_findings": "NEGATIVE", "psadt_months": 15.0, "life_expectancy": "LONG",
+}
+
+def _request(srv, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=30)
+    conn.request(method, path, body=body)
+    resp = conn.getresponse()
+    data = resp.read().decode('utf-8')
+    conn.close()
+    return resp.status, data
+
+def test_validation():
+    print("Testing Case Validation...")
+    case = Case.from_dict(CASE)
+    assert case.n_stage.name == "NX" and case.has_cardio is False
+    for bad, msg in [
+        ({k: v for k, v in CASE.items() if k != "gleason"}, "missing field: gleason"),
+        (dict(CASE, gleason="GG4"), "invalid gleason"),
+        (dict(CASE, psa_pre_srt=-1), "invalid psa_pre_srt"),
+        (dict(CASE, psa_pre_srt=True), "invalid psa_pre_srt"),
+        (dict(CASE, psa_pre_srt=10**400), "invalid psa_pre_srt"),
+        (dict(CASE, psadt_months=-10**400), "invalid psadt_months"),
+        (dict(CASE, has_cardio="yes"), "invalid has_cardio"),
+    ]:
+        try:
+            Case.from_dict(bad)
+            assert False, f"Expected error for {bad}"
+        except ValueError as e:
+            assert msg in str(e), str(e)
+    print("✓ Invalid cases rejected")
+
+def test_endpoints():
+    print("Testing Decision API...")
+    srv = server.start_background(workers=1)
+    try:
+        status, body = _request(srv, "GET", "/healthz")
+        assert status == 200 and json.loads(body)['status'] == "ok"
+
+        status, body = _request(srv, "POST", "/v1/decision", json.dumps(CASE))
+        decision = json.loads(body)
+        assert status == 200, body
+        assert decision['risk'] == "HIGH" and decision['adt'] == "LONG", decision
+        assert decision['benefits'] == {'arr_5yr': 10.0, 'nnt': 10}
+
+        status, body = _request(srv, "POST", "/v1/decision", json.dumps(dict(CASE, stage="PT9")))
+        assert status == 400 and "invalid stage" in json.loads(body)['error']
+
+        # Integers too large for a float are a 400, not a dropped connection
+        status, body = _request(srv, "POST", "/v1/decision", json.dumps(dict(CASE, psa_pre_srt=10**400)))
+        assert status == 400 and "invalid psa_pre_srt" in json.loads(body)['error'], body
+
+        lines = [json.dumps(dict(CASE, id=i, psadt_months=4.0 if i % 2 else None)) for i in range(1200)]
+        lines.insert(3, "{not json")
+        lines.insert(6, json.dumps(dict(CASE, psa_pre_srt=10**400)))
+        status, body = _request(srv, "POST", "/v1/decisions/bulk", "\n".join(lines) + "\n")
+        assert status == 200
+        rows = [json.loads(l) for l in body.splitlines()]
+        assert len(rows) == 1202
+        errors = [r for r in rows if 'error' in r]
+        assert [e['line'] for e in errors] == [4, 7] and "invalid psa_pre_srt" in errors[1]['error']
+        by_id = {r['id']: r['decision']['risk'] for r in rows if 'decision' in r}
+        assert by_id[1] == "VERY_HIGH" and by_id[2] == "HIGH"
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    print("✓ Single and bulk endpoints")
+
+class _FailingPool:
+    """Stands in for a broken worker pool: every batch fails."""
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(RuntimeError("worker died"))
+        return future
+
+def test_bulk_failures():
+    print("Testing Bulk Failures...")
+    original = server.decide
+    server.decide = lambda payload: 1 / 0
+    try:
+        rows = [json.loads(l) for l in server.decide_lines([(1, json.dumps(CASE)), (2, "{bad")]).splitlines()]
+    finally:
+        server.decide = original
+    assert rows[0] == {'line': 1, 'error': "internal error: ZeroDivisionError"}
+    assert "Expecting" in rows[1]['error']
+
+    srv = server.start_background(workers=1)
+    try:
+        # An overlong line is one error and doesn't shift later line numbers
+        lines = [json.dumps(dict(CASE, id=0)), "x" * (3 * server.MAX_CASE_BYTES), json.dumps(dict(CASE, id=2))]
+        status, body = _request(srv, "POST", "/v1/decisions/bulk", "\n".join(lines) + "\n")
+        rows = sorted((json.loads(l) for l in body.splitlines()), key=lambda r: r['line'])
+        assert status == 200 and [r['line'] for r in rows] == [1, 2, 3], rows
+        assert "line too long" in rows[1]['error'] and rows[2]['id'] == 2 and 'decision' in rows[2]
+
+        pool, srv.pool = srv.pool, _FailingPool()
+        try:
+            status, body = _request(srv, "POST", "/v1/decisions/bulk", "\n".join([json.dumps(CASE)] * 3) + "\n")
+        finally:
+            srv.pool = pool
+        rows = [json.loads(l) for l in body.splitlines()]
+        assert status == 200 and [r['line'] for r in rows] == [1, 2, 3]
+        assert all(r['error'] == "internal error: RuntimeError" for r in rows)
+
+        # Unexpected errors on the single endpoint are a logged 500 with a JSON body
+        stderr = io.StringIO()
+        server.decide = lambda payload: 1 / 0
+        try:
+            with contextlib.redirect_stderr(stderr):
+                status, body = _request(srv, "POST", "/v1/decision", json.dumps(CASE))
+        finally:
+            server.decide = original
+        assert status == 500 and json.loads(body) == {'error': "internal error: ZeroDivisionError"}, body
+        assert "Traceback" in stderr.getvalue() and "ZeroDivisionError" in stderr.getvalue()
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    print("✓ Failed lines and batches reported, stream completed")
+
+if __name__ == "__main__":
+    test_validation()
+    test_endpoints()
+    test_bulk_failures()
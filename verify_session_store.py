@@ -0,0 +1,103 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.getcwd())
+from src import session_store
+from src.constants import GleasonScore, TumorStage, PetFindings, LifeExpectancy
+
+STATE = {
+    'psa_option': "> 0,3 a <= 0,7 ng/mL",
+    'has_psa_persistence': True,
+    'psadt_option': "Conhecido",
+    'psadt_input': 4.5,
+    'gleason': GleasonScore.ISUP4,
+    'stage': TumorStage.PT3B,
+    'pet_findings': PetFindings.NEGATIVE,
+    'life_expectancy': LifeExpectancy.LONG,
+    'has_cardio': False,
+    'psadt_rows': (("2024-01-01", 0.2), ("2024-06-01", 0.4)),
+    'psadt_editor': {"edited_rows": {}},  # widget internals are never stored
+}
+
+def test_round_trip():
+    print("Testing Session State Round Trip...")
+    data = session_store.dump_state(STATE)
+    assert 'psadt_editor' not in data['fields']
+    assert data['fields']['gleason'] == "ISUP4"
+
+    restored = session_store.load_state(data)
+    expected = {k: v for k, v in STATE.items() if k != 'psadt_editor'}
+    assert restored == expected, restored
+
+    stale = dict(data, fields=dict(data['fields'], gleason="GG9"))
+    assert 'gleason' not in session_store.load_state(stale), "Unknown enum names are dropped"
+    assert session_store.load_state(dict(data, v=0)) == {}, "Other schema versions are ignored"
+    print("✓ Inputs restored exactly")
+
+def test_backends():
+    print("Testing Session Store Backends...")
+    with tempfile.TemporaryDirectory() as d:
+        stores = [
+            session_store.FileSessionStore(os.path.join(d, "sessions")),
+            session_store.SQLiteSessionStore(os.path.join(d, "sessions.sqlite")),
+        ]
+        data = session_store.dump_state(STATE)
+        for store in stores:
+            assert store.load("abc123") is None
+            store.save("abc123", data)
+            assert store.load("abc123") == data
+            store.delete("abc123")
+            assert store.load("abc123") is None
+
+        # Two replicas on the same store see the same session
+        replica = session_store.SQLiteSessionStore(os.path.join(d, "sessions.sqlite"))
+        stores[1].save("abc123", data)
+        assert session_store.load_state(replica.load("abc123"))['psadt_input'] == 4.5
+
+        try:
+            stores[0].save("../escape", data)
+            assert False, "Path-like session ids must be rejected"
+        except ValueError:
+            pass
+        # A failed write leaves no temp file behind
+        try:
+            stores[0].save("abc123", {'not json': object()})
+            assert False, "Unserializable data must raise"
+        except TypeError:
+            pass
+        assert os.listdir(os.path.join(d, "sessions")) == []
+
+        try:
+            session_store.SessionStore()
+            assert False, "SessionStore is abstract"
+        except TypeError:
+            pass
+    print("✓ File and SQLite stores")
+
+def test_misconfiguration():
+    print("Testing Session Backend Misconfiguration...")
+    saved = (dict(session_store._shared), os.environ.get("ADT_SESSION_BACKEND"))
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            blocker = os.path.join(d, "file")
+            open(blocker, "w").close()
+            # Unknown scheme, and a backend whose directory can't be created
+            for spec in ("redis:sessions", f"file:{blocker}/sessions"):
+                os.environ["ADT_SESSION_BACKEND"] = spec
+                session_store._shared.update(store=None, configured=False)
+                assert session_store.get_session_store() is None
+                assert session_store._shared['configured']
+                assert session_store.get_session_store() is None
+    finally:
+        session_store._shared.update(saved[0])
+        if saved[1] is None:
+            os.environ.pop("ADT_SESSION_BACKEND", None)
+        else:
+            os.environ["ADT_SESSION_BACKEND"] = saved[1]
+    print("✓ Invalid settings disable persistence instead of raising")
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_backends()
+    test_misconfiguration()
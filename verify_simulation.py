@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import logic, simulation
+from src.constants import RiskLevel, ADTRecommendation
+
+def test_probabilities():
+    print("Testing Outcome Probabilities...")
+    for risk in RiskLevel:
+        for adt in ADTRecommendation:
+            probs = simulation.outcome_probabilities(risk, adt)
+            assert abs(probs.sum() - 1) < 1e-12 and (probs >= 0).all()
+            assert abs(probs[0] + probs[1] - logic.get_baseline_recurrence_risk(risk) / 100) < 1e-12
+    probs = simulation.outcome_probabilities(RiskLevel.HIGH, ADTRecommendation.LONG)
+    assert abs(probs[1] - logic.get_absolute_benefits(RiskLevel.HIGH, ADTRecommendation.LONG)['arr_5yr'] / 100) < 1e-12
+    assert simulation.outcome_probabilities(RiskLevel.HIGH, ADTRecommendation.NONE)[1] == 0
+    # Bounded ARR ("< 3.0") uses its point estimate
+    assert abs(simulation.outcome_probabilities(RiskLevel.LOW, ADTRecommendation.LONG)[1] - 0.01) < 1e-12
+    print("✓ Categories follow the baseline risk and ARR tables")
+
+def test_groups():
+    print("Testing Group Simulation...")
+    result = simulation.simulate_groups(RiskLevel.HIGH, ADTRecommendation.LONG, groups=20_000)
+    assert (result['counts'].sum(axis=1) == 100).all()
+    expected = simulation.outcome_probabilities(RiskLevel.HIGH, ADTRecommendation.LONG) * 100
+    for category, mean in zip(simulation.CATEGORIES, expected):
+        assert abs(result['mean'][category] - mean) < 0.3, category
+        low, high = result['interval'][category]
+        assert low <= mean <= high
+    # Fixed seed: identical reruns
+    again = simulation.simulate_groups(RiskLevel.HIGH, ADTRecommendation.LONG, groups=20_000)
+    assert (again['counts'] == result['counts']).all()
+    print("✓ Means match the tables; intervals cover them; reruns are identical")
+
+def test_event_times():
+    print("Testing Event Times...")
+    n = 2_000_000
+    start = time.perf_counter()
+    times = simulation.simulate_event_times(RiskLevel.VERY_HIGH, ADTRecommendation.LONG_ARPI, patients=n)
+    elapsed = time.perf_counter() - start
+    probs = simulation.outcome_probabilities(RiskLevel.VERY_HIGH, ADTRecommendation.LONG_ARPI)
+    # Treatment never brings an event forward
+    assert (times['treated'] >= times['control']).all()
+    shares = np.bincount(simulation.categorize(times['control'], times['treated']), minlength=3) / n
+    assert np.abs(shares - probs).max() < 0.002
+    curve = simulation.event_free_curve(times['control'], np.array([0.0, 5.0]))
+    assert curve[0] == 1.0 and abs(curve[1] - (1 - probs[0] - probs[1])) < 0.002
+    assert elapsed < 1.0, elapsed
+    print(f"✓ {n:,} patients in {elapsed * 1000:.0f} ms; 5-year shares match the icon array")
+
+if __name__ == "__main__":
+    test_probabilities()
+    test_groups()
+    test_event_times()
@@ -0,0 +1,144 @@
+import sys
+import os
+import io
+import contextlib
+import itertools
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import benefit_tables, config_loader, static_build, vectorized
+from src.constants import RiskLevel, ADTRecommendation, LifeExpectancy
+from src.decision import Case, evaluate
+
+def _space(table):
+    """Every enum combination x PSA interval x PSADT interval (one value each), alternating life expectancy."""
+    psa_values = static_build.interval_values(table['risk']['psa_cuts'])
+    psadt_values = static_build.interval_values(table['risk']['psadt_cuts']) + [None]
+    dims = [values for _, values in static_build.RISK_DIMS] + [psa_values, psadt_values]
+    for i, combo in enumerate(itertools.product(*dims)):
+        g, s, n, m, pet, persistence, psa, psadt = combo
+        yield Case(psa, g, s, m, pet, list(LifeExpectancy)[i % 2], n_stage=n,
+                   psadt_months=psadt, has_psa_persistence=persistence)
+
+def _expected(decision):
+    return (list(RiskLevel).index(decision.risk), decision.rt_field.name, decision.adt.name,
+            str(decision.arr_5yr), str(decision.nnt), decision.baseline_risk)
+
+def _looked_up(table, d):
+    return (d['risk'], table['enums']['rt_field'][d['rt_field']][0], table['enums']['adt'][d['adt']][0],
+            d['arr_label'], d['nnt_label'], d['baseline_risk'])
+
+def test_table_matches_python():
+    print("Testing Decision Table vs decision.evaluate...")
+    table = static_build.compile_table()
+    n = 0
+    seen = set()
+    # check_rule prints each failed comparison
+    with contextlib.redirect_stdout(io.StringIO()):
+        for case in _space(table):
+            d = static_build.decide(table, static_build.case_codes(case))
+            assert _looked_up(table, d) == _expected(evaluate(case)), case
+            seen.add((d['risk'], case.life_expectancy))
+            n += 1
+    assert n == len(table['risk']['codes'])
+    assert len(seen) == len(RiskLevel) * len(LifeExpectancy)
+    print(f"✓ {n:,} cases: table lookups match the Python pipeline")
+
+def test_values_inside_intervals():
+    print("Testing Arbitrary PSA / PSADT Values...")
+    table = static_build.compile_table()
+    rng = np.random.default_rng(7)
+    size = 20_000
+    cols = {field: rng.integers(0, len(values), size) for field, values in static_build.RISK_DIMS}
+    cols['has_psa_persistence'] = cols['has_psa_persistence'].astype(bool)
+    # Continuous values plus exact cut-offs, which sit in their own interval
+    psa = rng.uniform(0, 2, size)
+    psadt = rng.uniform(0, 30, size)
+    psa[::5] = rng.choice(table['risk']['psa_cuts'], len(psa[::5]))
+    psadt[1::5] = rng.choice(table['risk']['psadt_cuts'], len(psadt[1::5]))
+    psadt[2::5] = np.nan
+    cols['psa_pre_srt'], cols['psadt_months'] = psa, psadt
+    expected = vectorized.classify_risk_codes(cols)
+    for i in range(size):
+        c = {field: cols[field][i] for field, _ in static_build.RISK_DIMS}
+        c.update(psa_pre_srt=float(psa[i]), psadt_months=None if np.isnan(psadt[i]) else float(psadt[i]),
+                 life_expectancy=0)
+        assert static_build.decide(table, c)['risk'] == expected[i], c
+    print(f"✓ {size:,} random cases classified like the vectorized pipeline")
+
+def test_horizons():
+    print("Testing Benefit Horizons...")
+    table = static_build.compile_table()
+    tables = benefit_tables.load_tables()
+    for r, risk in enumerate(RiskLevel):
+        for a, adt in enumerate(ADTRecommendation):
+            for k, horizon in enumerate(table['benefits']['horizons']):
+                arr, arr_label, nnt_label, baseline = table['benefits']['estimates'][r][a][k]
+                est = tables.estimate(risk, adt, horizon)
+                assert (arr, arr_label, nnt_label, baseline) == (est.arr, est.arr_label, est.nnt_label, est.baseline)
+    assert table['benefits']['default_horizon'] in table['benefits']['horizons']
+    print(f"✓ Estimates at {len(table['benefits']['horizons'])} horizons match benefit_tables")
+
+def test_page():
+    print("Testing Static Page...")
+    with tempfile.TemporaryDirectory() as d:
+        out = os.path.join(d, "dist", "calculadora.html")
+        assert static_build.main(["--out", out]) == 0
+        with open(out, encoding='utf-8') as f:
+            page = f.read()
+    match = re.search(r'<script id="decision-table" type="application/json">(.*?)</script>', page, re.S)
+    assert match and json.loads(match.group(1)) == static_build.compile_table()
+    assert "function decide(T, c, horizon)" in page and "Risco de Metástase (5 anos)" in page
+    # Self-contained: no external scripts, styles or fetches
+    assert not re.search(r'<script[^>]+src=|<link|fetch\(|https?://', page)
+    version = f"{config_loader.rules_version()}.{benefit_tables.tables_version()}"
+    assert version in page
+    print(f"✓ Page written ({len(page) / 1024:.0f} KB), table {version}")
+
+def _node():
+    return shutil.which("node") or shutil.which("nodejs")
+
+def test_javascript_parity():
+    print("Testing JavaScript Lookups (node)...")
+    node = _node()
+    if node is None:
+        print("- node not found; skipped")
+        return
+    table = static_build.compile_table()
+    cases = [static_build.case_codes(case) for case in _space(table)]
+    horizons = table['benefits']['horizons']
+    for i, c in enumerate(cases):
+        c['horizon'] = horizons[i % len(horizons)]
+    script = (
+        f"const T = {static_build.table_json(table)};\n{static_build.LOGIC_JS}\n"
+        "const cases = JSON.parse(require('fs').readFileSync(0, 'utf8'));\n"
+        "process.stdout.write(JSON.stringify(cases.map((c) => decide(T, c, c.horizon))));\n"
+    )
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "parity.js")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(script)
+        result = subprocess.run([node, path], input=json.dumps(cases), capture_output=True, text=True, check=True)
+        # The page script (lookups plus DOM code) must at least parse
+        page_script = os.path.join(d, "page.js")
+        with open(page_script, "w", encoding="utf-8") as f:
+            f.write(static_build.LOGIC_JS + static_build.UI_JS)
+        subprocess.run([node, "--check", page_script], check=True)
+    from_js = json.loads(result.stdout)
+    assert len(from_js) == len(cases)
+    for c, d in zip(cases, from_js):
+        assert d == static_build.decide(table, c, c['horizon']), (c, d)
+    print(f"✓ {len(cases):,} cases: JavaScript and Python lookups agree")
+
+if __name__ == "__main__":
+    test_table_matches_python()
+    test_values_inside_intervals()
+    test_horizons()
+    test_page()
+    test_javascript_parity()
@@ -0,0 +1,110 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+from src import telemetry
+from src.constants import RiskLevel, RTField, ADTRecommendation
+
+class SlowSink:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, rows):
+        time.sleep(0.2)
+        self.batches.append(rows)
+
+def test_rows():
+    print("Testing Telemetry Rows...")
+    row = telemetry.make_row('decision', risk=RiskLevel.HIGH, rt_field=RTField.BED_PELVIS, adt=ADTRecommendation.LONG)
+    assert row == (1, 2, 1, 2, None, None)
+    for bad in [dict(risk="Alto Risco"), dict(adt=RiskLevel.HIGH), dict(outcome="paciente João")]:
+        try:
+            telemetry.make_row('decision', **bad)
+            assert False, bad
+        except (TypeError, ValueError):
+            pass
+    try:
+        telemetry.make_row('psa_value')
+        assert False
+    except ValueError:
+        pass
+    print("✓ Only enum codes and durations are accepted")
+
+def test_ring_buffer():
+    print("Testing Ring Buffer...")
+    sink = SlowSink()
+    t = telemetry.Telemetry(sink, capacity=100, batch_size=50, interval=60)
+    start = time.perf_counter()
+    for _ in range(1000):
+        t.record('rerun', duration_ms=12.5)
+    elapsed = time.perf_counter() - start
+    # The slow sink never blocks the caller and memory stays bounded
+    assert elapsed < 0.1, elapsed
+    assert t.pending() <= 100 and t.dropped > 0
+    t.close()
+    assert t.pending() == 0
+    assert t.written == sum(len(b) for b in sink.batches)
+    assert t.written + t.dropped >= 1000 - 100
+    assert all(len(b) <= 50 for b in sink.batches)
+    print(f"✓ 1000 events in {elapsed * 1000:.1f} ms; {t.written} written, {t.dropped} dropped")
+
+def test_sinks():
+    print("Testing Telemetry Sinks...")
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "telemetry.sqlite")
+        t = telemetry.Telemetry(telemetry.SQLiteSink(path), interval=0.05)
+        t.record('decision', risk=RiskLevel.VERY_HIGH, rt_field=RTField.BED_PELVIS, adt=ADTRecommendation.LONG_ARPI)
+        t.record('export', outcome='ok', duration_ms=850.0)
+        # The background writer flushes without an explicit call
+        deadline = time.time() + 5
+        while t.written < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        assert t.written == 2
+        t.close()
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute(
+                "SELECT e.event, r.name, e.duration_ms FROM events e "
+                "LEFT JOIN codes r ON r.field = 'risk' AND r.code = e.risk ORDER BY e.rowid"
+            ).fetchall()
+        assert rows == [(1, 'VERY_HIGH', None), (2, None, 850.0)], rows
+
+        import pyarrow.parquet as pq
+        directory = os.path.join(d, "parquet")
+        t = telemetry.Telemetry(telemetry.ParquetSink(directory), batch_size=2, interval=60)
+        for risk in RiskLevel:
+            t.record('decision', risk=risk)
+        t.close()
+        table = pq.read_table(directory)
+        assert sorted(table.column('risk').to_pylist()) == [0, 1, 2, 3]
+    print("✓ SQLite and Parquet batches written")
+
+def test_misconfiguration():
+    print("Testing Telemetry Misconfiguration...")
+    saved = (dict(telemetry._shared), os.environ.get("ADT_TELEMETRY"))
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            blocker = os.path.join(d, "file")
+            open(blocker, "w").close()
+            # Unknown scheme, and a sink whose directory can't be created
+            for spec in ("kafka:events", f"sqlite:{blocker}/sub/telemetry.sqlite"):
+                os.environ["ADT_TELEMETRY"] = spec
+                telemetry._shared.update(telemetry=None, configured=False)
+                assert telemetry.get_telemetry() is None
+                assert telemetry._shared['configured']
+                telemetry.record('export', outcome='ok')  # a no-op, not an error
+    finally:
+        telemetry._shared.update(saved[0])
+        if saved[1] is None:
+            os.environ.pop("ADT_TELEMETRY", None)
+        else:
+            os.environ["ADT_TELEMETRY"] = saved[1]
+    print("✓ Invalid settings disable telemetry instead of raising")
+
+if __name__ == "__main__":
+    test_rows()
+    test_ring_buffer()
+    test_sinks()
+    test_misconfiguration()
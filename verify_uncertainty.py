@@ -0,0 +1,87 @@
+import sys
+import os
+import contextlib
+import io
+import math
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+from src import logic, uncertainty
+from src.decision import Case, evaluate
+from src.constants import (
+    RiskLevel, ADTRecommendation, GleasonScore, TumorStage, MarginStatus, PetFindings, LifeExpectancy
+)
+
+CASE = Case(0.5, GleasonScore.ISUP2, TumorStage.PT3A, MarginStatus.R0, PetFindings.NEGATIVE,
+            LifeExpectancy.LONG, psadt_months=11.0)
+
+def test_slope_fit():
+    print("Testing PSA Slope Fit...")
+    start = date(2025, 1, 1)
+    dates = [start + timedelta(days=90 * i) for i in range(4)]
+    values = [0.2 * 2 ** (i * 90 / 30.4375 / 8.0) for i in range(4)]
+    slope, se = uncertainty.psadt_slope_fit(dates, values)
+    assert abs(math.log(2) / slope - logic.calculate_psadt(dates, values)) < 0.05
+    assert se < 1e-9  # Exact exponential growth
+    _, se = uncertainty.psadt_slope_fit(dates, [0.2, 0.3, 0.28, 0.5])
+    assert se > 0
+    assert uncertainty.psadt_slope_fit(dates[:2], values[:2])[1] is None
+    assert uncertainty.psadt_slope_fit(dates[:1], values[:1]) is None
+    print("✓ Slope matches calculate_psadt; error only with 3+ points")
+
+def test_probabilities():
+    print("Testing Tier Probabilities...")
+    result = uncertainty.simulate(CASE)
+    assert result['n'] == uncertainty.N_DRAWS
+    assert abs(sum(result['risk'].values()) - 1) < 1e-9
+    assert abs(sum(result['adt'].values()) - 1) < 1e-9
+    # PSADT 11 sits just under the 12-month cut-off: mostly High, some Intermediate
+    assert 0.5 < result['risk'][RiskLevel.HIGH] < 1
+    assert result['risk'][RiskLevel.INTERMEDIATE] > 0
+    assert result == uncertainty.simulate(CASE)  # Fixed seed
+
+    # Far from every cut-off, the decision is certain
+    certain = Case(0.15, GleasonScore.ISUP1, TumorStage.PT2, MarginStatus.R0, PetFindings.NEGATIVE, LifeExpectancy.LONG)
+    result = uncertainty.simulate(certain)
+    assert result['risk'][RiskLevel.LOW] == 1.0
+    assert result['adt'][evaluate(certain).adt] == 1.0
+    assert result['psadt_unknown'] == 1.0
+    print("✓ Probabilities sum to 1, are reproducible and certain away from the cut-offs")
+
+def test_scalar_parity():
+    print("Testing Parity with the Scalar Logic...")
+    n = 3000
+    result = uncertainty.simulate(CASE, n=n, psa_range=(0.3, 0.7), slope_se=0.02)
+    # Replay the same draws through the scalar pipeline
+    rng = np.random.default_rng(uncertainty.SEED)
+    psa = uncertainty.sample_psa(rng, n, CASE.psa_pre_srt, (0.3, 0.7))
+    psadt = uncertainty.sample_psadt(rng, n, CASE.psadt_months, 0.02)
+    risks = {level: 0 for level in RiskLevel}
+    adts = {rec: 0 for rec in ADTRecommendation}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for p, d in zip(psa, psadt):
+            decision = evaluate(Case(float(p), CASE.gleason, CASE.stage, CASE.margin, CASE.pet_findings,
+                                     CASE.life_expectancy, psadt_months=None if np.isnan(d) else float(d)))
+            risks[decision.risk] += 1
+            adts[decision.adt] += 1
+    assert result['risk'] == {level: c / n for level, c in risks.items()}
+    assert result['adt'] == {rec: c / n for rec, c in adts.items()}
+    print("✓ Vectorized draws match evaluate() draw by draw")
+
+def test_speed():
+    print("Testing Speed...")
+    uncertainty.simulate(CASE)
+    start = time.perf_counter()
+    uncertainty.simulate(CASE, psa_range=(0.3, 0.7))
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5, elapsed
+    print(f"✓ {uncertainty.N_DRAWS:,} draws in {elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    test_slope_fit()
+    test_probabilities()
+    test_scalar_parity()
+    test_speed()